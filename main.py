@@ -7,13 +7,42 @@ All game logic lives in this file for maximum LLM visibility.
 
 import json
 import os
+import asyncio
+import io
+import signal
+import socket
+import gc
+import argparse
+import hashlib
+import marshal
+import mmap
 import sys
 import random
+import time
+import atexit
+import gzip
+import shutil
+import threading
+import csv
+import itertools
+import multiprocessing
+import tracemalloc
+import functools
+import contextlib
+import contextvars
+import heapq
+from collections import deque, Counter, OrderedDict
 from datetime import datetime
-from dataclasses import dataclass, asdict, field
-from typing import Dict, List, Optional, Any
+from dataclasses import dataclass, field, fields, replace
+from types import MappingProxyType
+from typing import Dict, List, Optional, Any, Tuple, Set, Iterable, Mapping, Callable
 import re
 
+try:
+    import numpy as np
+except ImportError:  # the balance simulator falls back to pure Python
+    np = None
+
 # === [CONFIGURATION] ===
 class Config:
     """All game constants and configuration."""
@@ -22,6 +51,7 @@ class Config:
     DATA_DIR = "data"
     SAVES_DIR = "saves"
     LOGS_DIR = "logs"
+    CACHE_DIR = "cache"
     DEBUG_MODE = False
     
     # Game balance
@@ -43,12 +73,47 @@ class Config:
     # Combat balance
     DEFEND_BONUS = 0.5  # 50% defense boost when defending
     FLEE_SUCCESS_BASE = 0.7  # Base chance to flee successfully
+    FLEE_AGILITY_BONUS = 0.05  # Flee chance per point of agility over the enemy
+    PLAYER_HIT_CHANCE = 0.8  # 80% base hit chance
+    PLAYER_DAMAGE_ROLL = (1, 4)  # Random damage added to player attacks
+    ENEMY_HIT_CHANCE = 0.75  # 75% base hit chance for enemies
+    ENEMY_DAMAGE_ROLL = (1, 3)  # Random damage added to enemy attacks
+    KILL_XP_PER_HP = 2  # XP per point of enemy max health
+    KILL_XP_BONUS_MAX = 5  # Random bonus XP per kill (0 to this)
     ENCOUNTER_CHANCE = 0.3  # Chance of enemy encounter when moving
     
     # Economy
     HEALING_SERVICE_COST = 1  # Cost per HP to heal at tavern
     MERCHANT_MARKUP = 1.5     # Merchant sells at 150% of item value
     MERCHANT_BUYBACK = 0.6    # Merchant buys at 60% of item value
+    MERCHANT_ITEMS = ("health_potion", "steel_sword", "chain_mail",
+                      "greater_health_potion", "magic_ring", "legendary_blade")
+    DEATH_GOLD_PENALTY = 0.1  # Fraction of gold lost on death
+    
+    # Entity memory
+    ENEMY_POOL_SIZE = 64               # Spare Enemy objects kept for reuse
+    BENCH_MEMORY_COUNTS = (10_000, 100_000)
+    
+    # Combat scheduler
+    SCHEDULER_ACTION_TICKS = 60  # A combatant acts every SCHEDULER_ACTION_TICKS / agility ticks
+    SCHEDULER_CAPACITY = 1024    # Initial combatant slots (doubles when full)
+    
+    # Balance simulator
+    SIM_FIGHTS = 100000  # Fights per enemy for --simulate
+    SIM_MAX_TURNS = 200  # Fights still going after this many rounds count as stalemates
+    COMBAT_ODDS_CACHE_SIZE = 4096  # Solved fights kept for 'consider' (least recently used dropped)
+    
+    # Parameter sweeps
+    SWEEP_RUNS = 20           # Simulated playthroughs per configuration
+    SWEEP_STEPS = 500         # Moves (or rests) per playthrough
+    SWEEP_CHECKPOINTS = 10    # Gold samples taken per playthrough
+    SWEEP_REST_HEALTH = 0.5   # Simulated players go back to heal at or below this fraction of max health
+    SWEEP_FLEE_HEALTH = 0.25  # ...and try to flee a fight at or below this fraction
+    SWEEP_OUTPUT = "sweep_results.csv"
+    
+    # Inventory views
+    EQUIPMENT_TYPES = ("weapon", "armor", "accessory", "clothing")
+    CONSUMABLE_TYPES = ("consumable",)
     
     # Quest system
     MAX_ACTIVE_QUESTS = 5     # Maximum concurrent active quests
@@ -62,18 +127,154 @@ class Config:
     QUESTS_FILE = os.path.join(DATA_DIR, "quests.json")
     SAVE_FILE = os.path.join(SAVES_DIR, "savegame.json")
     DEBUG_LOG = os.path.join(LOGS_DIR, "debug.log")
+    SNAPSHOT_FILE = os.path.join(CACHE_DIR, "world.snapshot")
+    ROOM_TEXT_FILE = os.path.join(CACHE_DIR, "room_text.dat")
+    EVENT_LOG = os.path.join(LOGS_DIR, "events.jsonl")
+    
+    # Logging
+    LOG_FORMAT = "jsonl"      # "jsonl" writes structured records to EVENT_LOG, "text" writes DEBUG_LOG
+    LOG_FLUSH_INTERVAL = 1.0  # Seconds between background log flushes
+    LOG_BATCH_SIZE = 256      # Pending records that trigger an early flush
+    LOG_LEVEL = "INFO"        # Threshold for event types not listed in LOG_LEVELS
+    LOG_LEVELS = {            # Per-event-type thresholds: DEBUG, INFO, WARNING, ERROR or OFF
+        "COMBAT": "INFO",
+        "INVENTORY": "INFO",
+        "ROOM": "INFO",
+        "QUEST": "INFO",
+        "ECONOMY": "INFO",
+        "FACTION": "INFO",
+        "NPC_RELATIONSHIP": "INFO",
+        "EXAMINE": "INFO",
+    }
+    LOG_MAX_BYTES = 5 * 1024 * 1024   # Rotate the active log when it would exceed this size
+    LOG_ROTATE_SECONDS = 24 * 60 * 60 # ...or once it has been written to for this long
+    LOG_BACKUP_COUNT = 5              # Compressed archives to keep (<log>.1.gz is the newest)
+    
+    # Hot reload
+    HOT_RELOAD = False          # Watch data/*.json and apply edits without restarting
+    HOT_RELOAD_INTERVAL = 1.0   # Seconds between checks of the data files
+    
+    # World snapshot cache
+    SNAPSHOT_VERSION = 2      # Bump when the snapshot layout changes
+    
+    # Network server
+    SERVER_HOST = "127.0.0.1"     # Interface --serve binds to (localhost unless configured)
+    SERVER_PORT = 4000
+    SERVER_IDLE_TIMEOUT = 15 * 60 # Seconds without input before a connection is saved and closed
+    SERVER_NAME_PATTERN = r"[A-Za-z][A-Za-z0-9_-]{1,19}"  # Player names double as save file names
+    
+    # Server supervisor (--serve --server-workers N)
+    SUPERVISOR_STATS_INTERVAL = 2.0    # Seconds between worker stats messages
+    SUPERVISOR_BALANCE_INTERVAL = 5.0  # Seconds between load-balancing checks
+    SUPERVISOR_MAX_IMBALANCE = 4       # Session count gap between workers that triggers moves
+    SUPERVISOR_MESSAGE_BYTES = 262144  # Largest control message (a moved session's state travels in one)
+    SUPERVISOR_REPORT_INTERVAL = 60.0  # Seconds between per-worker reports on the console
+    
+    # Performance counters ('debug perf')
+    PERF_HISTOGRAM_BITS = 6  # 2**(bits-1) buckets per power of two: latencies kept within ~3%
+    PERF_DUMP_DIR = os.path.join(LOGS_DIR, "perf")  # 'debug perf dump' only writes here
+    PERF_DUMP_NAME = "perf.json"                    # ...under this name unless given one
+    
+    # Load testing (--load-test)
+    LOADTEST_DURATION = 30.0   # Seconds each run lasts
+    LOADTEST_RATE = 2.0        # Commands per second per bot
+    LOADTEST_FIGHT_ENEMIES = ("goblin", "wolf", "bandit")  # What fighter bots spawn
+    LOADTEST_TRADER_GOLD = 1000  # In-process traders start with this much to spend
+    
+    # Room text store
+    ROOM_TEXT_FIELDS = ("description", "details")  # Long prose fetched on demand
+    ROOM_TEXT_CACHE_SIZE = 64  # Rooms whose text is kept decoded in memory
+
+# === [RANDOM STREAMS] ===
+class RNGStreams:
+    """Named, independently seeded random streams for one game session.
+    
+    Every stream's seed is derived from a single session seed, so a run (or a
+    save file, which stores the seed and stream states) replays exactly, and
+    draws in one subsystem never shift the sequence seen by another.
+    """
+    NAMES = ("combat", "ai", "loot", "encounter", "text")
+    
+    def __init__(self, seed: Optional[int] = None):
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(63)
+        self.seed = seed
+        self.streams = {name: random.Random(self.derive_seed(name)) for name in self.NAMES}
+    
+    def derive_seed(self, key: str) -> int:
+        """Hash the session seed and a key into a 64-bit seed."""
+        digest = hashlib.sha256(f"{self.seed}/{key}".encode("utf-8")).digest()
+        return int.from_bytes(digest[:8], "big")
+    
+    def get(self, name: str) -> random.Random:
+        """Get a stream by name."""
+        return self.streams[name]
+    
+    def spawn(self, key: Any) -> 'RNGStreams':
+        """Create child streams for a worker or batch job, independent of this session's streams."""
+        return RNGStreams(self.derive_seed(f"spawn/{key}"))
+    
+    def numpy_generator(self, name: str):
+        """Get a numpy Generator seeded for a stream name (requires numpy)."""
+        return np.random.default_rng(self.derive_seed(f"numpy/{name}"))
+    
+    def get_state(self) -> Dict[str, Any]:
+        """Get every stream's position in a JSON-friendly form."""
+        state = {}
+        for name, stream in self.streams.items():
+            version, internal, gauss = stream.getstate()
+            state[name] = [version, list(internal), gauss]
+        return state
+    
+    def set_state(self, state: Dict[str, Any]) -> None:
+        """Restore stream positions saved by get_state (unknown names are ignored)."""
+        for name, (version, internal, gauss) in state.items():
+            if name in self.streams:
+                self.streams[name].setstate((version, tuple(internal), gauss))
 
 # === [GLOBAL STATE] ===
-game_state = {
-    'mode': 'exploration',  # exploration, combat, dialogue
-    'current_room': 'tavern',
-    'player': None,
-    'running': True,
-    'first_play': True,
-    'debug_mode': False,
-    'combat': None,  # Current combat state
-    'last_save_room': 'tavern'  # For respawn on death
-}
+@dataclass
+class PendingPrompt:
+    """A yes/no question waiting on the player's next line.
+    
+    The answer calls on_yes or on_no with the session; as at the old input()
+    prompts, anything but y/yes counts as no.
+    """
+    question: str
+    on_yes: Callable[['GameSession'], None]
+    on_no: Callable[['GameSession'], None]
+
+class GameSession:
+    """One player's game: character, mode, fight, location, rooms and random streams.
+    
+    Every command handler takes the session it acts on, so one process can run
+    many games side by side. The data tables and their indexes below are
+    read-only content shared by all sessions.
+    """
+    
+    def __init__(self, seed: Optional[int] = None, save_file: str = Config.SAVE_FILE):
+        self.mode = 'exploration'  # exploration, combat, dialogue
+        self.current_room = 'tavern'
+        self.player: Optional['Player'] = None
+        self.running = True
+        self.first_play = True
+        self.debug_mode = False
+        self.combat: Optional['CombatState'] = None  # Current combat state
+        self.last_save_room = 'tavern'  # For respawn on death
+        self.pending: Optional[PendingPrompt] = None  # Question the next line answers
+        self.save_on_exit = False  # Quitting saves (network sessions)
+        self.output: Optional[io.StringIO] = None  # Network sessions: where their prints wait to be sent
+        self.allow_debug = False   # 'debug' commands: local games, or servers run with --allow-debug
+        # Sessions sharing this process's data tables, all refreshed by 'debug reload'
+        # (None where hot reload isn't supported)
+        self.peers: Optional[Iterable['GameSession']] = (self,)
+        self.rng = RNGStreams(seed)  # Replaced by the saved streams in load_game
+        self.world = WorldState()    # This game's live rooms
+        self.save_file = save_file
+    
+    def get_rng(self, name: str) -> random.Random:
+        """Get this session's random stream for a subsystem."""
+        return self.rng.get(name)
 
 # Data storage
 rooms_data = {}
@@ -82,82 +283,595 @@ enemies_data = {}
 combat_text_data = {}
 quests_data = {}
 
+# Derived indexes over the data tables (rebuilt by build_data_indexes() on every load)
+enemies_by_room: Dict[str, List[str]] = {}   # room_id -> enemy ids that spawn there
+quests_by_npc: Dict[str, List[str]] = {}     # npc_id -> quest ids that NPC gives
+quest_templates: Dict[str, 'QuestTemplate'] = {}  # quest_id -> frozen template built from quests_data
+enemy_templates: Dict[str, 'EnemyTemplate'] = {}  # enemy_id -> frozen template built from enemies_data
+item_ids_by_name: Dict[str, str] = {}        # normalized id / name / alias -> item id
+item_search_names: Dict[str, List[str]] = {} # item_id -> normalized id, name and aliases
+item_ids_by_token_prefix: Dict[str, Set[str]] = {}  # prefix of any name token -> item ids
+encounter_tables: Dict[str, 'AliasTable'] = {}  # room_id -> weighted enemy table
+loot_tables: Dict[str, 'LootExpectation'] = {}   # enemy_id -> expected drops per kill
+
 # === [LOGGING SYSTEM] ===
 def setup_directories():
     """Create necessary directories if they don't exist."""
-    for directory in [Config.DATA_DIR, Config.SAVES_DIR, Config.LOGS_DIR]:
+    for directory in [Config.DATA_DIR, Config.SAVES_DIR, Config.LOGS_DIR, Config.CACHE_DIR]:
         os.makedirs(directory, exist_ok=True)
 
-def log_event(event_type: str, message: str) -> None:
+LOG_LEVEL_VALUES = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40, "OFF": 100}
+
+def format_log_message(message: str, args: tuple) -> str:
+    """%-format a log message, falling back to the raw template and repr(args) if they don't match."""
+    if not args:
+        return message
+    try:
+        return message % args
+    except (TypeError, ValueError):
+        return f"{message} {args!r}"
+
+class LogWriter:
+    """Queue-backed log writer that appends records in batches from a background thread.
+    
+    log_event() only enqueues a raw record tuple; message rendering, timestamp
+    formatting, file I/O and rotation all happen on the writer thread, once per batch.
+    """
+    
+    def __init__(self, path: str, flush_interval: float, batch_size: int,
+                 log_format: str = "jsonl", max_bytes: int = 0,
+                 rotate_seconds: float = 0, backup_count: int = 0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.log_format = log_format
+        self.max_bytes = max_bytes
+        self.rotate_seconds = rotate_seconds
+        self.backup_count = backup_count
+        self._pending = deque()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._size: Optional[int] = None
+        self._period_start = time.time()
+    
+    def start(self) -> None:
+        """Start the background writer thread (idempotent)."""
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+    
+    def write(self, level: str, event_type: str, message: str,
+              args: tuple = (), fields: Optional[Dict[str, Any]] = None) -> None:
+        """Queue a record for the next batch.
+        
+        args are %-formatted into message on the writer thread, so they should be
+        immutable values (numbers, strings) rather than live game objects.
+        """
+        self._pending.append((time.time(), level, event_type, message, args, fields))
+        if self._thread is None:
+            self.start()
+        if len(self._pending) >= self.batch_size:
+            self._wake.set()
+    
+    def format_record(self, timestamp: float, level: str, event_type: str, message: str,
+                      args: tuple, fields: Optional[Dict[str, Any]]) -> str:
+        """Render one queued record as a line of output."""
+        message = format_log_message(message, args)
+        
+        if self.log_format == "jsonl":
+            record = {
+                "ts": datetime.fromtimestamp(timestamp).isoformat(timespec="milliseconds"),
+                "level": level,
+                "event": event_type,
+                "message": message
+            }
+            if fields:
+                for key, value in fields.items():
+                    record.setdefault(key, value)  # Fields can't overwrite the keys above
+            return json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        
+        stamp = datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
+        return f"[{stamp}] {event_type}: {message}\n"
+    
+    def flush(self) -> None:
+        """Write every pending record to disk now, rotating the file first if needed."""
+        with self._lock:
+            if not self._pending:
+                return
+            lines = []
+            while self._pending:
+                lines.append(self.format_record(*self._pending.popleft()))
+            data = "".join(lines)
+            try:
+                if self._should_rotate(len(data.encode("utf-8"))):
+                    self._rotate()
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(data)
+                self._size += len(data.encode("utf-8"))
+            except Exception as e:
+                print(f"Logging error: {e}")
+    
+    def reset_after_fork(self, path: str) -> None:
+        """Start over in a forked child: drop the parent's queue and thread, write to path."""
+        self.path = path
+        self._pending = deque()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._size = None
+        self._period_start = time.time()
+    
+    def stop(self) -> None:
+        """Stop the writer thread and flush anything still queued."""
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+    
+    def _should_rotate(self, incoming: int) -> bool:
+        if self._size is None:
+            self._size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        if self._size == 0:
+            return False
+        if self.max_bytes and self._size + incoming > self.max_bytes:
+            return True
+        if self.rotate_seconds and time.time() - self._period_start >= self.rotate_seconds:
+            return True
+        return False
+    
+    def _rotate(self) -> None:
+        """Compress the active log to <path>.1.gz, shifting older archives up by one."""
+        if self.backup_count > 0:
+            for index in range(self.backup_count - 1, 0, -1):
+                older = f"{self.path}.{index}.gz"
+                if os.path.exists(older):
+                    os.replace(older, f"{self.path}.{index + 1}.gz")
+            with open(self.path, "rb") as src, gzip.open(f"{self.path}.1.gz", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+        os.remove(self.path)
+        self._size = 0
+        self._period_start = time.time()
+    
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+log_writer = LogWriter(
+    Config.EVENT_LOG if Config.LOG_FORMAT == "jsonl" else Config.DEBUG_LOG,
+    Config.LOG_FLUSH_INTERVAL,
+    Config.LOG_BATCH_SIZE,
+    log_format=Config.LOG_FORMAT,
+    max_bytes=Config.LOG_MAX_BYTES,
+    rotate_seconds=Config.LOG_ROTATE_SECONDS,
+    backup_count=Config.LOG_BACKUP_COUNT
+)
+atexit.register(log_writer.stop)
+
+def is_log_enabled(event_type: str, level: str = "INFO") -> bool:
+    """Check whether an event type would be recorded at the given level."""
+    threshold = Config.LOG_LEVELS.get(event_type, Config.LOG_LEVEL)
+    return LOG_LEVEL_VALUES[level] >= LOG_LEVEL_VALUES[threshold]
+
+def log_event(event_type: str, message: str, *args: Any, level: str = "INFO", **fields: Any) -> None:
     """Log game events for debugging.
     
+    The message is a %-style template rendered with args only if the record is
+    written, so disabled event types cost a threshold lookup and nothing more.
+    Keyword arguments are attached as structured fields in JSON-lines output.
+    
     Side effects:
-        - Writes to debug.log file
-        - Creates log directory if needed
+        - Queues the record for the background log writer (see LogWriter)
+        - Prints the record immediately when Config.DEBUG_MODE is on
     """
-    try:
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        log_message = f"[{timestamp}] {event_type}: {message}\n"
+    if not is_log_enabled(event_type, level):
+        return
+    
+    started = time.perf_counter_ns()
+    log_writer.write(level, event_type, message, args, fields)
+    
+    if Config.DEBUG_MODE:
+        print(f"DEBUG: {event_type}: {format_log_message(message, args)}")
+    elapsed = time.perf_counter_ns() - started
+    perf_stats.record_phase("logging", elapsed)
+    perf_stats.nested_ns += elapsed
+
+def flush_logs() -> None:
+    """Force pending log records to disk."""
+    log_writer.flush()
+
+# === [PERFORMANCE COUNTERS] ===
+PERF_PHASES = ("parse", "dispatch", "render", "logging")
+
+class LatencyHistogram:
+    """HDR-style histogram of nanosecond latencies.
+    
+    Values below 2**bits get exact buckets; above that every power of two is
+    split into 2**(bits-1) buckets, so recording costs one dict update and a
+    bucket is never wider than ~1/2**(bits-1) of the values in it.
+    """
+    __slots__ = ("bits", "counts", "count", "total", "max")
+    
+    def __init__(self, bits: int = Config.PERF_HISTOGRAM_BITS):
+        self.bits = bits
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0
+        self.max = 0
+    
+    def bucket_index(self, value: int) -> int:
+        shift = value.bit_length() - self.bits
+        if shift <= 0:
+            return value
+        half = 1 << (self.bits - 1)
+        return (1 << self.bits) + (shift - 1) * half + (value >> shift) - half
+    
+    def bucket_bounds(self, index: int) -> Tuple[int, int]:
+        """Lowest value in a bucket and the first value past it."""
+        size = 1 << self.bits
+        if index < size:
+            return index, index + 1
+        half = size >> 1
+        shift, offset = divmod(index - size, half)
+        top = half + offset
+        return top << (shift + 1), (top + 1) << (shift + 1)
+    
+    def record(self, value: int) -> None:
+        index = self.bucket_index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+    
+    def percentile(self, fraction: float) -> int:
+        """Nearest-rank percentile, reported as the top of its bucket (capped at the max seen)."""
+        if not self.count:
+            return 0
+        rank = max(1, int(fraction * self.count + 0.999999))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(self.bucket_bounds(index)[1] - 1, self.max)
+        return self.max
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "total_ns": self.total,
+            "max_ns": self.max,
+            "p50_ns": self.percentile(0.50),
+            "p95_ns": self.percentile(0.95),
+            "p99_ns": self.percentile(0.99),
+            "buckets": {str(self.bucket_bounds(index)[0]): self.counts[index] for index in sorted(self.counts)}
+        }
+
+class PerfStats:
+    """Process-wide call counts and latency histograms for commands and their phases.
+    
+    Each command's full time goes to its action's histogram. Phase times are
+    exclusive: rendering and logging done while dispatching a command are
+    taken out of its dispatch time. Timed code adds its elapsed time to
+    nested_ns so whatever encloses it can subtract it.
+    """
+    
+    def __init__(self):
+        self.nested_ns = 0
+        self.reset()
+    
+    def reset(self) -> None:
+        self.commands: Dict[str, LatencyHistogram] = {}
+        self.phases = {phase: LatencyHistogram() for phase in PERF_PHASES}
+        self.since = time.time()
+    
+    def record_command(self, action: str, elapsed_ns: int) -> None:
+        histogram = self.commands.get(action)
+        if histogram is None:
+            histogram = self.commands[action] = LatencyHistogram()
+        histogram.record(elapsed_ns)
+    
+    def record_phase(self, phase: str, elapsed_ns: int) -> None:
+        self.phases[phase].record(elapsed_ns)
+    
+    def report(self) -> None:
+        """Print the per-command and per-phase tables (times in microseconds)."""
+        elapsed = time.time() - self.since
+        print(f"Command timings over the last {elapsed:.0f}s (microseconds):")
+        columns = f"{'Calls':>8}{'Mean':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'Max':>10}"
+        print(f"{'Command':<12}{columns}")
+        for action, histogram in sorted(self.commands.items(), key=lambda item: -item[1].total):
+            self._print_row(action, histogram)
+        if not self.commands:
+            print("  (no commands yet)")
+        total = sum(histogram.total for histogram in self.phases.values()) or 1
+        print(f"\n{'Phase':<12}{columns}{'Share':>8}")
+        for phase, histogram in self.phases.items():
+            self._print_row(phase, histogram, f"{100 * histogram.total / total:>7.1f}%")
+    
+    def _print_row(self, name: str, histogram: LatencyHistogram, extra: str = "") -> None:
+        mean = histogram.total / histogram.count if histogram.count else 0
+        print(f"{name:<12}{histogram.count:>8}{mean / 1000:>10.1f}{histogram.percentile(0.50) / 1000:>10.1f}"
+              f"{histogram.percentile(0.95) / 1000:>10.1f}{histogram.percentile(0.99) / 1000:>10.1f}"
+              f"{histogram.max / 1000:>10.1f}{extra}")
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "since": datetime.fromtimestamp(self.since).isoformat(timespec="seconds"),
+            "dumped": datetime.now().isoformat(timespec="seconds"),
+            "pid": os.getpid(),
+            "bucket_bits": Config.PERF_HISTOGRAM_BITS,
+            "commands": {action: histogram.to_dict() for action, histogram in sorted(self.commands.items())},
+            "phases": {phase: histogram.to_dict() for phase, histogram in self.phases.items()}
+        }
+    
+    def dump(self, path: str) -> None:
+        """Write to_dict() as JSON.
         
-        with open(Config.DEBUG_LOG, "a", encoding="utf-8") as f:
-            f.write(log_message)
-            
-        if Config.DEBUG_MODE:
-            print(f"DEBUG: {log_message.strip()}")
-    except Exception as e:
-        print(f"Logging error: {e}")
+        Raises:
+            OSError: if the file can't be written
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+perf_stats = PerfStats()
+
+def timed_phase(phase: str):
+    """Decorator recording a function's exclusive time under one of PERF_PHASES."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter_ns()
+            nested_before = perf_stats.nested_ns
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter_ns() - started
+                perf_stats.record_phase(phase, elapsed - (perf_stats.nested_ns - nested_before))
+                perf_stats.nested_ns = nested_before + elapsed
+        return wrapper
+    return decorate
+
+def handle_perf_command(args: str, raw_args: str) -> None:
+    """Handle 'debug perf [reset | dump [<name>]]'.
+    
+    Dumps always go to Config.PERF_DUMP_DIR; <name> must be a plain file name
+    (no directories, no leading dot). raw_args is the same text with its
+    original case, so names survive the lowercasing done by parse_command.
+    """
+    if not args:
+        perf_stats.report()
+    elif args == "reset":
+        perf_stats.reset()
+        print("Performance counters reset.")
+    elif args == "dump" or args.startswith("dump "):
+        name = raw_args[len("dump"):].strip() or Config.PERF_DUMP_NAME
+        if not re.fullmatch(r"[A-Za-z0-9_-][A-Za-z0-9_.-]*", name):
+            print("Dump names are plain file names (letters, digits, '.', '-', '_'), e.g. 'debug perf dump before.json'.")
+            return
+        if not name.endswith(".json"):
+            name += ".json"
+        path = os.path.join(Config.PERF_DUMP_DIR, name)
+        try:
+            perf_stats.dump(path)
+        except OSError as e:
+            print(f"Couldn't write {path}: {e}")
+            return
+        print(f"Performance counters written to {path}.")
+    else:
+        print("Usage: debug perf [reset | dump [<name>]]")
 
 # === [DATA CLASSES] ===
-@dataclass
-class Quest:
-    """Quest data structure."""
+@dataclass(frozen=True)
+class ObjectiveTemplate:
+    """One quest objective, as loaded from quests.json."""
+    type: str
+    target: str
+    required: int
+    description: str
+    
+    @classmethod
+    def from_data(cls, data: Dict[str, Any]) -> 'ObjectiveTemplate':
+        """Create objective template from quest data (count only applies to kill/collect)."""
+        obj_type = data.get("type", "")
+        required = data.get("count", 1) if obj_type in ("kill", "collect") else 1
+        return cls(type=obj_type, target=data.get("target", ""), required=required,
+                   description=data.get("description", ""))
+
+@dataclass(frozen=True)
+class QuestTemplate:
+    """Immutable quest definition shared by every player.
+    
+    Built once per data load; per-player state lives in QuestProgress.
+    """
     quest_id: str
     title: str
     description: str
-    objectives: List[Dict[str, Any]]
-    rewards: Dict[str, Any]
-    status: str = "available"  # available, active, completed, failed
+    objectives: Tuple[ObjectiveTemplate, ...]
+    reward_xp: int = 0
+    reward_gold: int = 0
+    reward_items: Tuple[str, ...] = ()
     giver_npc: str = ""
-    completion_text: str = ""
+    completion_text: str = "Quest completed!"
     
     @classmethod
-    def from_template(cls, quest_id: str) -> Optional['Quest']:
-        """Create quest from template data."""
-        if quest_id not in quests_data:
-            return None
-        
-        template = quests_data[quest_id]
+    def from_data(cls, quest_id: str, data: Dict[str, Any]) -> 'QuestTemplate':
+        """Create quest template from quests.json data."""
+        rewards = data.get("rewards", {})
         return cls(
             quest_id=quest_id,
-            title=template["title"],
-            description=template["description"],
-            objectives=template["objectives"].copy(),
-            rewards=template["rewards"],
-            giver_npc=template.get("giver_npc", ""),
-            completion_text=template.get("completion_text", "Quest completed!")
+            title=data["title"],
+            description=data["description"],
+            objectives=tuple(ObjectiveTemplate.from_data(obj) for obj in data.get("objectives", [])),
+            reward_xp=rewards.get("xp", 0),
+            reward_gold=rewards.get("gold", 0),
+            reward_items=tuple(rewards.get("items", [])),
+            giver_npc=data.get("giver_npc", ""),
+            completion_text=data.get("completion_text", "Quest completed!")
         )
+
+def freeze_data(value: Any) -> Any:
+    """Read-only copy of JSON data (dicts become mapping proxies, lists tuples)."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze_data(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze_data(item) for item in value)
+    return value
+
+@dataclass(frozen=True, slots=True)
+class EnemyTemplate:
+    """Immutable enemy definition shared by every Enemy of that kind.
     
-    def is_completed(self) -> bool:
-        """Check if all quest objectives are completed."""
-        return all(obj.get("completed", False) for obj in self.objectives)
+    Built once per data load; an Enemy only carries its own health and
+    defending flag on top of it.
+    """
+    enemy_id: str
+    name: str
+    description: str
+    health: int
+    max_health: int
+    attack: int
+    defense: int
+    agility: int
+    ai_pattern: Mapping[str, float]
+    loot_table: Mapping[str, Any]
     
-    def get_progress_text(self) -> str:
-        """Get text showing quest progress."""
-        lines = [f"📜 {self.title}"]
-        lines.append(f"   {self.description}")
-        
-        for i, obj in enumerate(self.objectives, 1):
-            status = "✅" if obj.get("completed", False) else "❌"
-            lines.append(f"   {status} {obj['description']}")
+    @classmethod
+    def from_data(cls, enemy_id: str, data: Dict[str, Any]) -> 'EnemyTemplate':
+        """Create enemy template from enemies.json data."""
+        return cls(
+            enemy_id=enemy_id,
+            name=data["name"],
+            description=data["description"],
+            health=data["health"],
+            max_health=data["max_health"],
+            attack=data["attack"],
+            defense=data["defense"],
+            agility=data["agility"],
+            ai_pattern=freeze_data(data["ai_pattern"]),
+            loot_table=freeze_data(data["loot_table"])
+        )
+
+class Inventory:
+    """Counted multiset of item ids backing Player.inventory.
+    
+    Iteration, len() and membership behave like the old list of ids (one entry
+    per copy), while adding, removing and counting are O(1). Distinct ids keep
+    the order they were first added in. Per-type views are cached until the set
+    of distinct ids (or the item data) changes.
+    """
+    __slots__ = ("_counts", "_total", "_views", "_views_source")
+    
+    def __init__(self, items: Iterable[str] = ()):
+        self._counts: Counter = Counter()
+        self._total = 0
+        self._views: Dict[Tuple[str, ...], List[str]] = {}
+        self._views_source: Optional[Dict[str, Any]] = None
+        for item_id in items:
+            self.add(item_id)
+    
+    def add(self, item_id: str, count: int = 1) -> None:
+        """Add copies of an item."""
+        if item_id not in self._counts:
+            self._views.clear()
+        self._counts[item_id] += count
+        self._total += count
+    
+    def remove(self, item_id: str, count: int = 1) -> bool:
+        """Remove copies of an item.
         
-        return "\n".join(lines)
+        Returns:
+            bool: False (and nothing removed) if there aren't enough copies
+        """
+        held = self._counts.get(item_id, 0)
+        if held < count or count <= 0:
+            return False
+        if held == count:
+            del self._counts[item_id]
+            self._views.clear()
+        else:
+            self._counts[item_id] = held - count
+        self._total -= count
+        return True
+    
+    def count(self, item_id: str) -> int:
+        """Number of copies of an item."""
+        return self._counts.get(item_id, 0)
+    
+    def distinct(self) -> List[str]:
+        """Distinct item ids, in first-added order."""
+        return list(self._counts)
+    
+    def items(self):
+        """(item_id, count) pairs, in first-added order."""
+        return self._counts.items()
+    
+    def of_type(self, *item_types: str) -> List[str]:
+        """Distinct item ids whose items_data type is one of item_types (cached)."""
+        if self._views_source is not items_data:
+            self._views.clear()
+            self._views_source = items_data
+        view = self._views.get(item_types)
+        if view is None:
+            view = [item_id for item_id in self._counts
+                    if items_data.get(item_id, {}).get("type") in item_types]
+            self._views[item_types] = view
+        return view
+    
+    def equipment(self) -> List[str]:
+        """Distinct weapons, armor and other wearables carried."""
+        return self.of_type(*Config.EQUIPMENT_TYPES)
+    
+    def consumables(self) -> List[str]:
+        """Distinct consumables carried."""
+        return self.of_type(*Config.CONSUMABLE_TYPES)
+    
+    def to_list(self) -> List[str]:
+        """Expand to the list-of-ids format used in save files."""
+        return list(self._counts.elements())
+    
+    def __contains__(self, item_id: object) -> bool:
+        return item_id in self._counts
+    
+    def __len__(self) -> int:
+        return self._total
+    
+    def __iter__(self):
+        return self._counts.elements()
+    
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Inventory):
+            return self._counts == other._counts
+        if isinstance(other, list):
+            return self._counts == Counter(other)
+        return NotImplemented
+    
+    def __repr__(self) -> str:
+        return f"Inventory({dict(self._counts)})"
 
-@dataclass
+def next_level_xp(level: int) -> Optional[int]:
+    """XP a player of this level needs to level up, or None at the maximum level."""
+    if level >= len(Config.XP_THRESHOLDS):
+        return None
+    return Config.XP_THRESHOLDS[level - 1]
+
+@dataclass(slots=True)
 class Player:
     """Player character data structure."""
     name: str = "Hero"
     current_room: str = "tavern"
-    inventory: List[str] = field(default_factory=list)
+    inventory: Inventory = field(default_factory=Inventory)
     # max_inventory: int = float('inf')  # Unlimited inventory
     
     # Combat stats
@@ -176,6 +890,7 @@ class Player:
     active_quests: List[str] = field(default_factory=list)
     completed_quests: List[str] = field(default_factory=list)
     quest_progress: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    quests: Optional['QuestTracker'] = field(default=None, init=False, repr=False, compare=False)
     
     # Faction & Relationship System
     faction_reputation: Dict[str, int] = field(default_factory=dict)  # faction_id -> reputation (-100 to +100)
@@ -190,6 +905,19 @@ class Player:
     equipped_weapon: Optional[str] = None
     equipped_armor: Optional[str] = None
     
+    def __post_init__(self):
+        # Save files store the inventory as a plain list of ids
+        if not isinstance(self.inventory, Inventory):
+            self.inventory = Inventory(self.inventory)
+        self.quests = QuestTracker(self)
+        self.quests.rebuild()
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the player's state for a save file."""
+        data = {f.name: getattr(self, f.name) for f in fields(self) if f.init}
+        data["inventory"] = self.inventory.to_list()
+        return data
+    
     def can_carry_more(self) -> bool:
         """Check if player can carry more items."""
         return True  # Unlimited inventory
@@ -201,8 +929,9 @@ class Player:
             bool: True if item was added, False if inventory full
         """
         if self.can_carry_more():
-            self.inventory.append(item_id)
-            log_event("INVENTORY", f"Added {item_id} to inventory")
+            self.inventory.add(item_id)
+            self.quests.on_item_change(item_id)
+            log_event("INVENTORY", "Added %s to inventory", item_id, level="DEBUG")
             return True
         return False
     
@@ -212,9 +941,9 @@ class Player:
         Returns:
             bool: True if item was removed, False if not found
         """
-        if item_id in self.inventory:
-            self.inventory.remove(item_id)
-            log_event("INVENTORY", f"Removed {item_id} from inventory")
+        if self.inventory.remove(item_id):
+            self.quests.on_item_change(item_id)
+            log_event("INVENTORY", "Removed %s from inventory", item_id, level="DEBUG")
             return True
         return False
     
@@ -233,26 +962,26 @@ class Player:
         
         return base_attack + weapon_bonus
     
-    def get_defense_power(self) -> int:
-        """Calculate total defense including equipment and defending state."""
-        base_defense = self.defense
+    def get_base_defense(self) -> int:
+        """Calculate defense including equipment, without the defending bonus."""
         armor_bonus = 0
-        defend_bonus = 0
-        
         if self.equipped_armor and self.equipped_armor in items_data:
             armor_stats = items_data[self.equipped_armor].get("stats", {})
             armor_bonus = armor_stats.get("defense", 0)
-        
+        return self.defense + armor_bonus
+    
+    def get_defense_power(self) -> int:
+        """Calculate total defense including equipment and defending state."""
+        defense = self.get_base_defense()
         if self.defending:
-            defend_bonus = int((base_defense + armor_bonus) * Config.DEFEND_BONUS)
-        
-        return base_defense + armor_bonus + defend_bonus
+            return defense + int(defense * Config.DEFEND_BONUS)
+        return defense
     
     def take_damage(self, damage: int) -> int:
         """Apply damage to player, return actual damage taken."""
         actual_damage = max(1, damage - self.get_defense_power())  # Always at least 1 damage
         self.health = max(0, self.health - actual_damage)
-        log_event("COMBAT", f"Player took {actual_damage} damage (health: {self.health}/{self.max_health})")
+        log_event("COMBAT", "Player took %d damage (health: %d/%d)", actual_damage, self.health, self.max_health, level="DEBUG")
         return actual_damage
     
     def heal(self, amount: int) -> int:
@@ -260,7 +989,7 @@ class Player:
         old_health = self.health
         self.health = min(self.max_health, self.health + amount)
         actual_heal = self.health - old_health
-        log_event("COMBAT", f"Player healed {actual_heal} health (health: {self.health}/{self.max_health})")
+        log_event("COMBAT", "Player healed %d health (health: %d/%d)", actual_heal, self.health, self.max_health, level="DEBUG")
         return actual_heal
     
     def is_alive(self) -> bool:
@@ -305,13 +1034,12 @@ class Player:
     def gain_experience(self, amount: int) -> bool:
         """Add experience and check for level up."""
         self.experience += amount
-        log_event("PROGRESSION", f"Player gained {amount} XP (total: {self.experience})")
+        log_event("PROGRESSION", "Player gained %d XP (total: %d)", amount, self.experience)
         
         # Check for level up
-        if self.level <= len(Config.XP_THRESHOLDS):
-            threshold = Config.XP_THRESHOLDS[self.level - 1]
-            if self.experience >= threshold:
-                return self.level_up()
+        threshold = next_level_xp(self.level)
+        if threshold is not None and self.experience >= threshold:
+            return self.level_up()
         
         return False
     
@@ -343,7 +1071,7 @@ class Player:
         print("You feel refreshed and healed to full health!")
         print("="*50)
         
-        log_event("PROGRESSION", f"Player leveled up from {old_level} to {self.level}")
+        log_event("PROGRESSION", "Player leveled up from %d to %d", old_level, self.level, new_level=self.level)
         return True
     
     def can_afford(self, cost: int) -> bool:
@@ -354,14 +1082,19 @@ class Player:
         """Spend gold if player has enough."""
         if self.can_afford(amount):
             self.gold -= amount
-            log_event("ECONOMY", f"Player spent {amount} gold (remaining: {self.gold})")
+            log_event("ECONOMY", "Player spent %d gold (remaining: %d)", amount, self.gold, level="DEBUG")
             return True
         return False
     
     def earn_gold(self, amount: int) -> None:
         """Add gold to player's purse."""
         self.gold += amount
-        log_event("ECONOMY", f"Player earned {amount} gold (total: {self.gold})")
+        log_event("ECONOMY", "Player earned %d gold (total: %d)", amount, self.gold, level="DEBUG")
+    
+    def enter_room(self, room_id: str) -> None:
+        """Set the player's location and record visits for quest objectives."""
+        self.current_room = room_id
+        self.quests.on_visit(room_id)
     
     def can_accept_quest(self) -> bool:
         """Check if player can accept more quests."""
@@ -377,7 +1110,8 @@ class Player:
         
         self.active_quests.append(quest_id)
         self.quest_progress[quest_id] = {}
-        log_event("QUEST", f"Player accepted quest: {quest_id}")
+        self.quests.track(quest_id)
+        log_event("QUEST", "Player accepted quest: %s", quest_id, quest=quest_id)
         return True
     
     def complete_quest(self, quest_id: str) -> bool:
@@ -387,12 +1121,13 @@ class Player:
         
         self.active_quests.remove(quest_id)
         self.completed_quests.append(quest_id)
+        self.quests.untrack(quest_id)
         
         # Clean up progress tracking
         if quest_id in self.quest_progress:
             del self.quest_progress[quest_id]
         
-        log_event("QUEST", f"Player completed quest: {quest_id}")
+        log_event("QUEST", "Player completed quest: %s", quest_id, quest=quest_id)
         return True
     
     def update_quest_progress(self, quest_id: str, objective_key: str, value: Any) -> None:
@@ -401,7 +1136,7 @@ class Player:
             self.quest_progress[quest_id] = {}
         
         self.quest_progress[quest_id][objective_key] = value
-        log_event("QUEST", f"Quest progress updated: {quest_id} - {objective_key}: {value}")
+        log_event("QUEST", "Quest progress updated: %s - %s: %s", quest_id, objective_key, value, level="DEBUG")
     
     def get_quest_progress(self, quest_id: str, objective_key: str, default: Any = 0) -> Any:
         """Get current progress on a quest objective."""
@@ -422,7 +1157,7 @@ class Player:
             "reason": reason
         })
         
-        log_event("FACTION", f"Reputation with {faction_id}: {current} -> {new_rep} ({reason})")
+        log_event("FACTION", "Reputation with %s: %d -> %d (%s)", faction_id, current, new_rep, reason, faction=faction_id)
     
     def get_faction_reputation(self, faction_id: str) -> int:
         """Get current reputation with a faction."""
@@ -447,7 +1182,7 @@ class Player:
         new_rel = max(-100, min(100, current + change))
         self.npc_relationships[npc_id] = new_rel
         
-        log_event("NPC_RELATIONSHIP", f"Relationship with {npc_id}: {current} -> {new_rel} ({reason})")
+        log_event("NPC_RELATIONSHIP", "Relationship with %s: %d -> %d (%s)", npc_id, current, new_rel, reason, npc=npc_id)
     
     def get_npc_relationship(self, npc_id: str) -> int:
         """Get current relationship with an NPC."""
@@ -470,26 +1205,22 @@ class Player:
     def set_world_flag(self, flag_name: str, value: bool) -> None:
         """Set a global world state flag."""
         self.world_flags[flag_name] = value
-        log_event("WORLD_FLAG", f"Set {flag_name} = {value}")
+        log_event("WORLD_FLAG", "Set %s = %s", flag_name, value)
     
     def get_world_flag(self, flag_name: str, default: bool = False) -> bool:
         """Get a global world state flag."""
         return self.world_flags.get(flag_name, default)
 
 # === [GAME ENTITIES] ===
-@dataclass
+@dataclass(slots=True)
 class Enemy:
-    """Enemy entity with combat capabilities."""
-    enemy_id: str
-    name: str
-    description: str
+    """Enemy entity with combat capabilities.
+    
+    Stats, AI pattern and loot table are read from the shared EnemyTemplate;
+    only health and the defending flag belong to this enemy.
+    """
+    template: EnemyTemplate
     health: int
-    max_health: int
-    attack: int
-    defense: int
-    agility: int
-    ai_pattern: Dict[str, float]
-    loot_table: Dict[str, Any]
     
     # Combat state
     defending: bool = False
@@ -497,32 +1228,38 @@ class Enemy:
     @classmethod
     def from_template(cls, enemy_id: str) -> Optional['Enemy']:
         """Create enemy from template data."""
-        if enemy_id not in enemies_data:
+        template = enemy_templates.get(enemy_id)
+        if template is None:
             return None
-        
-        template = enemies_data[enemy_id]
-        return cls(
-            enemy_id=enemy_id,
-            name=template["name"],
-            description=template["description"],
-            health=template["health"],
-            max_health=template["max_health"],
-            attack=template["attack"],
-            defense=template["defense"],
-            agility=template["agility"],
-            ai_pattern=template["ai_pattern"],
-            loot_table=template["loot_table"]
-        )
+        return cls(template=template, health=template.health)
+    
+    def reset(self, template: EnemyTemplate) -> None:
+        """Turn this enemy into a fresh one of the given kind (for EnemyPool)."""
+        self.template = template
+        self.health = template.health
+        self.defending = False
+    
+    enemy_id = property(lambda self: self.template.enemy_id)
+    name = property(lambda self: self.template.name)
+    description = property(lambda self: self.template.description)
+    max_health = property(lambda self: self.template.max_health)
+    attack = property(lambda self: self.template.attack)
+    defense = property(lambda self: self.template.defense)
+    agility = property(lambda self: self.template.agility)
+    ai_pattern = property(lambda self: self.template.ai_pattern)
+    loot_table = property(lambda self: self.template.loot_table)
+    
+    def get_defense_power(self) -> int:
+        """Calculate defense including defending state."""
+        if self.defending:
+            return int(self.defense * (1 + Config.DEFEND_BONUS))
+        return self.defense
     
     def take_damage(self, damage: int) -> int:
         """Apply damage to enemy, return actual damage taken."""
-        defense_value = self.defense
-        if self.defending:
-            defense_value = int(defense_value * (1 + Config.DEFEND_BONUS))
-        
-        actual_damage = max(1, damage - defense_value)
+        actual_damage = max(1, damage - self.get_defense_power())
         self.health = max(0, self.health - actual_damage)
-        log_event("COMBAT", f"{self.name} took {actual_damage} damage (health: {self.health}/{self.max_health})")
+        log_event("COMBAT", "%s took %d damage (health: %d/%d)", self.name, actual_damage, self.health, self.max_health, level="DEBUG")
         return actual_damage
     
     def is_alive(self) -> bool:
@@ -533,14 +1270,14 @@ class Enemy:
         """Check if enemy is at low health."""
         return self.health <= self.max_health * self.ai_pattern.get("flee_threshold", 0.3)
     
-    def choose_action(self) -> str:
-        """AI chooses an action based on patterns."""
+    def choose_action(self, rng: random.Random) -> str:
+        """AI chooses an action based on patterns (rng: the session's ai stream)."""
         # Check if should flee when low health
-        if self.is_low_health() and random.random() < self.ai_pattern.get("flee_chance", 0):
+        if self.is_low_health() and rng.random() < self.ai_pattern.get("flee_chance", 0):
             return "flee"
         
         # Choose based on AI pattern
-        rand = random.random()
+        rand = rng.random()
         attack_chance = self.ai_pattern.get("attack_chance", 0.8)
         defend_chance = self.ai_pattern.get("defend_chance", 0.2)
         
@@ -551,6 +1288,12 @@ class Enemy:
         else:
             return "attack"  # Default fallback
     
+    def get_defend_probability(self) -> float:
+        """Chance choose_action picks defend once it has decided not to flee."""
+        attack_chance = self.ai_pattern.get("attack_chance", 0.8)
+        defend_chance = self.ai_pattern.get("defend_chance", 0.2)
+        return max(0.0, min(1.0, attack_chance + defend_chance) - attack_chance)
+    
     def get_health_bar(self) -> str:
         """Get visual health bar representation."""
         if self.max_health == 0:
@@ -563,23 +1306,91 @@ class Enemy:
         bar = "█" * filled + "-" * empty
         return f"HP: [{bar}] {self.health}/{self.max_health}"
     
-    def generate_loot(self) -> Dict[str, Any]:
-        """Generate loot based on loot table."""
+    def generate_loot(self, rng: random.Random) -> Dict[str, Any]:
+        """Generate loot based on loot table, rolled on rng (the caller passes the session's "loot" stream)."""
         loot = {"gold": 0, "items": []}
         
         # Generate gold
         gold_min = self.loot_table.get("gold_min", 0)
         gold_max = self.loot_table.get("gold_max", 0)
         if gold_max > 0:
-            loot["gold"] = random.randint(gold_min, gold_max)
+            loot["gold"] = rng.randint(gold_min, gold_max)
         
         # Generate items
         for item_chance in self.loot_table.get("items", []):
-            if random.random() < item_chance["chance"]:
+            if rng.random() < item_chance["chance"]:
                 loot["items"].append(item_chance["item"])
         
         return loot
 
+class EnemyPool:
+    """Spare Enemy objects, reused by start_combat instead of allocating.
+    
+    Fights return their enemy with release() when they end (victory, escape
+    or the player's death). At most max_size spares are kept.
+    """
+    
+    def __init__(self, max_size: int = Config.ENEMY_POOL_SIZE):
+        self.max_size = max_size
+        self.spare: List[Enemy] = []
+        self.created = 0
+        self.reused = 0
+    
+    def acquire(self, enemy_id: str) -> Optional[Enemy]:
+        """Get a full-health enemy of the given kind (None if unknown)."""
+        template = enemy_templates.get(enemy_id)
+        if template is None:
+            return None
+        if self.spare:
+            enemy = self.spare.pop()
+            enemy.reset(template)
+            self.reused += 1
+            return enemy
+        self.created += 1
+        return Enemy(template=template, health=template.health)
+    
+    def release(self, enemy: Optional[Enemy]) -> None:
+        """Return an enemy that is no longer referenced by any fight."""
+        if enemy is not None and len(self.spare) < self.max_size:
+            self.spare.append(enemy)
+    
+    def clear(self) -> None:
+        """Drop the spares (they would keep old templates alive after a reload)."""
+        self.spare.clear()
+
+enemy_pool = EnemyPool()
+
+def measure_instance_bytes(factory, count: int) -> float:
+    """Average traced bytes held per object while count of them are alive."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        instances = [factory(index) for index in range(count)]
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del instances
+    return (after - before) / count
+
+def run_memory_benchmark(counts: Tuple[int, ...] = Config.BENCH_MEMORY_COUNTS) -> int:
+    """Report bytes per live Player and Enemy at each population size.
+    
+    Returns:
+        int: process exit code
+    """
+    enemy_ids = list(enemy_templates)
+    if not enemy_ids:
+        print("No enemies loaded.")
+        return 1
+    
+    print(f"{'Instances':>10}{'Player bytes':>15}{'Enemy bytes':>14}")
+    for count in counts:
+        player_bytes = measure_instance_bytes(lambda index: Player(), count)
+        enemy_bytes = measure_instance_bytes(lambda index: Enemy.from_template(enemy_ids[index % len(enemy_ids)]), count)
+        print(f"{count:>10}{player_bytes:>15.0f}{enemy_bytes:>14.0f}")
+    print(f"Enemy templates ({len(enemy_ids)}) are shared and not counted per enemy.")
+    return 0
+
 @dataclass
 class CombatState:
     """Manages active combat state."""
@@ -587,21 +1398,141 @@ class CombatState:
     turn_count: int = 0
     player_initiative: bool = True
     
-    def is_active(self) -> bool:
+    def is_active(self, player: 'Player') -> bool:
         """Check if combat is still active."""
-        return self.enemy.is_alive() and game_state['player'].is_alive()
+        return self.enemy.is_alive() and player.is_alive()
+
+class RoomTextStore:
+    """Lazy store for long room text (descriptions and details).
+    
+    Text fields are written to a data file as one JSON blob per room and
+    memory-mapped; a byte-offset index locates each room's blob, and an LRU
+    cache keeps recently visited rooms decoded. If the data file cannot be
+    written, the text is kept in memory instead.
+    """
+    
+    def __init__(self, cache_size: int):
+        self.cache_size = cache_size
+        self.index: Dict[str, List[int]] = {}  # room_id -> [offset, length]
+        self._file = None
+        self._mmap: Optional[mmap.mmap] = None
+        self._inline: Optional[Dict[str, Dict[str, Any]]] = None
+        self._cache: OrderedDict = OrderedDict()
+    
+    def build(self, path: str, text_by_room: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Write the text data file and open it.
+        
+        Returns:
+            dict: {'index': {...}, 'size': int} to store alongside the room table
+        """
+        self.close()
+        index = {}
+        chunks = []
+        offset = 0
+        for room_id, text in text_by_room.items():
+            blob = json.dumps(text, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            index[room_id] = [offset, len(blob)]
+            chunks.append(blob)
+            offset += len(blob)
+        
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = path + ".tmp"
+            with open(temp_path, "wb") as f:
+                f.write(b"".join(chunks))
+            os.replace(temp_path, path)
+        except OSError as e:
+            log_event("ERROR", "Failed to write room text file: %s", str(e), level="ERROR")
+            self._inline = dict(text_by_room)
+            return {}
+        
+        info = {"index": index, "size": offset}
+        if not self.open(path, info):
+            self._inline = dict(text_by_room)
+            return {}
+        return info
+    
+    def open(self, path: str, info: Dict[str, Any]) -> bool:
+        """Map an existing text data file described by build()'s info.
+        
+        Returns:
+            bool: False if the file is missing or does not match the info
+        """
+        self.close()
+        try:
+            if os.path.getsize(path) != info.get("size"):
+                return False
+            self._file = open(path, "rb")
+            if info["size"] > 0:
+                self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError, KeyError):
+            self.close()
+            return False
+        self.index = info["index"]
+        return True
+    
+    def close(self) -> None:
+        """Release the mapped file and forget all cached text."""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self.index = {}
+        self._inline = None
+        self._cache.clear()
+    
+    def peek(self, room_id: str) -> Dict[str, Any]:
+        """Read a room's text fields without touching the LRU cache."""
+        if self._inline is not None:
+            return self._inline.get(room_id, {})
+        if room_id in self.index and self._mmap is not None:
+            offset, length = self.index[room_id]
+            return json.loads(self._mmap[offset:offset + length])
+        return {}
+    
+    def get(self, room_id: str) -> Dict[str, Any]:
+        """Get the text fields for a room (empty dict if unknown)."""
+        cached = self._cache.get(room_id)
+        if cached is not None:
+            self._cache.move_to_end(room_id)
+            return cached
+        
+        text = self.peek(room_id)
+        self._cache[room_id] = text
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return text
+
+room_text = RoomTextStore(Config.ROOM_TEXT_CACHE_SIZE)
 
 class Room:
-    """Room entity with navigation and interaction."""
+    """Room entity with navigation and interaction.
+    
+    Hot fields (name, exits, items, npcs) are copied from the room table;
+    description and details are read on demand from the room text store.
+    """
     
     def __init__(self, room_id: str, data: Dict[str, Any]):
         self.id = room_id
         self.name = data.get("name", "Unknown Room")
-        self.description = data.get("description", "An empty room.")
-        self.details = data.get("details", {})
         self.exits = data.get("exits", {})
         self.items = data.get("items", []).copy()  # Copy to avoid modifying original
         self.npcs = data.get("npcs", [])
+        self.dirty = False  # True once the room differs from its template
+        # Text passed in directly (e.g. a full JSON room) overrides the store
+        self._text = {key: data[key] for key in Config.ROOM_TEXT_FIELDS if key in data} or None
+    
+    @property
+    def description(self) -> str:
+        text = self._text if self._text is not None else room_text.get(self.id)
+        return text.get("description", "An empty room.")
+    
+    @property
+    def details(self) -> Dict[str, str]:
+        text = self._text if self._text is not None else room_text.get(self.id)
+        return text.get("details", {})
     
     def get_full_description(self) -> str:
         """Get the complete room description with items and exits."""
@@ -662,37 +1593,115 @@ class Room:
         return self.exits.get(direction.lower())
     
     def add_item(self, item_id: str):
-        """Add item to room."""
-        if item_id not in self.items:
-            self.items.append(item_id)
-            log_event("ROOM", f"Added {item_id} to {self.id}")
+        """Add item to room (rooms hold repeats, like inventories)."""
+        self.items.append(item_id)
+        self.dirty = True
+        log_event("ROOM", "Added %s to %s", item_id, self.id, level="DEBUG")
     
     def remove_item(self, item_id: str) -> bool:
         """Remove item from room."""
         if item_id in self.items:
             self.items.remove(item_id)
-            log_event("ROOM", f"Removed {item_id} from {self.id}")
+            self.dirty = True
+            log_event("ROOM", "Removed %s from %s", item_id, self.id, level="DEBUG")
             return True
         return False
     
     def has_item(self, item_id: str) -> bool:
         """Check if room contains item."""
         return item_id in self.items
+    
+    def get_diff(self, templates: Optional[Dict[str, Any]] = None) -> Dict[str, List[str]]:
+        """Get how this room's items differ from its template.
+        
+        templates is the room table the room was built from (rooms_data if not given).
+        
+        Returns:
+            dict: {'added': [...], 'removed': [...]} item ids (with repeats)
+        """
+        templates = rooms_data if templates is None else templates
+        template_items = Counter(templates.get(self.id, {}).get("items", []))
+        current_items = Counter(self.items)
+        return {
+            "added": list((current_items - template_items).elements()),
+            "removed": list((template_items - current_items).elements())
+        }
+    
+    def apply_diff(self, diff: Dict[str, List[str]]) -> None:
+        """Replay a diff from get_diff() onto this room."""
+        for item_id in diff.get("removed", []):
+            if item_id in self.items:
+                self.items.remove(item_id)
+        self.items.extend(diff.get("added", []))
+        self.dirty = bool(diff.get("added") or diff.get("removed"))
+
+class WorldState:
+    """Registry of long-lived Room instances.
+    
+    Rooms are built from their template the first time they are visited and
+    then kept, so item changes persist and lookups don't copy anything. Only
+    dirty rooms are written to save files, as diffs against their template.
+    """
+    
+    def __init__(self):
+        self.rooms: Dict[str, Room] = {}
+    
+    def get_room(self, room_id: str) -> Optional[Room]:
+        """Get the live Room for an id, creating it on first use."""
+        room = self.rooms.get(room_id)
+        if room is None and room_id in rooms_data:
+            room = Room(room_id, rooms_data[room_id])
+            self.rooms[room_id] = room
+        return room
+    
+    def get_changes(self) -> Dict[str, Dict[str, List[str]]]:
+        """Get the diff of every room that differs from its template."""
+        changes = {}
+        for room_id, room in self.rooms.items():
+            if room.dirty:
+                diff = room.get_diff()
+                if diff["added"] or diff["removed"]:
+                    changes[room_id] = diff
+        return changes
+    
+    def apply_changes(self, changes: Dict[str, Dict[str, List[str]]]) -> None:
+        """Restore room diffs from get_changes() (e.g. from a save file)."""
+        for room_id, diff in changes.items():
+            room = self.get_room(room_id)
+            if room:
+                room.apply_diff(diff)
+    
+    def refresh(self, room_ids: List[str], old_templates: Dict[str, Any]) -> None:
+        """Rebuild rooms whose template changed, keeping the player's changes.
+        
+        old_templates is the room table the live rooms were built from; each
+        room's diff is taken against it and replayed onto the new template.
+        """
+        for room_id in room_ids:
+            room = self.rooms.pop(room_id, None)
+            if room and room.dirty and room_id in rooms_data:
+                diff = room.get_diff(old_templates)
+                self.get_room(room_id).apply_diff(diff)
+    
+    def reset(self) -> None:
+        """Forget every live room (they are recreated from templates on demand)."""
+        self.rooms.clear()
+
 
 # === [COMMAND PARSER] ===
 def normalize_input(text: str) -> str:
     """Clean and normalize user input."""
     return text.strip().lower()
 
-def get_available_commands() -> List[str]:
-    """Return commands valid in current game state."""
-    if game_state['mode'] == 'exploration':
+def get_available_commands(mode: str) -> List[str]:
+    """Return commands valid in the given game mode."""
+    if mode == 'exploration':
         return ['go', 'north', 'south', 'east', 'west', 'n', 's', 'e', 'w',
                 'look', 'l', 'examine', 'x', 'take', 'drop', 'inventory', 'i', 'use',
                 'stats', 'help', 'quit', 'save', 'load', 'debug', 'buy', 'sell', 'talk', 'heal',
-                'quests', 'accept', 'complete', 'recall', 'reputation']
-    elif game_state['mode'] == 'combat':
-        return ['attack', 'defend', 'use', 'flee', 'help', 'stats', 'a', 'd', 'u', 'f']
+                'quests', 'accept', 'complete', 'recall', 'reputation', 'consider', 'bestiary']
+    elif mode == 'combat':
+        return ['attack', 'defend', 'use', 'flee', 'help', 'stats', 'consider', 'a', 'd', 'u', 'f']
     else:
         return ['help', 'quit']
 
@@ -706,8 +1715,8 @@ def expand_aliases(command: str) -> str:
     }
     return aliases.get(command, command)
 
-def parse_command(input_text: str) -> Dict[str, Any]:
-    """Parse player input into action and target.
+def parse_command(input_text: str, mode: str = 'exploration') -> Dict[str, Any]:
+    """Parse player input into action and target (mode picks the suggestions for unknown commands).
     
     Returns:
         dict: {'action': str, 'target': str, 'valid': bool, 'error': str}
@@ -762,9 +1771,7 @@ def parse_command(input_text: str) -> Dict[str, Any]:
         return {'action': 'inventory', 'target': '', 'valid': True, 'error': ''}
     
     elif action == 'use':
-        if not target:
-            return {'action': 'use', 'target': '', 'valid': False, 'error': 'Use what?'}
-        return {'action': 'use', 'target': target, 'valid': True, 'error': ''}
+        return {'action': 'use', 'target': target, 'valid': True, 'error': ''}  # No target lists usable items
     
     # Combat commands
     elif action == 'attack':
@@ -832,10 +1839,16 @@ def parse_command(input_text: str) -> Dict[str, Any]:
     elif action == 'reputation':
         return {'action': 'reputation', 'target': target, 'valid': True, 'error': ''}
     
+    elif action == 'consider':
+        return {'action': 'consider', 'target': target, 'valid': True, 'error': ''}
+    
+    elif action == 'bestiary':
+        return {'action': 'bestiary', 'target': target, 'valid': True, 'error': ''}
+    
     # Unknown command
     else:
         # Suggest similar commands
-        available = get_available_commands()
+        available = get_available_commands(mode)
         suggestions = [cmd for cmd in available if cmd.startswith(action[:2])]
         
         error_msg = f"I don't understand '{action}'."
@@ -847,23 +1860,20 @@ def parse_command(input_text: str) -> Dict[str, Any]:
         return {'action': action, 'target': target, 'valid': False, 'error': error_msg}
 
 # === [WORLD NAVIGATION] ===
-def get_current_room() -> Optional[Room]:
+def get_current_room(session: 'GameSession') -> Optional[Room]:
     """Get the current room object."""
-    current_room_id = game_state['current_room']
-    if current_room_id in rooms_data:
-        return Room(current_room_id, rooms_data[current_room_id])
-    return None
+    return session.world.get_room(session.current_room)
 
-def move_player(direction: str) -> None:
+def move_player(session: 'GameSession', direction: str) -> None:
     """Move player to connected room.
     
     Side effects:
-        - Updates game_state['current_room']
+        - Updates session.current_room
         - Updates player.current_room
         - Logs movement event
         - May trigger random encounters
     """
-    current_room = get_current_room()
+    current_room = get_current_room(session)
     if not current_room:
         print("Error: Current room not found!")
         return
@@ -871,33 +1881,32 @@ def move_player(direction: str) -> None:
     if current_room.can_go(direction):
         new_room_id = current_room.get_exit(direction)
         if new_room_id in rooms_data:
-            game_state['current_room'] = new_room_id
-            game_state['player'].current_room = new_room_id
-            log_event("MOVEMENT", f"Player moved {direction} to {new_room_id}")
+            session.current_room = new_room_id
+            session.player.enter_room(new_room_id)
+            log_event("MOVEMENT", "Player moved %s to %s", direction, new_room_id, room=new_room_id)
             
             # Show new room
-            display_room()
+            display_room(session)
             
             # Check for random encounters
-            if check_for_encounter():
-                possible_enemies = get_possible_enemies(new_room_id) if new_room_id else []
-                if possible_enemies:
-                    enemy_id = random.choice(possible_enemies)
+            if check_for_encounter(session):
+                enemy_id = choose_encounter(new_room_id, session.get_rng("encounter"))
+                if enemy_id:
                     print(f"\nAs you explore, you hear footsteps behind you...")
-                    start_combat(enemy_id)
+                    start_combat(session, enemy_id)
         else:
             print(f"That path leads to an unknown area.")
     else:
         print(f"You can't go {direction} from here.")
 
-def recall_to_town() -> None:
+def recall_to_town(session: 'GameSession') -> None:
     """Fast travel back to town square."""
     # Check if already in town
-    if game_state['current_room'] == 'town_square':
+    if session.current_room == 'town_square':
         print("You're already in the town square!")
         return
     
-    player = game_state['player']
+    player = session.player
     
     # Add some flavor text and a small cost
     recall_cost = 10  # 10 gold cost for convenience
@@ -908,32 +1917,34 @@ def recall_to_town() -> None:
         return
     
     # Confirm the recall
-    print(f"Use magical recall to return to town square for {recall_cost} gold? (y/n)")
-    choice = input("> ").strip().lower()
+    ask_confirmation(session, f"Use magical recall to return to town square for {recall_cost} gold? (y/n)",
+                     lambda session: complete_recall(session, recall_cost),
+                     lambda session: print("You decide to stay where you are."))
+
+def complete_recall(session: 'GameSession', recall_cost: int) -> None:
+    """Charge for and perform a confirmed recall to the town square."""
+    player = session.player
     
-    if choice in ['y', 'yes']:
-        # Charge the gold
-        player.spend_gold(recall_cost)
-        
-        # Teleport to town
-        old_room = game_state['current_room'] 
-        game_state['current_room'] = 'town_square'
-        player.current_room = 'town_square'
-        
-        print("\n✨ A magical portal swirls around you...")
-        print("The world blurs and shifts...")
-        print("You feel the familiar cobblestones beneath your feet!")
-        
-        log_event("MOVEMENT", f"Player recalled from {old_room} to town_square")
-        
-        # Show the town square
-        display_room()
-    else:
-        print("You decide to stay where you are.")
+    # Charge the gold
+    player.spend_gold(recall_cost)
+    
+    # Teleport to town
+    old_room = session.current_room 
+    session.current_room = 'town_square'
+    player.enter_room('town_square')
+    
+    print("\n✨ A magical portal swirls around you...")
+    print("The world blurs and shifts...")
+    print("You feel the familiar cobblestones beneath your feet!")
+    
+    log_event("MOVEMENT", "Player recalled from %s to town_square", old_room, room="town_square")
+    
+    # Show the town square
+    display_room(session)
 
-def examine_object(object_name: str) -> None:
+def examine_object(session: 'GameSession', object_name: str) -> None:
     """Examine an object in the current room."""
-    current_room = get_current_room()
+    current_room = get_current_room(session)
     if not current_room:
         print("Error: Current room not found!")
         return
@@ -942,51 +1953,136 @@ def examine_object(object_name: str) -> None:
     description = current_room.examine_object(object_name)
     if description:
         print(description)
-        log_event("EXAMINE", f"Player examined {object_name} in {current_room.id}")
+        log_event("EXAMINE", "Player examined %s in %s", object_name, current_room.id, level="DEBUG")
         return
     
     # Check if it's an item in the room
-    item_id = find_item_by_name(object_name, current_room.items)
-    if item_id and item_id in items_data:
+    matches = resolve_item_name(object_name, current_room.items)
+    if len(matches) == 1:
+        item_id = matches[0]
         item_desc = items_data[item_id].get("description", f"A {items_data[item_id].get('name', item_id)}.")
         print(item_desc)
-        log_event("EXAMINE", f"Player examined item {item_id}")
+        log_event("EXAMINE", "Player examined item %s", item_id, level="DEBUG")
         return
     
     # Check if it's an item in inventory
-    player = game_state['player']
-    item_id = find_item_by_name(object_name, player.inventory)
-    if item_id and item_id in items_data:
-        item_desc = items_data[item_id].get("description", f"A {items_data[item_id].get('name', item_id)}.")
-        print(item_desc)
-        log_event("EXAMINE", f"Player examined inventory item {item_id}")
+    player = session.player
+    if not matches:
+        matches = resolve_item_name(object_name, player.inventory)
+        if len(matches) == 1:
+            item_id = matches[0]
+            item_desc = items_data[item_id].get("description", f"A {items_data[item_id].get('name', item_id)}.")
+            print(item_desc)
+            log_event("EXAMINE", "Player examined inventory item %s", item_id, level="DEBUG")
+            return
+    
+    if matches:
+        report_ambiguous_item(object_name, matches)
         return
     
     print(f"You don't see any '{object_name}' here.")
 
-def find_item_by_name(item_name: str, item_list: List[str]) -> Optional[str]:
-    """Find item ID by name from a list of item IDs."""
-    search_name = item_name.lower().replace(" ", "_")
+ITEM_QUERY_ARTICLES = ("the ", "a ", "an ")
+
+def normalize_item_name(name: str) -> str:
+    """Normalize an item id, display name or player query for matching."""
+    text = name.lower().replace("_", " ").replace("-", " ").replace("'", "")
+    return " ".join(text.split())
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance between a and b, capped at limit + 1."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+def resolve_item_name(item_name: str, item_list: Iterable[str]) -> List[str]:
+    """Find the items in item_list that best match the player's text.
     
-    for item_id in item_list:
-        if item_id in items_data:
-            # Check exact match
-            if item_id == search_name:
-                return item_id
-            
-            # Check if item name matches
-            item_data_name = items_data[item_id].get("name", "").lower()
-            if item_data_name == item_name.lower():
-                return item_id
-            
-            # Check if search term is in item name or ID
-            if search_name in item_id or search_name in item_data_name:
-                return item_id
+    Matches are ranked exact (id, name or alias) > prefix (of the full name) >
+    token (every word of the query starts a word of the name) > fuzzy (small
+    edit distance). Only the best non-empty tier is returned.
     
+    Returns:
+        list: Matching item ids sorted by display name; more than one means the
+              query is ambiguous, none means nothing matched
+    """
+    query = normalize_item_name(item_name)
+    for article in ITEM_QUERY_ARTICLES:
+        if query.startswith(article) and len(query) > len(article):
+            query = query[len(article):]
+    
+    distinct_ids = item_list.distinct() if isinstance(item_list, Inventory) else dict.fromkeys(item_list)
+    candidates = {item_id for item_id in distinct_ids if item_id in items_data}
+    if not query or not candidates:
+        return []
+    
+    def ranked(matches: Iterable[str]) -> List[str]:
+        return sorted(matches, key=lambda item_id: (items_data[item_id].get("name", item_id), item_id))
+    
+    # Exact id, display name or alias
+    exact = item_ids_by_name.get(query)
+    if exact in candidates:
+        return [exact]
+    
+    # Every query word must start a word of the item's name
+    token_matches = None
+    for token in query.split():
+        ids = item_ids_by_token_prefix.get(token, set())
+        token_matches = ids & candidates if token_matches is None else token_matches & ids
+        if not token_matches:
+            break
+    
+    if token_matches:
+        prefix_matches = [item_id for item_id in token_matches
+                          if any(name.startswith(query) for name in item_search_names[item_id])]
+        return ranked(prefix_matches or token_matches)
+    
+    # Fuzzy: closest full name or single word within a length-scaled edit distance
+    limit = 1 if len(query) <= 5 else 2
+    best_distance = limit + 1
+    fuzzy: List[str] = []
+    for item_id in candidates:
+        names = item_search_names[item_id]
+        words = [word for name in names for word in name.split()] if " " not in query else []
+        distance = min(edit_distance(query, name, limit) for name in names + words)
+        if distance < best_distance:
+            best_distance = distance
+            fuzzy = [item_id]
+        elif distance == best_distance and distance <= limit:
+            fuzzy.append(item_id)
+    return ranked(fuzzy)
+
+def find_item_or_report(item_name: str, item_list: Iterable[str], not_found_message: str) -> Optional[str]:
+    """Find an item by name, telling the player when it is missing or ambiguous."""
+    matches = resolve_item_name(item_name, item_list)
+    if len(matches) == 1:
+        return matches[0]
+    
+    if matches:
+        report_ambiguous_item(item_name, matches)
+    else:
+        print(not_found_message)
     return None
 
+def report_ambiguous_item(item_name: str, matches: List[str]) -> None:
+    """Ask the player to pick between several matching items."""
+    names = [items_data[item_id].get("name", item_id) for item_id in matches]
+    print(f"Which '{item_name}' do you mean: {', '.join(names)}?")
+
 # === [INVENTORY SYSTEM] ===
-def take_item(item_name: str) -> None:
+def take_item(session: 'GameSession', item_name: str) -> None:
     """Take item from current room.
     
     Side effects:
@@ -994,17 +2090,16 @@ def take_item(item_name: str) -> None:
         - Removes item from room
         - Logs inventory change
     """
-    current_room = get_current_room()
+    current_room = get_current_room(session)
     if not current_room:
         print("Error: Current room not found!")
         return
     
-    player = game_state['player']
+    player = session.player
     
     # Find the item
-    item_id = find_item_by_name(item_name, current_room.items)
+    item_id = find_item_or_report(item_name, current_room.items, f"You don't see any '{item_name}' here.")
     if not item_id:
-        print(f"You don't see any '{item_name}' here.")
         return
     
     # Check inventory space (unlimited now, but keeping structure for future use)
@@ -1019,7 +2114,7 @@ def take_item(item_name: str) -> None:
     else:
         print("Something went wrong trying to take that item.")
 
-def drop_item(item_name: str) -> None:
+def drop_item(session: 'GameSession', item_name: str) -> None:
     """Drop item from inventory to current room.
     
     Side effects:
@@ -1027,17 +2122,16 @@ def drop_item(item_name: str) -> None:
         - Adds item to current room
         - Logs inventory change
     """
-    current_room = get_current_room()
+    current_room = get_current_room(session)
     if not current_room:
         print("Error: Current room not found!")
         return
     
-    player = game_state['player']
+    player = session.player
     
     # Find the item in inventory
-    item_id = find_item_by_name(item_name, player.inventory)
+    item_id = find_item_or_report(item_name, player.inventory, f"You don't have any '{item_name}'.")
     if not item_id:
-        print(f"You don't have any '{item_name}'.")
         return
     
     # Drop the item
@@ -1048,55 +2142,54 @@ def drop_item(item_name: str) -> None:
     else:
         print("Something went wrong trying to drop that item.")
 
-def show_inventory() -> None:
+def show_inventory(session: 'GameSession') -> None:
     """Display player's current inventory."""
-    player = game_state['player']
+    player = session.player
     
     if not player.inventory:
         print("Your inventory is empty.")
         return
     
-    # Count items
-    item_counts = {}
-    for item_id in player.inventory:
-        item_counts[item_id] = item_counts.get(item_id, 0) + 1
-    
-    # Get item display names and sort alphabetically
-    display_items = []
-    for item_id, count in item_counts.items():
-        if item_id in items_data:
-            item_name = items_data[item_id].get("name", item_id)
-        else:
-            item_name = item_id
-        
-        # Check if equipped
-        equipped_marker = ""
-        if item_id == player.equipped_weapon:
-            equipped_marker = " (equipped weapon)"
-        elif item_id == player.equipped_armor:
-            equipped_marker = " (equipped armor)"
-        
-        # Format with count
-        if count == 1:
-            display_items.append((item_name.lower(), f"  - {item_name}{equipped_marker}"))
-        else:
-            display_items.append((item_name.lower(), f"  - {item_name} x{count}{equipped_marker}"))
-    
-    # Sort alphabetically by item name
-    display_items.sort(key=lambda x: x[0])
+    # Group with the inventory's cached per-type views; anything else is "Other"
+    equipment = player.inventory.equipment()
+    consumables = player.inventory.consumables()
+    grouped = set(equipment) | set(consumables)
+    other = [item_id for item_id, _ in player.inventory.items() if item_id not in grouped]
     
     print(f"Inventory ({len(player.inventory)} items):")
-    for _, display_text in display_items:
-        print(display_text)
+    for title, item_ids in (("Equipment", equipment), ("Consumables", consumables), ("Other", other)):
+        if item_ids:
+            print(f"{title}:")
+            for line in sorted((describe_carried_item(player, item_id) for item_id in item_ids), key=str.lower):
+                print(f"  - {line}")
+
+def describe_carried_item(player: 'Player', item_id: str) -> str:
+    """Item name with its count and equipped marker, e.g. 'Healing Herbs x3'."""
+    item_name = items_data.get(item_id, {}).get("name", item_id)
+    count = player.inventory.count(item_id)
+    text = item_name if count == 1 else f"{item_name} x{count}"
+    if item_id == player.equipped_weapon:
+        text += " (equipped weapon)"
+    elif item_id == player.equipped_armor:
+        text += " (equipped armor)"
+    return text
 
-def use_item(item_name: str) -> None:
-    """Use/consume an item from inventory."""
-    player = game_state['player']
+def use_item(session: 'GameSession', item_name: str) -> None:
+    """Use/consume an item from inventory (with no name, list what can be used)."""
+    player = session.player
+    
+    if not item_name:
+        consumables = player.inventory.consumables()
+        if consumables:
+            names = sorted((describe_carried_item(player, item_id) for item_id in consumables), key=str.lower)
+            print(f"Use what? You're carrying: {', '.join(names)}")
+        else:
+            print("Use what? You have nothing to use.")
+        return
     
     # Find the item in inventory
-    item_id = find_item_by_name(item_name, player.inventory)
+    item_id = find_item_or_report(item_name, player.inventory, f"You don't have any '{item_name}'.")
     if not item_id:
-        print(f"You don't have any '{item_name}'.")
         return
     
     if item_id not in items_data:
@@ -1120,8 +2213,8 @@ def use_item(item_name: str) -> None:
                 player.remove_item(item_id)
                 
                 # Show combat text if in combat
-                if game_state['mode'] == 'combat':
-                    combat_message = get_combat_text("player_use_item", item=item_data['name'])
+                if session.mode == 'combat':
+                    combat_message = get_combat_text("player_use_item", session.get_rng("text"), item=item_data['name'])
                     print(combat_message)
             else:
                 print(f"You're already at full health!")
@@ -1152,9 +2245,154 @@ def use_item(item_name: str) -> None:
         print(f"You can't use the {item_data['name']} right now.")
 
 # === [QUEST SYSTEM] ===
-def show_quests() -> None:
+class QuestProgress:
+    """One player's progress on one active quest, layered over its template."""
+    __slots__ = ("template", "counts", "remaining")
+    
+    def __init__(self, template: QuestTemplate, counts: List[int]):
+        self.template = template
+        self.counts = counts    # current count per objective
+        self.remaining = sum(1 for obj, count in zip(template.objectives, counts) if count < obj.required)
+    
+    def set_count(self, index: int, count: int) -> None:
+        """Store an objective's new count and keep the unmet total in step."""
+        required = self.template.objectives[index].required
+        was_met = self.counts[index] >= required
+        self.counts[index] = count
+        is_met = count >= required
+        if was_met != is_met:
+            self.remaining += -1 if is_met else 1
+    
+    def is_completed(self) -> bool:
+        """Check if every objective is met."""
+        return self.remaining == 0
+    
+    def objective_text(self, index: int) -> str:
+        """Objective description, with a running count while it's unmet."""
+        obj = self.template.objectives[index]
+        count = self.counts[index]
+        if count >= obj.required:
+            return obj.description
+        if obj.type == "kill":
+            return f"Defeat {obj.target} ({count}/{obj.required})"
+        if obj.type == "collect":
+            item_name = items_data.get(obj.target, {}).get("name", obj.target)
+            return f"Collect {item_name} ({count}/{obj.required})"
+        return obj.description
+    
+    def get_progress_text(self) -> str:
+        """Get text showing quest progress."""
+        lines = [f"📜 {self.template.title}"]
+        lines.append(f"   {self.template.description}")
+        
+        for index, obj in enumerate(self.template.objectives):
+            status = "✅" if self.counts[index] >= obj.required else "❌"
+            lines.append(f"   {status} {self.objective_text(index)}")
+        
+        return "\n".join(lines)
+
+class QuestTracker:
+    """Incremental objective state for one player's active quests.
+    
+    Each active quest's objectives are subscribed under their (type, target)
+    key, so a kill, a room visit or an inventory change only touches the
+    objectives listening for it. Progress records cache per-objective counts
+    and the number of unmet objectives; kill and visit progress is also
+    written to player.quest_progress so save files don't change.
+    """
+    
+    __slots__ = ("player", "subscriptions", "active")
+    
+    def __init__(self, player: 'Player'):
+        self.player = player
+        self.subscriptions: Dict[Tuple[str, str], List[Tuple[str, int]]] = {}
+        self.active: Dict[str, QuestProgress] = {}  # quest_id -> progress record
+    
+    def rebuild(self) -> None:
+        """Re-derive every active quest's state (after load or a data reload)."""
+        self.subscriptions.clear()
+        self.active.clear()
+        for quest_id in self.player.active_quests:
+            self.track(quest_id)
+    
+    def track(self, quest_id: str) -> None:
+        """Subscribe an active quest's objectives and compute their state."""
+        template = quest_templates.get(quest_id)
+        if template is None:
+            return
+        
+        counts = [self._current_count(quest_id, obj) for obj in template.objectives]
+        self.active[quest_id] = QuestProgress(template, counts)
+        for index, obj in enumerate(template.objectives):
+            self.subscriptions.setdefault((obj.type, obj.target), []).append((quest_id, index))
+        
+        # Accepting a quest while standing in its target room counts as a visit
+        self.on_visit(self.player.current_room)
+    
+    def untrack(self, quest_id: str) -> None:
+        """Drop a quest's subscriptions and progress record."""
+        progress = self.active.pop(quest_id, None)
+        if progress is None:
+            return
+        for index, obj in enumerate(progress.template.objectives):
+            key = (obj.type, obj.target)
+            listeners = self.subscriptions.get(key, [])
+            if (quest_id, index) in listeners:
+                listeners.remove((quest_id, index))
+            if not listeners:
+                self.subscriptions.pop(key, None)
+    
+    def _current_count(self, quest_id: str, obj: ObjectiveTemplate) -> int:
+        """Derive an objective's count from saved progress and player state."""
+        if obj.type == "kill":
+            return self.player.get_quest_progress(quest_id, f"kill_{obj.target}", 0)
+        if obj.type == "collect":
+            return self.player.inventory.count(obj.target)
+        if obj.type == "visit":
+            return int(bool(self.player.get_quest_progress(quest_id, f"visit_{obj.target}", False)))
+        if obj.type == "deliver":
+            return int(bool(self.player.get_quest_progress(quest_id, "delivered", False)))
+        return 0
+    
+    def on_kill(self, enemy_id: str) -> List[Tuple[str, int, int, int]]:
+        """Count a kill toward matching objectives.
+        
+        Returns:
+            List of (quest_id, objective index, count, required) for each objective advanced
+        """
+        updates = []
+        for quest_id, index in self.subscriptions.get(("kill", enemy_id), []):
+            progress = self.active[quest_id]
+            count = progress.counts[index] + 1
+            self.player.update_quest_progress(quest_id, f"kill_{enemy_id}", count)
+            progress.set_count(index, count)
+            updates.append((quest_id, index, count, progress.template.objectives[index].required))
+        return updates
+    
+    def on_visit(self, room_id: str) -> None:
+        """Mark visit objectives for room_id as done."""
+        for quest_id, index in self.subscriptions.get(("visit", room_id), []):
+            progress = self.active[quest_id]
+            if progress.counts[index] == 0:
+                self.player.update_quest_progress(quest_id, f"visit_{room_id}", True)
+                progress.set_count(index, 1)
+    
+    def on_item_change(self, item_id: str) -> None:
+        """Refresh collect objectives for item_id after the inventory changed."""
+        listeners = self.subscriptions.get(("collect", item_id))
+        if listeners:
+            count = self.player.inventory.count(item_id)
+            for quest_id, index in listeners:
+                self.active[quest_id].set_count(index, count)
+    
+    def is_completed(self, quest_id: str) -> bool:
+        """Check if every objective of an active quest is met."""
+        progress = self.active.get(quest_id)
+        return progress is not None and progress.is_completed()
+
+def show_quests(session: 'GameSession') -> None:
     """Display player's current quests."""
-    player = game_state['player']
+    player = session.player
     
     if not player.active_quests and not player.completed_quests:
         print("You have no quests. Talk to NPCs to find quest opportunities!")
@@ -1165,28 +2403,25 @@ def show_quests() -> None:
     if player.active_quests:
         print("\n📋 ACTIVE QUESTS:")
         for quest_id in player.active_quests:
-            quest = Quest.from_template(quest_id)
-            if quest:
-                # Update quest progress before displaying
-                update_quest_objectives(quest)
-                print(quest.get_progress_text())
+            progress = player.quests.active.get(quest_id)
+            if progress:
+                print(progress.get_progress_text())
                 print()
     
     if player.completed_quests:
         print("✅ COMPLETED QUESTS:")
         for quest_id in player.completed_quests:
-            if quest_id in quests_data:
-                quest_title = quests_data[quest_id]["title"]
-                print(f"  ✅ {quest_title}")
+            if quest_id in quest_templates:
+                print(f"  ✅ {quest_templates[quest_id].title}")
         print()
     
     print("=" * 18)
 
-def accept_quest_from_npc(quest_id: str) -> None:
+def accept_quest_from_npc(session: 'GameSession', quest_id: str) -> None:
     """Handle accepting a quest from an NPC."""
-    player = game_state['player']
+    player = session.player
     
-    if quest_id not in quests_data:
+    if quest_id not in quest_templates:
         print("Unknown quest.")
         return
     
@@ -1207,37 +2442,34 @@ def accept_quest_from_npc(quest_id: str) -> None:
     
     # Accept the quest
     if player.accept_quest(quest_id):
-        quest_data = quests_data[quest_id]
-        print(f"\n📜 Quest Accepted: {quest_data['title']}")
-        print(f"Description: {quest_data['description']}")
+        template = quest_templates[quest_id]
+        print(f"\n📜 Quest Accepted: {template.title}")
+        print(f"Description: {template.description}")
         
         print("\nObjectives:")
-        for i, obj in enumerate(quest_data['objectives'], 1):
-            print(f"  {i}. {obj['description']}")
+        for i, obj in enumerate(template.objectives, 1):
+            print(f"  {i}. {obj.description}")
         
         print("\nType 'quests' to check your progress anytime.")
     else:
         print("Failed to accept quest.")
 
-def complete_quest_with_rewards(quest_id: str) -> None:
+def complete_quest_with_rewards(session: 'GameSession', quest_id: str) -> None:
     """Complete a quest and give rewards."""
-    player = game_state['player']
+    player = session.player
     
     if quest_id not in player.active_quests:
         print("You're not currently working on that quest!")
         return
     
-    quest = Quest.from_template(quest_id)
+    quest = quest_templates.get(quest_id)
     if not quest:
         print("Quest data not found!")
         return
     
-    # Update quest objectives and check completion
-    update_quest_objectives(quest)
-    
-    if not quest.is_completed():
+    if not player.quests.is_completed(quest_id):
         print("You haven't completed all objectives yet!")
-        show_quest_progress(quest_id)
+        show_quest_progress(session, quest_id)
         return
     
     # Complete the quest
@@ -1246,11 +2478,10 @@ def complete_quest_with_rewards(quest_id: str) -> None:
         print(quest.completion_text)
         
         # Give rewards
-        rewards = quest.rewards
         total_xp = 0
         
-        if "xp" in rewards:
-            base_xp = rewards["xp"]
+        if quest.reward_xp:
+            base_xp = quest.reward_xp
             bonus_xp = int(base_xp * (Config.QUEST_XP_MULTIPLIER - 1))
             total_xp = base_xp + bonus_xp
             
@@ -1260,13 +2491,13 @@ def complete_quest_with_rewards(quest_id: str) -> None:
             if not leveled_up:
                 print(f"Progress: {player.get_xp_bar()}")
         
-        if "gold" in rewards:
-            gold_reward = rewards["gold"]
+        if quest.reward_gold:
+            gold_reward = quest.reward_gold
             player.earn_gold(gold_reward)
             print(f"Reward: {gold_reward} gold!")
         
-        if "items" in rewards:
-            for item_id in rewards["items"]:
+        if quest.reward_items:
+            for item_id in quest.reward_items:
                 if item_id in items_data:
                     item_name = items_data[item_id]["name"]
                     if player.can_carry_more():
@@ -1274,87 +2505,31 @@ def complete_quest_with_rewards(quest_id: str) -> None:
                         print(f"Reward: {item_name}!")
                     else:
                         print(f"Inventory full! {item_name} dropped on ground.")
-                        current_room = get_current_room()
+                        current_room = get_current_room(session)
                         if current_room:
                             current_room.add_item(item_id)
         
         print("\nWell done, hero!")
 
-def show_quest_progress(quest_id: str) -> None:
+def show_quest_progress(session: 'GameSession', quest_id: str) -> None:
     """Show detailed progress for a specific quest."""
-    quest = Quest.from_template(quest_id)
-    if quest:
-        update_quest_objectives(quest)
-        print(f"\n{quest.get_progress_text()}")
-
-def update_quest_objectives(quest: Quest) -> None:
-    """Update quest objectives based on current game state."""
-    player = game_state['player']
-    
-    for obj in quest.objectives:
-        obj_type = obj.get("type", "")
-        
-        if obj_type == "kill":
-            # Track enemy kills
-            target_enemy = obj.get("target", "")
-            required_count = obj.get("count", 1)
-            current_count = player.get_quest_progress(quest.quest_id, f"kill_{target_enemy}", 0)
-            
-            obj["completed"] = current_count >= required_count
-            obj["progress"] = f"{current_count}/{required_count}"
-            if not obj["completed"]:
-                obj["description"] = f"Defeat {target_enemy} ({current_count}/{required_count})"
-        
-        elif obj_type == "collect":
-            # Check if player has required items
-            target_item = obj.get("target", "")
-            required_count = obj.get("count", 1)
-            current_count = sum(1 for item in player.inventory if item == target_item)
-            
-            obj["completed"] = current_count >= required_count
-            obj["progress"] = f"{current_count}/{required_count}"
-            if not obj["completed"]:
-                item_name = items_data.get(target_item, {}).get("name", target_item)
-                obj["description"] = f"Collect {item_name} ({current_count}/{required_count})"
-        
-        elif obj_type == "deliver":
-            # Check if item was delivered
-            delivered = player.get_quest_progress(quest.quest_id, "delivered", False)
-            obj["completed"] = delivered
-        
-        elif obj_type == "visit":
-            # Check if location was visited
-            target_room = obj.get("target", "")
-            visited = player.current_room == target_room or player.get_quest_progress(quest.quest_id, f"visit_{target_room}", False)
-            obj["completed"] = visited
-            
-            # Auto-mark as visited if player is in the room
-            if player.current_room == target_room:
-                player.update_quest_progress(quest.quest_id, f"visit_{target_room}", True)
+    progress = session.player.quests.active.get(quest_id)
+    if progress:
+        print(f"\n{progress.get_progress_text()}")
 
-def track_enemy_kill(enemy_id: str) -> None:
+def track_enemy_kill(session: 'GameSession', enemy_id: str) -> None:
     """Track enemy kill for quest purposes."""
-    player = game_state['player']
-    
-    for quest_id in player.active_quests:
-        quest = Quest.from_template(quest_id)
-        if quest:
-            for obj in quest.objectives:
-                if obj.get("type") == "kill" and obj.get("target") == enemy_id:
-                    current_count = player.get_quest_progress(quest_id, f"kill_{enemy_id}", 0)
-                    player.update_quest_progress(quest_id, f"kill_{enemy_id}", current_count + 1)
-                    
-                    required_count = obj.get("count", 1)
-                    new_count = current_count + 1
-                    
-                    if new_count >= required_count:
-                        print(f"\n📜 Quest objective completed: Defeat {enemy_id} ({new_count}/{required_count})")
-                    else:
-                        print(f"\n📜 Quest progress: Defeat {enemy_id} ({new_count}/{required_count})")
+    player = session.player
+    
+    for quest_id, index, new_count, required_count in player.quests.on_kill(enemy_id):
+        if new_count >= required_count:
+            print(f"\n📜 Quest objective completed: Defeat {enemy_id} ({new_count}/{required_count})")
+        else:
+            print(f"\n📜 Quest progress: Defeat {enemy_id} ({new_count}/{required_count})")
 
-def show_reputation() -> None:
+def show_reputation(session: 'GameSession') -> None:
     """Display player's faction reputation and NPC relationships."""
-    player = game_state['player']
+    player = session.player
     
     print("\n" + "="*50)
     print("🏛️ REPUTATION & RELATIONSHIPS")
@@ -1419,15 +2594,10 @@ def get_item_price(item_id: str, is_selling: bool = False) -> int:
 
 def show_merchant_inventory() -> None:
     """Display merchant's available items."""
-    merchant_items = [
-        "health_potion", "steel_sword", "chain_mail", 
-        "greater_health_potion", "magic_ring", "legendary_blade"
-    ]
-    
     print("\n=== MERCHANT'S WARES ===")
     print("The merchant displays his finest goods:")
     
-    for item_id in merchant_items:
+    for item_id in Config.MERCHANT_ITEMS:
         if item_id in items_data:
             item_data = items_data[item_id]
             price = get_item_price(item_id)
@@ -1441,26 +2611,13 @@ def show_merchant_inventory() -> None:
     print("Type 'sell <item>' to sell from your inventory")
     print("=" * 25)
 
-def buy_item(item_name: str) -> None:
+def buy_item(session: 'GameSession', item_name: str) -> None:
     """Handle buying an item from the merchant."""
-    player = game_state['player']
+    player = session.player
     
     # Find item by name in merchant inventory
-    merchant_items = [
-        "health_potion", "steel_sword", "chain_mail", 
-        "greater_health_potion", "magic_ring", "legendary_blade"
-    ]
-    
-    item_id = None
-    for candidate_id in merchant_items:
-        if candidate_id in items_data:
-            item_data = items_data[candidate_id]
-            if item_data['name'].lower() == item_name.lower():
-                item_id = candidate_id
-                break
-    
+    item_id = find_item_or_report(item_name, Config.MERCHANT_ITEMS, f"The merchant doesn't have any '{item_name}' for sale.")
     if not item_id:
-        print(f"The merchant doesn't have any '{item_name}' for sale.")
         return
     
     price = get_item_price(item_id)
@@ -1485,14 +2642,13 @@ def buy_item(item_name: str) -> None:
             print("The merchant's eyes widen as you count out the gold.")
             print("'That blade has quite a history,' he says with respect.")
 
-def sell_item(item_name: str) -> None:
+def sell_item(session: 'GameSession', item_name: str) -> None:
     """Handle selling an item to the merchant."""
-    player = game_state['player']
+    player = session.player
     
     # Find the item in player's inventory
-    item_id = find_item_by_name(item_name, player.inventory)
+    item_id = find_item_or_report(item_name, player.inventory, f"You don't have any '{item_name}' to sell.")
     if not item_id:
-        print(f"You don't have any '{item_name}' to sell.")
         return
     
     if item_id not in items_data:
@@ -1511,10 +2667,10 @@ def sell_item(item_name: str) -> None:
         player.earn_gold(price)
         print(f"You sell the {item_data['name']} for {price} gold.")
 
-def heal_at_tavern() -> None:
+def heal_at_tavern(session: 'GameSession') -> None:
     """Offer healing services at the tavern."""
-    player = game_state['player']
-    current_room = get_current_room()
+    player = session.player
+    current_room = get_current_room(session)
     
     # Check if player is in tavern
     if not current_room or current_room.id != "tavern":
@@ -1546,14 +2702,14 @@ def heal_at_tavern() -> None:
         print(f"Health: {player.health}/{player.max_health}")
         print("You feel much better!")
 
-def talk_to_npc(npc_name: str) -> None:
+def talk_to_npc(session: 'GameSession', npc_name: str) -> None:
     """Handle talking to NPCs."""
-    current_room = get_current_room()
+    current_room = get_current_room(session)
     if not current_room or npc_name not in current_room.npcs:
         print(f"There's no {npc_name} here to talk to.")
         return
     
-    player = game_state['player']
+    player = session.player
     
     if npc_name == "barkeep":
         print("\nThe grizzled barkeep looks up from cleaning mugs.")
@@ -1564,12 +2720,11 @@ def talk_to_npc(npc_name: str) -> None:
         print("- 'talk barkeep' - Chat with the barkeep")
         
         # Check for available quests
-        available_quests = get_available_quests_from_npc("barkeep")
+        available_quests = get_available_quests_from_npc(session, "barkeep")
         if available_quests:
             print("\nQuests available:")
             for quest_id in available_quests:
-                quest_data = quests_data[quest_id]
-                print(f"- 'accept {quest_id}' - {quest_data['title']}")
+                print(f"- 'accept {quest_id}' - {quest_templates[quest_id].title}")
         
     elif npc_name == "merchant" or npc_name == "shopkeeper":
         print("\nThe merchant rubs his hands together eagerly.")
@@ -1577,58 +2732,47 @@ def talk_to_npc(npc_name: str) -> None:
         show_merchant_inventory()
         
         # Check for available quests
-        available_quests = get_available_quests_from_npc("merchant")
+        available_quests = get_available_quests_from_npc(session, "merchant")
         if available_quests:
             print("\nQuests available:")
             for quest_id in available_quests:
-                quest_data = quests_data[quest_id]
-                print(f"- 'accept {quest_id}' - {quest_data['title']}")
+                print(f"- 'accept {quest_id}' - {quest_templates[quest_id].title}")
     
     elif npc_name == "guard":
         print("\nThe town guard straightens up and salutes.")
         print("'Greetings, citizen! The town needs brave souls like you.'")
         
         # Check for available quests
-        available_quests = get_available_quests_from_npc("guard")
+        available_quests = get_available_quests_from_npc(session, "guard")
         if available_quests:
             print("\nQuests available:")
             for quest_id in available_quests:
-                quest_data = quests_data[quest_id]
-                print(f"- 'accept {quest_id}' - {quest_data['title']}")
+                print(f"- 'accept {quest_id}' - {quest_templates[quest_id].title}")
     
     elif npc_name == "villager":
         print("\nThe villager looks worried and approaches you.")
         print("'Oh, thank goodness! Are you an adventurer?'")
         
         # Check for available quests
-        available_quests = get_available_quests_from_npc("villager")
+        available_quests = get_available_quests_from_npc(session, "villager")
         if available_quests:
             print("\nQuests available:")
             for quest_id in available_quests:
-                quest_data = quests_data[quest_id]
-                print(f"- 'accept {quest_id}' - {quest_data['title']}")
+                print(f"- 'accept {quest_id}' - {quest_templates[quest_id].title}")
     
     else:
         print(f"The {npc_name} nods at you politely but seems busy.")
 
-def get_available_quests_from_npc(npc_name: str) -> List[str]:
+def get_available_quests_from_npc(session: 'GameSession', npc_name: str) -> List[str]:
     """Get list of quests available from an NPC."""
-    player = game_state['player']
-    available = []
-    
-    for quest_id, quest_data in quests_data.items():
-        # Check if this NPC offers this quest
-        if quest_data.get("giver_npc") == npc_name:
-            # Check if player can accept it
-            if (quest_id not in player.active_quests and 
-                quest_id not in player.completed_quests):
-                available.append(quest_id)
+    player = session.player
     
-    return available
+    return [quest_id for quest_id in quests_by_npc.get(npc_name, [])
+            if quest_id not in player.active_quests and quest_id not in player.completed_quests]
 
 # === [COMBAT SYSTEM] ===
-def get_combat_text(text_type: str, **kwargs) -> str:
-    """Get random combat text of specified type."""
+def get_combat_text(text_type: str, rng: random.Random, **kwargs) -> str:
+    """Get random combat text of specified type (rng: the session's text stream)."""
     if text_type not in combat_text_data:
         return f"[{text_type}]"  # Fallback
     
@@ -1636,149 +2780,224 @@ def get_combat_text(text_type: str, **kwargs) -> str:
     if not messages:
         return f"[{text_type}]"
     
-    message = random.choice(messages)
+    message = rng.choice(messages)
     try:
         return message.format(**kwargs)
     except KeyError:
         return message
 
-def check_for_encounter() -> bool:
-    """Check if a random encounter should occur."""
-    # No encounters in safe rooms
-    safe_rooms = ['tavern', 'town_square', 'village_shop']
-    if game_state['current_room'] in safe_rooms:
-        return False
+class AliasTable:
+    """Weighted random choice in O(1) per sample (Walker's alias method, Vose's construction)."""
     
-    return random.random() < Config.ENCOUNTER_CHANCE
+    def __init__(self, outcomes: List[str], weights: List[float]):
+        total = float(sum(weights))
+        self.outcomes = list(outcomes)
+        self.probabilities = [weight / total for weight in weights]
+        
+        count = len(outcomes)
+        scaled = [p * count for p in self.probabilities]
+        self.accept = [0.0] * count
+        self.alias = [0] * count
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        
+        while small and large:
+            low = small.pop()
+            high = large.pop()
+            self.accept[low] = scaled[low]
+            self.alias[low] = high
+            scaled[high] = (scaled[high] + scaled[low]) - 1.0
+            if scaled[high] < 1.0:
+                small.append(high)
+            else:
+                large.append(high)
+        
+        # Leftovers are 1.0 up to rounding error
+        for index in small + large:
+            self.accept[index] = 1.0
+            self.alias[index] = index
+    
+    def sample(self, rng: random.Random) -> str:
+        """Draw one outcome."""
+        index = int(rng.random() * len(self.outcomes))
+        if rng.random() < self.accept[index]:
+            return self.outcomes[index]
+        return self.outcomes[self.alias[index]]
 
-def get_possible_enemies(room_id: str) -> List[str]:
-    """Get list of enemies that can spawn in this room."""
-    possible = []
+def build_encounter_tables() -> Dict[str, AliasTable]:
+    """Compile a weighted encounter table for every room with spawns.
+    
+    Enemies weigh 1.0 unless they set "spawn_weight", or a per-room weight in
+    "spawn_weights": {room_id: weight}. Zero-weight entries are left out.
+    """
+    weights_by_room: Dict[str, Dict[str, float]] = {}
     for enemy_id, enemy_data in enemies_data.items():
-        spawn_locations = enemy_data.get("spawn_locations", [])
-        if room_id in spawn_locations:
-            possible.append(enemy_id)
-    return possible
+        default_weight = enemy_data.get("spawn_weight", 1.0)
+        room_weights = enemy_data.get("spawn_weights", {})
+        for room_id in enemy_data.get("spawn_locations", []):
+            weight = room_weights.get(room_id, default_weight)
+            if weight > 0:
+                weights_by_room.setdefault(room_id, {})[enemy_id] = weight
+    
+    return {room_id: AliasTable(list(weights), list(weights.values()))
+            for room_id, weights in weights_by_room.items()}
+
+def get_room_danger(room_id: str) -> float:
+    """Get the chance of an encounter when entering a room.
+    
+    Rooms may set "danger" in rooms.json (0 for safe rooms); otherwise
+    Config.ENCOUNTER_CHANCE applies.
+    """
+    return rooms_data.get(room_id, {}).get("danger", Config.ENCOUNTER_CHANCE)
+
+def check_for_encounter(session: 'GameSession') -> bool:
+    """Check if a random encounter should occur."""
+    return session.get_rng("encounter").random() < get_room_danger(session.current_room)
+
+def choose_encounter(room_id: str, rng: random.Random) -> Optional[str]:
+    """Pick an enemy from the room's encounter table (None if nothing spawns there)."""
+    table = encounter_tables.get(room_id)
+    if table is None:
+        return None
+    return table.sample(rng)
+
+def show_encounter_table(room_id: str) -> None:
+    """Print a room's encounter chance and weighted enemy table."""
+    if room_id not in rooms_data:
+        print(f"Unknown room: {room_id}")
+        return
+    
+    room_name = rooms_data[room_id].get("name", room_id)
+    print(f"\n{room_name} ({room_id}) - encounter chance {get_room_danger(room_id):.0%}")
+    table = encounter_tables.get(room_id)
+    if table is None:
+        print("  No enemies spawn here.")
+        return
+    
+    for enemy_id, probability in sorted(zip(table.outcomes, table.probabilities), key=lambda entry: -entry[1]):
+        enemy_name = enemies_data.get(enemy_id, {}).get("name", enemy_id)
+        print(f"  {enemy_name:<28} {probability:6.1%}")
 
-def start_combat(enemy_id: str) -> bool:
+def start_combat(session: 'GameSession', enemy_id: str) -> bool:
     """Initialize combat with specified enemy."""
-    enemy = Enemy.from_template(enemy_id)
+    enemy = enemy_pool.acquire(enemy_id)
     if not enemy:
-        log_event("ERROR", f"Failed to create enemy: {enemy_id}")
+        log_event("ERROR", "Failed to create enemy: %s", enemy_id, level="ERROR")
         return False
     
     # Set up combat state
-    game_state['combat'] = CombatState(enemy=enemy)
-    game_state['mode'] = 'combat'
+    session.combat = CombatState(enemy=enemy)
+    session.mode = 'combat'
     
     # Determine initiative (simple for now - could be agility-based later)
-    player_agility = game_state['player'].agility
+    player_agility = session.player.agility
     enemy_agility = enemy.agility
     
     # Add some randomness to initiative
-    player_roll = player_agility + random.randint(1, 6)
-    enemy_roll = enemy_agility + random.randint(1, 6)
+    rng = session.get_rng("combat")
+    player_roll = player_agility + rng.randint(1, 6)
+    enemy_roll = enemy_agility + rng.randint(1, 6)
     
-    game_state['combat'].player_initiative = player_roll >= enemy_roll
+    session.combat.player_initiative = player_roll >= enemy_roll
     
     # Display combat start
     print("\n" + "="*50)
     print(f"💀 COMBAT! 💀")
     print(f"A {enemy.name} appears!")
     print(enemy.description)
-    print(get_combat_text("combat_start"))
+    print(get_combat_text("combat_start", session.get_rng("text")))
     print("="*50)
     
-    log_event("COMBAT", f"Combat started with {enemy.name}")
+    log_event("COMBAT", "Combat started with %s", enemy.name, enemy=enemy.enemy_id)
     return True
 
-def player_attack(target: Enemy) -> None:
+def player_attack(session: 'GameSession', target: Enemy) -> None:
     """Handle player attack action."""
-    player = game_state['player']
-    
-    # Calculate hit chance (simple system)
-    hit_chance = 0.8  # 80% base hit chance
+    player = session.player
     
-    if random.random() <= hit_chance:
+    rng = session.get_rng("combat")
+    if rng.random() <= Config.PLAYER_HIT_CHANCE:
         # Hit!
-        damage = player.get_attack_power() + random.randint(1, 4)  # Add some randomness
+        damage = player.get_attack_power() + rng.randint(*Config.PLAYER_DAMAGE_ROLL)
         actual_damage = target.take_damage(damage)
         
-        print(get_combat_text("player_hit", enemy=target.name, damage=actual_damage))
+        print(get_combat_text("player_hit", session.get_rng("text"), enemy=target.name, damage=actual_damage))
         
         # Check if enemy is defeated
         if not target.is_alive():
-            print(get_combat_text("enemy_death", enemy=target.name))
-            end_combat_victory()
+            print(get_combat_text("enemy_death", session.get_rng("text"), enemy=target.name))
+            end_combat_victory(session)
     else:
         # Miss!
-        print(get_combat_text("player_miss", enemy=target.name))
+        print(get_combat_text("player_miss", session.get_rng("text"), enemy=target.name))
 
-def player_defend() -> None:
+def player_defend(session: 'GameSession') -> None:
     """Handle player defend action."""
-    player = game_state['player']
+    player = session.player
     player.defending = True
-    print(get_combat_text("player_defend"))
+    print(get_combat_text("player_defend", session.get_rng("text")))
 
-def player_flee() -> bool:
+def player_flee(session: 'GameSession') -> bool:
     """Handle player flee attempt."""
-    player = game_state['player']
-    combat = game_state['combat']
+    player = session.player
+    combat = session.combat
     
-    # Calculate flee chance based on agility
-    base_chance = Config.FLEE_SUCCESS_BASE
-    agility_bonus = (player.agility - combat.enemy.agility) * 0.05  # 5% per agility point difference
-    flee_chance = base_chance + agility_bonus
-    
-    if random.random() <= flee_chance:
-        print(get_combat_text("player_flee"))
-        end_combat_fled()
+    if session.get_rng("combat").random() <= get_flee_chance(player.agility, combat.enemy.agility):
+        print(get_combat_text("player_flee", session.get_rng("text")))
+        end_combat_fled(session)
         return True
     else:
         print("You try to flee but the enemy blocks your escape!")
         return False
 
-def enemy_turn(enemy: Enemy) -> None:
+def get_flee_chance(player_agility: int, enemy_agility: int) -> float:
+    """Chance the player escapes, based on the agility difference."""
+    return Config.FLEE_SUCCESS_BASE + (player_agility - enemy_agility) * Config.FLEE_AGILITY_BONUS
+
+def get_kill_xp(enemy_max_health: int, rng: random.Random) -> int:
+    """Roll the XP awarded for a kill (enemy difficulty tracks max health)."""
+    return enemy_max_health * Config.KILL_XP_PER_HP + rng.randint(0, Config.KILL_XP_BONUS_MAX)
+
+def enemy_turn(session: 'GameSession', enemy: Enemy) -> None:
     """Handle enemy's turn in combat."""
     if not enemy.is_alive():
         return
     
-    action = enemy.choose_action()
-    player = game_state['player']
+    action = enemy.choose_action(session.get_rng("ai"))
+    player = session.player
     
     if action == "attack":
         # Enemy attacks
-        hit_chance = 0.75  # 75% base hit chance for enemies
-        
-        if random.random() <= hit_chance:
+        rng = session.get_rng("combat")
+        if rng.random() <= Config.ENEMY_HIT_CHANCE:
             # Hit!
-            damage = enemy.attack + random.randint(1, 3)
+            damage = enemy.attack + rng.randint(*Config.ENEMY_DAMAGE_ROLL)
             actual_damage = player.take_damage(damage)
             
-            print(get_combat_text("enemy_hit", enemy=enemy.name, damage=actual_damage))
+            print(get_combat_text("enemy_hit", session.get_rng("text"), enemy=enemy.name, damage=actual_damage))
             
             # Check if player is defeated
             if not player.is_alive():
-                print(get_combat_text("player_death"))
-                handle_player_death()
+                print(get_combat_text("player_death", session.get_rng("text")))
+                handle_player_death(session)
         else:
             # Miss!
-            print(get_combat_text("enemy_miss", enemy=enemy.name))
+            print(get_combat_text("enemy_miss", session.get_rng("text"), enemy=enemy.name))
     
     elif action == "defend":
         enemy.defending = True
-        print(get_combat_text("enemy_defend", enemy=enemy.name))
+        print(get_combat_text("enemy_defend", session.get_rng("text"), enemy=enemy.name))
     
     elif action == "flee":
-        print(get_combat_text("enemy_flee", enemy=enemy.name))
-        end_combat_fled()
+        print(get_combat_text("enemy_flee", session.get_rng("text"), enemy=enemy.name))
+        end_combat_fled(session)
 
-def process_combat_turn(player_action: str, target: str = "") -> None:
+def process_combat_turn(session: 'GameSession', player_action: str, target: str = "") -> None:
     """Process one turn of combat."""
-    combat = game_state['combat']
-    player = game_state['player']
+    combat = session.combat
+    player = session.player
     
-    if not combat or not combat.is_active():
+    if not combat or not combat.is_active(session.player):
         return
     
     # Reset defending states
@@ -1787,24 +3006,24 @@ def process_combat_turn(player_action: str, target: str = "") -> None:
     
     # Process player action
     if player_action == "attack":
-        player_attack(combat.enemy)
+        player_attack(session, combat.enemy)
     elif player_action == "defend":
-        player_defend()
+        player_defend(session)
     elif player_action == "use":
-        use_item(target)
+        use_item(session, target)
     elif player_action == "flee":
-        if player_flee():
+        if player_flee(session):
             return  # Combat ended
     
     # Check if combat is still active after player action
-    if not combat.is_active():
+    if not combat.is_active(session.player):
         return
     
     # Enemy turn
-    enemy_turn(combat.enemy)
+    enemy_turn(session, combat.enemy)
     
     # Check if combat is still active after enemy turn
-    if not combat.is_active():
+    if not combat.is_active(session.player):
         return
     
     # Increment turn counter
@@ -1812,27 +3031,25 @@ def process_combat_turn(player_action: str, target: str = "") -> None:
     
     # Check for low health warning
     if player.is_low_health():
-        print(get_combat_text("low_health_warning"))
+        print(get_combat_text("low_health_warning", session.get_rng("text")))
 
-def end_combat_victory() -> None:
+def end_combat_victory(session: 'GameSession') -> None:
     """Handle end of combat with player victory."""
-    combat = game_state['combat']
+    combat = session.combat
     if not combat:
         return
     
     # Track enemy kill for quests
-    track_enemy_kill(combat.enemy.enemy_id)
+    track_enemy_kill(session, combat.enemy.enemy_id)
     
     # Generate and award loot
-    loot = combat.enemy.generate_loot()
-    player = game_state['player']
+    loot = combat.enemy.generate_loot(session.get_rng("loot"))
+    player = session.player
     
     print(f"\nVictory! The {combat.enemy.name} has been defeated!")
     
     # Award XP based on enemy difficulty (max health is a good indicator)
-    base_xp = combat.enemy.max_health * 2  # 2 XP per HP point
-    bonus_xp = random.randint(0, 5)  # Random bonus 0-5 XP
-    total_xp = base_xp + bonus_xp
+    total_xp = get_kill_xp(combat.enemy.max_health, session.get_rng("loot"))
     
     print(f"You gain {total_xp} experience!")
     leveled_up = player.gain_experience(total_xp)
@@ -1852,7 +3069,7 @@ def end_combat_victory() -> None:
             else:
                 print(f"You found {item_name}, but your inventory is full!")
                 # Add to room instead
-                current_room = get_current_room()
+                current_room = get_current_room(session)
                 if current_room:
                     current_room.add_item(item_id)
                     print(f"The {item_name} falls to the ground.")
@@ -1862,41 +3079,43 @@ def end_combat_victory() -> None:
         print(f"Progress: {player.get_xp_bar()}")
     
     # Clean up combat state
-    game_state['combat'] = None
-    game_state['mode'] = 'exploration'
+    session.combat = None
+    session.mode = 'exploration'
     
-    log_event("COMBAT", f"Player defeated {combat.enemy.name}")
+    log_event("COMBAT", "Player defeated %s", combat.enemy.name, enemy=combat.enemy.enemy_id)
+    enemy_pool.release(combat.enemy)
     
     # Show current location after combat
-    display_room()
+    display_room(session)
 
-def end_combat_fled() -> None:
+def end_combat_fled(session: 'GameSession') -> None:
     """Handle end of combat with player fleeing."""
-    combat = game_state['combat']
+    combat = session.combat
     if not combat:
         return
     
     print(f"You successfully escape from the {combat.enemy.name}!")
     
     # Clean up combat state
-    game_state['combat'] = None
-    game_state['mode'] = 'exploration'
+    session.combat = None
+    session.mode = 'exploration'
     
-    log_event("COMBAT", f"Player fled from {combat.enemy.name}")
+    log_event("COMBAT", "Player fled from %s", combat.enemy.name, enemy=combat.enemy.enemy_id)
+    enemy_pool.release(combat.enemy)
     
     # Show current location after fleeing
-    display_room()
+    display_room(session)
 
-def handle_player_death() -> None:
+def handle_player_death(session: 'GameSession') -> None:
     """Handle player death and respawn."""
-    player = game_state['player']
+    player = session.player
     
     print("\n" + "="*50)
     print("💀 DEFEAT 💀")
     print("You have been slain in combat!")
     
     # Apply death penalty
-    gold_lost = int(player.gold * 0.1)  # Lose 10% of gold
+    gold_lost = int(player.gold * Config.DEATH_GOLD_PENALTY)
     player.gold = max(0, player.gold - gold_lost)
     if gold_lost > 0:
         print(f"You lose {gold_lost} gold in the confusion...")
@@ -1905,10 +3124,10 @@ def handle_player_death() -> None:
     player.health = player.max_health
     
     # Move to last save point
-    game_state['current_room'] = game_state['last_save_room']
-    player.current_room = game_state['last_save_room']
+    session.current_room = session.last_save_room
+    player.enter_room(session.last_save_room)
     
-    current_room = get_current_room()
+    current_room = get_current_room(session)
     if current_room:
         print(f"You awaken back at the {current_room.name}.")
     else:
@@ -1917,13 +3136,1206 @@ def handle_player_death() -> None:
     print("="*50)
     
     # Clean up combat state
-    game_state['combat'] = None
-    game_state['mode'] = 'exploration'
+    if session.combat:
+        enemy_pool.release(session.combat.enemy)
+    session.combat = None
+    session.mode = 'exploration'
     
     log_event("COMBAT", "Player died and respawned")
     
     # Show respawn location
-    display_room()
+    display_room(session)
+
+# === [LOOT TABLES] ===
+@dataclass(frozen=True)
+class LootExpectation:
+    """What one kill of an enemy is worth on average, computed at load time."""
+    enemy_id: str
+    gold_min: int
+    gold_max: int
+    expected_gold: float
+    drop_chances: Tuple[Tuple[str, float], ...]  # (item_id, chance) per loot table entry
+    expected_items: float
+    expected_sale_value: float   # drops sold back to the merchant
+    xp_per_kill: float
+    
+    @property
+    def expected_value(self) -> float:
+        """Expected gold plus the sale value of the drops."""
+        return self.expected_gold + self.expected_sale_value
+
+def build_loot_tables() -> Dict[str, LootExpectation]:
+    """Compute expected drops, sale value and XP per kill for every enemy.
+    
+    Mirrors Enemy.generate_loot (gold only when gold_max > 0, one independent
+    roll per item entry) and get_kill_xp, with prices from get_item_price at
+    the current MERCHANT_BUYBACK.
+    """
+    tables = {}
+    for enemy_id, enemy_data in enemies_data.items():
+        loot_table = enemy_data.get("loot_table", {})
+        gold_min = loot_table.get("gold_min", 0)
+        gold_max = loot_table.get("gold_max", 0)
+        drop_chances = tuple((entry["item"], entry["chance"]) for entry in loot_table.get("items", []))
+        tables[enemy_id] = LootExpectation(
+            enemy_id=enemy_id,
+            gold_min=gold_min,
+            gold_max=gold_max,
+            expected_gold=(gold_min + gold_max) / 2 if gold_max > 0 else 0.0,
+            drop_chances=drop_chances,
+            expected_items=sum(chance for _, chance in drop_chances),
+            expected_sale_value=sum(chance * get_item_price(item_id, is_selling=True) for item_id, chance in drop_chances),
+            xp_per_kill=enemy_data.get("max_health", 0) * Config.KILL_XP_PER_HP + Config.KILL_XP_BONUS_MAX / 2
+        )
+    return tables
+
+def roll_loot_batch(enemy_id: str, kills: int, rng) -> Dict[str, Any]:
+    """Roll the loot for many kills of one enemy at once.
+    
+    Args:
+        rng: numpy Generator (or random.Random without numpy) from an
+             RNGStreams, e.g. the "loot" stream of a seeded simulation
+    
+    Returns:
+        dict: {"gold": total gold, "items": {item_id: count}} over all kills
+    """
+    expectation = loot_tables.get(enemy_id)
+    if expectation is None or kills <= 0:
+        return {"gold": 0, "items": {}}
+    
+    items: Dict[str, int] = {}
+    gold = 0
+    if np is not None:
+        if expectation.gold_max > 0:
+            gold = int(rng.integers(expectation.gold_min, expectation.gold_max + 1, kills).sum())
+        if expectation.drop_chances:
+            chances = np.array([chance for _, chance in expectation.drop_chances])
+            drops = (rng.random((kills, len(chances))) < chances).sum(axis=0)
+            for (item_id, _), count in zip(expectation.drop_chances, drops.tolist()):
+                if count:
+                    items[item_id] = items.get(item_id, 0) + count
+        return {"gold": gold, "items": items}
+    
+    for _ in range(kills):
+        if expectation.gold_max > 0:
+            gold += rng.randint(expectation.gold_min, expectation.gold_max)
+        for item_id, chance in expectation.drop_chances:
+            if rng.random() < chance:
+                items[item_id] = items.get(item_id, 0) + 1
+    return {"gold": gold, "items": items}
+
+def show_bestiary(enemy_name: str = "") -> None:
+    """List every enemy's kill value, or show one enemy's drops in detail."""
+    if enemy_name:
+        enemy_id = find_enemy_id(enemy_name)
+        if not enemy_id:
+            print(f"The bestiary has no entry for '{enemy_name}'.")
+            return
+        enemy_data = enemies_data[enemy_id]
+        expectation = loot_tables[enemy_id]
+        print(f"\n📖 {enemy_data['name']}")
+        print(f"   {enemy_data['description']}")
+        print(f"   HP {enemy_data['max_health']}, attack {enemy_data['attack']}, "
+              f"defense {enemy_data['defense']}, agility {enemy_data['agility']}")
+        print(f"   XP per kill: ~{expectation.xp_per_kill:.0f}")
+        if expectation.gold_max > 0:
+            print(f"   Gold: {expectation.gold_min}-{expectation.gold_max} (avg {expectation.expected_gold:.1f})")
+        if expectation.drop_chances:
+            print("   Drops:")
+            for item_id, chance in expectation.drop_chances:
+                item_name = items_data.get(item_id, {}).get("name", item_id)
+                print(f"     {item_name:<24}{chance * 100:5.1f}%   sells for {get_item_price(item_id, is_selling=True)} gold")
+        print(f"   Average value per kill: {expectation.expected_value:.1f} gold")
+        return
+    
+    print("\n=== BESTIARY ===")
+    print(f"{'Creature':<24}{'HP':>5}{'XP':>6}{'Gold':>7}{'Drops':>7}{'Value':>8}")
+    for enemy_id, expectation in sorted(loot_tables.items(), key=lambda entry: enemies_data[entry[0]]["max_health"]):
+        enemy_data = enemies_data[enemy_id]
+        print(f"{enemy_data['name']:<24}{enemy_data['max_health']:>5}{expectation.xp_per_kill:>6.0f}"
+              f"{expectation.expected_gold:>7.1f}{expectation.expected_items:>7.2f}{expectation.expected_value:>8.1f}")
+    print("Averages per kill. Type 'bestiary <creature>' for details.")
+    print("=" * 57)
+
+# === [BALANCE SIMULATOR] ===
+SIM_ONGOING, SIM_WIN, SIM_DEATH, SIM_ENEMY_FLED, SIM_PLAYER_FLED = 0, 1, 2, 3, 4
+SIM_OUTCOMES = 5
+
+@dataclass
+class FightProfile:
+    """Everything a headless fight needs, resolved through the live combat formulas."""
+    player_health: int
+    player_attack: int
+    player_defense: int
+    enemy_health: int
+    enemy_attack: int
+    enemy_defense: int
+    enemy_flee_health: float   # enemy considers fleeing at or below this health
+    enemy_flee_chance: float
+    enemy_defend_chance: float
+    player_flee_chance: float
+    player_flee_health: float = 0  # player tries to flee at or below this health instead of attacking
+    
+    @classmethod
+    def build(cls, player: 'Player', enemy: Enemy, flee_health: float = 0) -> 'FightProfile':
+        """Resolve a player and enemy into fight constants.
+        
+        Both defending flags are cleared at the start of every round and the
+        player always acts first, so an enemy's defend only costs it a turn;
+        neither side's defend bonus ever applies to an attack, and the profile
+        uses base defense whatever the live flags say.
+        """
+        return cls(
+            player_health=player.health,
+            player_attack=player.get_attack_power(),
+            player_defense=player.get_base_defense(),
+            enemy_health=enemy.health,
+            enemy_attack=enemy.attack,
+            enemy_defense=enemy.defense,
+            enemy_flee_health=enemy.max_health * enemy.ai_pattern.get("flee_threshold", 0.3),
+            enemy_flee_chance=enemy.ai_pattern.get("flee_chance", 0),
+            enemy_defend_chance=enemy.get_defend_probability(),
+            player_flee_chance=get_flee_chance(player.agility, enemy.agility),
+            player_flee_health=flee_health
+        )
+
+@dataclass
+class SimulationResult:
+    """Aggregate outcome of a batch of simulated fights against one enemy."""
+    enemy_id: str
+    fights: int
+    win_rate: float
+    death_rate: float
+    enemy_fled_rate: float
+    player_fled_rate: float
+    stalemate_rate: float
+    mean_turns: float
+    mean_damage_taken: float
+    xp_per_fight: float
+    gold_per_fight: float
+    items_per_fight: float
+    sale_value_per_fight: float
+
+def build_sim_player(level: int = 1, weapon: Optional[str] = None, armor: Optional[str] = None) -> 'Player':
+    """Create a full-health player with the stats they'd have at a given level."""
+    level = max(1, min(level, len(Config.XP_THRESHOLDS)))
+    gained = level - 1
+    max_health = Config.STARTING_HEALTH + gained * Config.LEVEL_HEALTH_BONUS
+    return Player(
+        health=max_health,
+        max_health=max_health,
+        strength=Config.STARTING_STRENGTH + gained * Config.LEVEL_STRENGTH_BONUS,
+        defense=Config.STARTING_DEFENSE + gained * Config.LEVEL_DEFENSE_BONUS,
+        level=level,
+        experience=Config.XP_THRESHOLDS[level - 2] if level > 1 else 0,
+        equipped_weapon=weapon,
+        equipped_armor=armor
+    )
+
+def simulate_fights_numpy(profile: FightProfile, fights: int, rng) -> Tuple[Any, Any, Any]:
+    """Run a batch of fights as NumPy array operations.
+    
+    Returns:
+        Tuple of (outcome, turns, damage_taken) arrays, one entry per fight
+    """
+    player_health = np.full(fights, profile.player_health, dtype=np.int64)
+    enemy_health = np.full(fights, profile.enemy_health, dtype=np.int64)
+    outcome = np.full(fights, SIM_ONGOING, dtype=np.int8)
+    turns = np.full(fights, Config.SIM_MAX_TURNS, dtype=np.int32)
+    damage_taken = np.zeros(fights, dtype=np.int64)
+    active = np.arange(fights)
+    player_low, player_high = Config.PLAYER_DAMAGE_ROLL
+    enemy_low, enemy_high = Config.ENEMY_DAMAGE_ROLL
+    
+    for turn in range(1, Config.SIM_MAX_TURNS + 1):
+        if active.size == 0:
+            break
+        
+        # Player tries to flee at low health, otherwise attacks
+        fleeing = player_health[active] <= profile.player_flee_health
+        escaped = fleeing & (rng.random(active.size) <= profile.player_flee_chance)
+        hits = ~fleeing & (rng.random(active.size) <= Config.PLAYER_HIT_CHANCE)
+        rolls = rng.integers(player_low, player_high + 1, active.size)
+        damage = np.maximum(1, profile.player_attack + rolls - profile.enemy_defense) * hits
+        enemy_health[active] -= damage
+        killed = enemy_health[active] <= 0
+        outcome[active[killed]] = SIM_WIN
+        outcome[active[escaped]] = SIM_PLAYER_FLED
+        turns[active[killed | escaped]] = turn
+        active = active[~(killed | escaped)]
+        
+        # Enemy may flee at low health, otherwise attacks unless it picks defend
+        low = enemy_health[active] <= profile.enemy_flee_health
+        fled = low & (rng.random(active.size) < profile.enemy_flee_chance)
+        outcome[active[fled]] = SIM_ENEMY_FLED
+        turns[active[fled]] = turn
+        active = active[~fled]
+        
+        attacks = rng.random(active.size) >= profile.enemy_defend_chance
+        hits = attacks & (rng.random(active.size) <= Config.ENEMY_HIT_CHANCE)
+        rolls = rng.integers(enemy_low, enemy_high + 1, active.size)
+        damage = np.maximum(1, profile.enemy_attack + rolls - profile.player_defense) * hits
+        player_health[active] -= damage
+        damage_taken[active] += damage
+        died = player_health[active] <= 0
+        outcome[active[died]] = SIM_DEATH
+        turns[active[died]] = turn
+        active = active[~died]
+    
+    return outcome, turns, damage_taken
+
+def simulate_fight(profile: FightProfile, rng: random.Random) -> Tuple[int, int, int]:
+    """Run one fight in pure Python.
+    
+    Returns:
+        Tuple of (outcome, rounds, player health left)
+    """
+    player_low, player_high = Config.PLAYER_DAMAGE_ROLL
+    enemy_low, enemy_high = Config.ENEMY_DAMAGE_ROLL
+    player_damage_base = profile.player_attack - profile.enemy_defense
+    enemy_damage_base = profile.enemy_attack - profile.player_defense
+    player_health = profile.player_health
+    enemy_health = profile.enemy_health
+    
+    for turn in range(1, Config.SIM_MAX_TURNS + 1):
+        if player_health <= profile.player_flee_health:
+            if rng.random() <= profile.player_flee_chance:
+                return SIM_PLAYER_FLED, turn, player_health
+        elif rng.random() <= Config.PLAYER_HIT_CHANCE:
+            enemy_health -= max(1, player_damage_base + rng.randint(player_low, player_high))
+            if enemy_health <= 0:
+                return SIM_WIN, turn, player_health
+        
+        if enemy_health <= profile.enemy_flee_health and rng.random() < profile.enemy_flee_chance:
+            return SIM_ENEMY_FLED, turn, player_health
+        
+        if rng.random() >= profile.enemy_defend_chance and rng.random() <= Config.ENEMY_HIT_CHANCE:
+            player_health -= max(1, enemy_damage_base + rng.randint(enemy_low, enemy_high))
+            if player_health <= 0:
+                return SIM_DEATH, turn, player_health
+    
+    return SIM_ONGOING, Config.SIM_MAX_TURNS, player_health
+
+def simulate_fights_python(profile: FightProfile, fights: int, rng: random.Random) -> Tuple[List[int], List[int], List[int]]:
+    """Pure-Python equivalent of simulate_fights_numpy, one fight at a time."""
+    outcome, turns, damage_taken = [], [], []
+    for _ in range(fights):
+        result, rounds, health_left = simulate_fight(profile, rng)
+        outcome.append(result)
+        turns.append(rounds)
+        damage_taken.append(profile.player_health - health_left)
+    return outcome, turns, damage_taken
+
+def simulate_enemy(enemy_id: str, player: 'Player', fights: int = Config.SIM_FIGHTS, rng=None,
+                   loot_rng=None) -> Optional[SimulationResult]:
+    """Simulate fights between a player and one enemy outside any game session.
+    
+    Gold, drops and sale value are rolled for every win with roll_loot_batch;
+    XP stays the per-kill expectation.
+    
+    Args:
+        rng: numpy Generator (or random.Random without numpy); defaults to the
+             combat stream of a fresh, randomly seeded RNGStreams
+        loot_rng: same kind of generator for the loot rolls; defaults to that
+                  RNGStreams' loot stream
+    """
+    enemy = Enemy.from_template(enemy_id)
+    if not enemy or fights <= 0:
+        return None
+    
+    profile = FightProfile.build(player, enemy)
+    streams = RNGStreams() if rng is None or loot_rng is None else None
+    if np is not None:
+        loot_rng = loot_rng or streams.numpy_generator("loot")
+        outcome, turns, damage_taken = simulate_fights_numpy(profile, fights, rng or streams.numpy_generator("combat"))
+        counts = np.bincount(outcome, minlength=SIM_OUTCOMES)
+        mean_turns = float(turns.mean())
+        mean_damage_taken = float(damage_taken.mean())
+    else:
+        loot_rng = loot_rng or streams.get("loot")
+        outcome, turns, damage_taken = simulate_fights_python(profile, fights, rng or streams.get("combat"))
+        counts = [outcome.count(result) for result in range(SIM_OUTCOMES)]
+        mean_turns = sum(turns) / fights
+        mean_damage_taken = sum(damage_taken) / fights
+    
+    wins = int(counts[SIM_WIN])
+    win_rate = wins / fights
+    loot = roll_loot_batch(enemy_id, wins, loot_rng)
+    sale_value = sum(count * get_item_price(item_id, is_selling=True) for item_id, count in loot["items"].items())
+    
+    return SimulationResult(
+        enemy_id=enemy_id,
+        fights=fights,
+        win_rate=win_rate,
+        death_rate=counts[SIM_DEATH] / fights,
+        enemy_fled_rate=counts[SIM_ENEMY_FLED] / fights,
+        player_fled_rate=counts[SIM_PLAYER_FLED] / fights,
+        stalemate_rate=counts[SIM_ONGOING] / fights,
+        mean_turns=mean_turns,
+        mean_damage_taken=mean_damage_taken,
+        xp_per_fight=win_rate * loot_tables[enemy_id].xp_per_kill,
+        gold_per_fight=loot["gold"] / fights,
+        items_per_fight=sum(loot["items"].values()) / fights,
+        sale_value_per_fight=sale_value / fights
+    )
+
+def print_simulation_table(results: List[SimulationResult]) -> None:
+    """Print one row of simulation results per enemy."""
+    print(f"{'Enemy':<20}{'Win%':>7}{'Death%':>8}{'Fled%':>7}{'Turns':>7}{'Dmg taken':>11}{'XP/fight':>10}"
+          f"{'Gold/fight':>12}{'Items/fight':>13}{'Sale/fight':>12}")
+    print("-" * 107)
+    for result in results:
+        print(f"{result.enemy_id:<20}{result.win_rate * 100:>7.1f}{result.death_rate * 100:>8.1f}"
+              f"{result.enemy_fled_rate * 100:>7.1f}{result.mean_turns:>7.2f}{result.mean_damage_taken:>11.2f}"
+              f"{result.xp_per_fight:>10.1f}{result.gold_per_fight:>12.2f}{result.items_per_fight:>13.3f}"
+              f"{result.sale_value_per_fight:>12.2f}")
+
+def run_simulation(enemy_ids: List[str], fights: int, level: int, weapon: Optional[str], armor: Optional[str],
+                   seed: Optional[int] = None) -> int:
+    """Simulate fights against the given enemies (all if empty) and print a table.
+    
+    Each enemy gets its own child stream, so with a seed a row doesn't
+    depend on which other enemies were simulated alongside it.
+    
+    Returns:
+        int: process exit code
+    """
+    unknown = [enemy_id for enemy_id in enemy_ids if enemy_id not in enemies_data]
+    unknown += [item_id for item_id in (weapon, armor) if item_id and item_id not in items_data]
+    if unknown:
+        print(f"Unknown enemy or item: {', '.join(unknown)}")
+        return 1
+    
+    player = build_sim_player(level, weapon, armor)
+    streams = RNGStreams(seed)
+    start = time.perf_counter()
+    results = []
+    for enemy_id in enemy_ids or enemies_data:
+        child = streams.spawn(enemy_id)
+        if np is not None:
+            rng, loot_rng = child.numpy_generator("combat"), child.numpy_generator("loot")
+        else:
+            rng, loot_rng = child.get("combat"), child.get("loot")
+        results.append(simulate_enemy(enemy_id, player, fights, rng, loot_rng))
+    elapsed = time.perf_counter() - start
+    
+    gear = ", ".join(items_data[item_id]["name"] for item_id in (weapon, armor) if item_id) or "no gear"
+    print(f"\nLevel {player.level} player ({player.max_health} HP, attack {player.get_attack_power()}, "
+          f"defense {player.get_defense_power()}, {gear}) - always attacks\n")
+    print_simulation_table(results)
+    engine = "numpy" if np is not None else "pure Python"
+    print(f"\n{fights} fights per enemy, {len(results)} enemies in {elapsed:.2f}s ({engine}, seed {streams.seed})")
+    return 0
+
+# === [COMBAT ODDS] ===
+@dataclass(frozen=True)
+class CombatOdds:
+    """Exact outcome probabilities for a fight from its current state."""
+    win: float
+    death: float
+    enemy_fled: float
+    player_fled: float
+    stalemate: float          # chance the fight can never end (nobody can land a blow)
+    expected_turns: float     # expected rounds, counting only fights that end
+
+combat_odds_cache: OrderedDict = OrderedDict()  # fight constants -> solved odds, least recently used first
+
+def get_damage_distribution(attack: int, defense: int, roll: Tuple[int, int]) -> Dict[int, float]:
+    """Probability of each damage value for attack + roll against defense (min 1 damage)."""
+    low, high = roll
+    chance = 1 / (high - low + 1)
+    distribution: Dict[int, float] = {}
+    for bonus in range(low, high + 1):
+        damage = max(1, attack + bonus - defense)
+        distribution[damage] = distribution.get(damage, 0) + chance
+    return distribution
+
+def solve_combat(profile: FightProfile) -> CombatOdds:
+    """Solve a fight exactly as a Markov chain over (player HP, enemy HP).
+    
+    Defending flags are cleared at the start of every round (see
+    FightProfile.build), so each round starts from a (player HP, enemy HP)
+    pair alone. Health never goes up, so filling the table in increasing HP
+    order means every successor state except the round's own "nothing
+    happened" self-loop is already solved; the self-loop is folded in by
+    dividing through by (1 - its probability). Results are memoized on the
+    fight constants, including the Config combat values they were solved with,
+    keeping the Config.COMBAT_ODDS_CACHE_SIZE most recently used.
+    """
+    key = (tuple(getattr(profile, f.name) for f in fields(profile)),
+           Config.PLAYER_HIT_CHANCE, Config.PLAYER_DAMAGE_ROLL, Config.ENEMY_HIT_CHANCE, Config.ENEMY_DAMAGE_ROLL)
+    cached = combat_odds_cache.get(key)
+    if cached is not None:
+        combat_odds_cache.move_to_end(key)
+        return cached
+    
+    player_hits = get_damage_distribution(profile.player_attack, profile.enemy_defense, Config.PLAYER_DAMAGE_ROLL)
+    enemy_hits = get_damage_distribution(profile.enemy_attack, profile.player_defense, Config.ENEMY_DAMAGE_ROLL)
+    enemy_attacks = (1 - profile.enemy_defend_chance) * Config.ENEMY_HIT_CHANCE
+    player_health, enemy_health = profile.player_health, profile.enemy_health
+    
+    # table[p][e] = (win, death, enemy_fled, player_fled, expected_turns) from a round starting at (p, e)
+    table = [[None] * (enemy_health + 1) for _ in range(player_health + 1)]
+    
+    for p in range(1, player_health + 1):
+        for e in range(1, enemy_health + 1):
+            outcomes = [0.0, 0.0, 0.0, 0.0, 0.0]
+            self_loop = 0.0
+            
+            def enemy_phase(weight: float, enemy_left: int) -> None:
+                """Add the enemy's half of the round, reached with probability weight."""
+                nonlocal self_loop
+                if enemy_left <= profile.enemy_flee_health:
+                    outcomes[2] += weight * profile.enemy_flee_chance
+                    weight *= 1 - profile.enemy_flee_chance
+                blows = [(weight * enemy_attacks * chance, damage) for damage, chance in enemy_hits.items()]
+                misses = weight * (1 - enemy_attacks)
+                for chance, damage in blows + [(misses, 0)]:
+                    if chance == 0:
+                        continue
+                    if damage >= p:
+                        outcomes[1] += chance
+                    elif damage == 0 and enemy_left == e:
+                        self_loop += chance
+                    else:
+                        successor = table[p - damage][enemy_left]
+                        for index in range(4):
+                            outcomes[index] += chance * successor[index]
+                        outcomes[4] += chance * successor[4]
+            
+            if p <= profile.player_flee_health:
+                outcomes[3] += profile.player_flee_chance
+                enemy_phase(1 - profile.player_flee_chance, e)
+            else:
+                for damage, chance in player_hits.items():
+                    chance *= Config.PLAYER_HIT_CHANCE
+                    if damage >= e:
+                        outcomes[0] += chance
+                    else:
+                        enemy_phase(chance, e - damage)
+                enemy_phase(1 - Config.PLAYER_HIT_CHANCE, e)
+            
+            if self_loop >= 1 - 1e-12:
+                # Nobody can ever land a blow from here
+                table[p][e] = (0.0, 0.0, 0.0, 0.0, 0.0)
+                continue
+            
+            scale = 1 / (1 - self_loop)
+            outcomes[4] += 1  # this round
+            table[p][e] = tuple(value * scale for value in outcomes)
+    
+    win, death, enemy_fled, player_fled, turns = table[player_health][enemy_health]
+    ended = win + death + enemy_fled + player_fled
+    unresolved = 1 - ended
+    odds = CombatOdds(
+        win=win,
+        death=death,
+        enemy_fled=enemy_fled,
+        player_fled=player_fled,
+        stalemate=unresolved if unresolved > 1e-9 else 0.0,
+        expected_turns=turns / ended if ended > 0 else float("inf")
+    )
+    combat_odds_cache[key] = odds
+    if len(combat_odds_cache) > Config.COMBAT_ODDS_CACHE_SIZE:
+        combat_odds_cache.popitem(last=False)
+    return odds
+
+def get_combat_odds(player: 'Player', enemy: Enemy, flee_health: float = 0) -> CombatOdds:
+    """Exact odds for a player against an enemy at their current health.
+    
+    Args:
+        flee_health: the player tries to flee instead of attacking at or below this health
+    """
+    return solve_combat(FightProfile.build(player, enemy, flee_health=flee_health))
+
+def find_enemy_id(name: str) -> Optional[str]:
+    """Match an enemy by id or display name (exact first, then a unique prefix)."""
+    query = normalize_item_name(name)
+    if not query:
+        return None
+    names = {enemy_id: {normalize_item_name(enemy_id.replace("_", " ")), normalize_item_name(data.get("name", ""))}
+             for enemy_id, data in enemies_data.items()}
+    exact = [enemy_id for enemy_id, enemy_names in names.items() if query in enemy_names]
+    if exact:
+        return exact[0]
+    partial = [enemy_id for enemy_id, enemy_names in names.items()
+               if any(enemy_name.startswith(query) or f" {query}" in enemy_name for enemy_name in enemy_names)]
+    return partial[0] if len(partial) == 1 else None
+
+def consider_enemy(session: 'GameSession', enemy_name: str) -> None:
+    """Show the exact odds of fighting an enemy (the current opponent by default)."""
+    player = session.player
+    combat = session.combat
+    
+    if not enemy_name and combat:
+        enemy = combat.enemy
+    else:
+        if not enemy_name:
+            print("Consider which enemy?")
+            return
+        enemy_id = find_enemy_id(enemy_name)
+        if not enemy_id:
+            print(f"You don't know of any creature called '{enemy_name}'.")
+            return
+        if combat and combat.enemy.enemy_id == enemy_id:
+            enemy = combat.enemy
+        else:
+            enemy = Enemy.from_template(enemy_id)
+    
+    odds = get_combat_odds(player, enemy)
+    
+    print(f"\n🔮 You size up the {enemy.name} (HP {enemy.health}/{enemy.max_health}, "
+          f"attack {enemy.attack}, defense {enemy.defense})")
+    print(f"   You: HP {player.health}/{player.max_health}, attack {player.get_attack_power()}, "
+          f"defense {player.get_base_defense()}")
+    print(f"   Victory:        {odds.win * 100:5.1f}%")
+    print(f"   Defeat:         {odds.death * 100:5.1f}%")
+    if odds.enemy_fled > 0:
+        print(f"   It escapes:     {odds.enemy_fled * 100:5.1f}%")
+    if odds.stalemate > 0:
+        print(f"   Stalemate:      {odds.stalemate * 100:5.1f}%")
+    if odds.expected_turns != float("inf"):
+        print(f"   Expected rounds: {odds.expected_turns:.1f}")
+    
+    if odds.win >= 0.9:
+        print("   Easy prey.")
+    elif odds.win >= 0.6:
+        print("   A fair fight.")
+    elif odds.win >= 0.3:
+        print("   Risky - be ready to flee.")
+    else:
+        print("   Deadly. Avoid this fight!")
+
+# === [COMBAT SCHEDULER] ===
+SCHED_ATTACK, SCHED_DEFEND, SCHED_FLEE = 0, 1, 2
+SCHEDULER_ACTIONS = {"attack": SCHED_ATTACK, "defend": SCHED_DEFEND, "flee": SCHED_FLEE}
+
+class CombatScheduler:
+    """Advances many concurrent encounters together, one tick at a time.
+    
+    Every combatant (one player and one or more enemies per encounter) is a
+    slot in a set of parallel numpy arrays: health, attack, defense, agility,
+    AI chances and ready_at, the tick of its next action. A combatant acts
+    every SCHEDULER_ACTION_TICKS / agility ticks. The ready queue is a heap of
+    (ready_at, -agility, slot), so each tick pops only the due slots, fastest
+    first, and resolves them as one batch with array operations; entries for
+    slots that died or were reused are dropped as they surface. Within a
+    tick, due players act before due enemies (as in the interactive game,
+    where the player always moves first).
+    
+    Players act on their queued action ("attack" unless queue_action says
+    otherwise) against the first enemy still standing. Enemies use the same
+    AI as Enemy.choose_action, and the defend bonus lasts until the
+    defender's next action. Encounters with narrate=True collect combat_text
+    messages; the rest run silently. Requires numpy.
+    
+    Only run_combat_benchmark (--bench-combat) drives it: game and server
+    fights stay turn-based, one round per player command.
+    """
+    
+    def __init__(self, capacity: int = Config.SCHEDULER_CAPACITY, rng=None):
+        if np is None:
+            raise RuntimeError("The combat scheduler requires numpy")
+        self.rng = rng or RNGStreams().numpy_generator("combat")
+        self.text_rng = random.Random(int(self.rng.integers(2 ** 63)))  # narration, derived from rng
+        self.now = 0
+        self.capacity = 0
+        self.free_slots: List[int] = []
+        self.queue: List[Tuple[float, int, int]] = []   # (ready_at, -agility, slot) heap
+        self.names: List[str] = []
+        self.encounters: Dict[int, Dict[str, Any]] = {}  # encounter id -> player slot, enemy slots, messages
+        self.next_encounter = 0
+        self._grow(capacity)
+    
+    def _grow(self, capacity: int) -> None:
+        """Resize every per-slot array to capacity, keeping existing slots."""
+        def resized(array, dtype, fill=0):
+            new = np.full(capacity, fill, dtype=dtype)
+            if array is not None:
+                new[:len(array)] = array
+            return new
+        
+        old = self.capacity
+        self.in_use = resized(getattr(self, "in_use", None), bool, False)
+        self.alive = resized(getattr(self, "alive", None), bool, False)
+        self.fled = resized(getattr(self, "fled", None), bool, False)
+        self.defending = resized(getattr(self, "defending", None), bool, False)
+        self.is_player = resized(getattr(self, "is_player", None), bool, False)
+        self.narrated = resized(getattr(self, "narrated", None), bool, False)   # slot belongs to a narrated encounter
+        self.encounter = resized(getattr(self, "encounter", None), np.int64, -1)
+        self.health = resized(getattr(self, "health", None), np.int64)
+        self.attack = resized(getattr(self, "attack", None), np.int64)
+        self.defense = resized(getattr(self, "defense", None), np.int64)
+        self.guard = resized(getattr(self, "guard", None), np.int64)          # defense while defending
+        self.agility = resized(getattr(self, "agility", None), np.int64)
+        self.ready_at = resized(getattr(self, "ready_at", None), np.float64, np.inf)
+        self.target = resized(getattr(self, "target", None), np.int64, -1)     # players: enemy slot they attack
+        self.action = resized(getattr(self, "action", None), np.int8, SCHED_ATTACK)
+        self.flee_health = resized(getattr(self, "flee_health", None), np.float64)
+        self.flee_chance = resized(getattr(self, "flee_chance", None), np.float64)
+        self.defend_chance = resized(getattr(self, "defend_chance", None), np.float64)
+        self.player_of = resized(getattr(self, "player_of", None), np.int64, -1)  # enemies: their player's slot
+        self.names.extend([""] * (capacity - old))
+        self.free_slots.extend(range(capacity - 1, old - 1, -1))
+        self.capacity = capacity
+    
+    def _allocate(self) -> int:
+        if not self.free_slots:
+            self._grow(self.capacity * 2)
+        return self.free_slots.pop()
+    
+    def _interval(self, agility: int) -> float:
+        return Config.SCHEDULER_ACTION_TICKS / max(1, agility)
+    
+    def start_encounter(self, player: 'Player', enemy_ids: List[str], narrate: bool = False) -> int:
+        """Add an encounter between a player and one or more enemies.
+        
+        Returns:
+            int: encounter id
+        """
+        enemies = [Enemy.from_template(enemy_id) for enemy_id in enemy_ids]
+        if not enemies or any(enemy is None for enemy in enemies):
+            raise ValueError(f"Unknown enemy in {enemy_ids}")
+        
+        encounter_id = self.next_encounter
+        self.next_encounter += 1
+        
+        player_slot = self._allocate()
+        was_defending = player.defending
+        player.defending = True
+        guard = player.get_defense_power()
+        player.defending = was_defending
+        self._fill(player_slot, encounter_id, player.name, player.health, player.get_attack_power(),
+                   player.get_defense_power(), guard, player.agility)
+        self.is_player[player_slot] = True
+        self.action[player_slot] = SCHED_ATTACK
+        
+        enemy_slots = []
+        for enemy in enemies:
+            slot = self._allocate()
+            enemy.defending = True
+            guard = enemy.get_defense_power()
+            enemy.defending = False
+            self._fill(slot, encounter_id, enemy.name, enemy.health, enemy.attack,
+                       enemy.get_defense_power(), guard, enemy.agility)
+            self.flee_health[slot] = enemy.max_health * enemy.ai_pattern.get("flee_threshold", 0.3)
+            self.flee_chance[slot] = enemy.ai_pattern.get("flee_chance", 0)
+            self.defend_chance[slot] = enemy.get_defend_probability()
+            self.player_of[slot] = player_slot
+            enemy_slots.append(slot)
+        self.target[player_slot] = enemy_slots[0]
+        self.narrated[[player_slot] + enemy_slots] = narrate
+        
+        self.encounters[encounter_id] = {
+            "player": player_slot,
+            "enemies": enemy_slots,
+            "enemy_ids": list(enemy_ids),
+            "narrate": narrate,
+            "messages": [],
+            "outcome": None
+        }
+        return encounter_id
+    
+    def _fill(self, slot: int, encounter_id: int, name: str, health: int, attack: int,
+              defense: int, guard: int, agility: int) -> None:
+        self.in_use[slot] = True
+        self.alive[slot] = True
+        self.fled[slot] = False
+        self.defending[slot] = False
+        self.is_player[slot] = False
+        self.narrated[slot] = False
+        self.encounter[slot] = encounter_id
+        self.health[slot] = health
+        self.attack[slot] = attack
+        self.defense[slot] = defense
+        self.guard[slot] = guard
+        self.agility[slot] = agility
+        self.ready_at[slot] = self.now + self._interval(agility)
+        heapq.heappush(self.queue, (float(self.ready_at[slot]), -agility, slot))
+        self.target[slot] = -1
+        self.player_of[slot] = -1
+        self.flee_health[slot] = 0
+        self.flee_chance[slot] = 0
+        self.defend_chance[slot] = 0
+        self.names[slot] = name
+    
+    def queue_action(self, encounter_id: int, action: str) -> bool:
+        """Set the player's action for their next turn ("attack", "defend" or "flee")."""
+        encounter = self.encounters.get(encounter_id)
+        if encounter is None or encounter["outcome"] or action not in SCHEDULER_ACTIONS:
+            return False
+        self.action[encounter["player"]] = SCHEDULER_ACTIONS[action]
+        return True
+    
+    @property
+    def active_count(self) -> int:
+        """Encounters still being fought."""
+        return sum(1 for encounter in self.encounters.values() if not encounter["outcome"])
+    
+    def _narrate(self, slots, text_type: str, damage=None) -> None:
+        """Append combat_text for the narrated encounters among slots (the acting combatants)."""
+        wanted = self.narrated[slots]
+        if not wanted.any():
+            return
+        for index in np.flatnonzero(wanted).tolist():
+            slot = int(slots[index])
+            encounter = self.encounters[int(self.encounter[slot])]
+            if self.is_player[slot]:
+                enemy = self.names[int(self.target[slot])]
+            else:
+                enemy = self.names[slot]
+            kwargs = {"enemy": enemy}
+            if damage is not None:
+                kwargs["damage"] = int(damage[index])
+            encounter["messages"].append(get_combat_text(text_type, self.text_rng, **kwargs))
+    
+    def tick(self) -> List[int]:
+        """Advance every encounter by one tick.
+        
+        Returns:
+            Ids of encounters that ended this tick (read them with finish())
+        """
+        self.now += 1
+        queue = self.queue
+        popped: List[int] = []
+        seen: Set[int] = set()
+        while queue and queue[0][0] <= self.now:
+            ready_at, _, slot = heapq.heappop(queue)
+            if slot not in seen and self.alive[slot] and self.ready_at[slot] == ready_at:
+                seen.add(slot)
+                popped.append(slot)
+        if not popped:
+            return []
+        due = np.array(popped, dtype=np.int64)
+        rng = self.rng
+        
+        # Players: flee, defend or attack their current target
+        players = due[self.is_player[due]]
+        self.defending[players] = False
+        actions = self.action[players]
+        
+        fleeing = players[actions == SCHED_FLEE]
+        if fleeing.size:
+            chance = Config.FLEE_SUCCESS_BASE + (self.agility[fleeing] - self.agility[self.target[fleeing]]) * Config.FLEE_AGILITY_BONUS
+            escaped = fleeing[rng.random(fleeing.size) <= chance]
+            self._narrate(escaped, "player_flee")
+            self.fled[escaped] = True
+            self.alive[escaped] = False
+        
+        defenders = players[actions == SCHED_DEFEND]
+        self.defending[defenders] = True
+        self._narrate(defenders, "player_defend")
+        
+        attackers = players[actions == SCHED_ATTACK]
+        if attackers.size:
+            targets = self.target[attackers]
+            hits = rng.random(attackers.size) <= Config.PLAYER_HIT_CHANCE
+            rolls = rng.integers(Config.PLAYER_DAMAGE_ROLL[0], Config.PLAYER_DAMAGE_ROLL[1] + 1, attackers.size)
+            target_defense = np.where(self.defending[targets], self.guard[targets], self.defense[targets])
+            damage = np.maximum(1, self.attack[attackers] + rolls - target_defense)
+            np.subtract.at(self.health, targets[hits], damage[hits])
+            self._narrate(attackers[hits], "player_hit", damage[hits])
+            self._narrate(attackers[~hits], "player_miss")
+            killed = np.unique(targets[hits & (self.health[targets] <= 0)])
+            killed = killed[self.alive[killed]]
+            self.alive[killed] = False
+            self._narrate_deaths(killed, "enemy_death")
+        
+        self.action[players] = SCHED_ATTACK
+        self.ready_at[players] += Config.SCHEDULER_ACTION_TICKS / np.maximum(1, self.agility[players])
+        
+        # Enemies still standing, facing a player still in the fight
+        enemies = due[~self.is_player[due]]
+        enemies = enemies[self.alive[enemies] & self.alive[self.player_of[enemies]]]
+        self.defending[enemies] = False
+        
+        low = self.health[enemies] <= self.flee_health[enemies]
+        fleeing = low & (rng.random(enemies.size) < self.flee_chance[enemies])
+        escaped = enemies[fleeing]
+        self._narrate(escaped, "enemy_flee")
+        self.fled[escaped] = True
+        self.alive[escaped] = False
+        
+        enemies = enemies[~fleeing]
+        guarding = rng.random(enemies.size) < self.defend_chance[enemies]
+        self.defending[enemies[guarding]] = True
+        self._narrate(enemies[guarding], "enemy_defend")
+        
+        attackers = enemies[~guarding]
+        if attackers.size:
+            targets = self.player_of[attackers]
+            hits = rng.random(attackers.size) <= Config.ENEMY_HIT_CHANCE
+            rolls = rng.integers(Config.ENEMY_DAMAGE_ROLL[0], Config.ENEMY_DAMAGE_ROLL[1] + 1, attackers.size)
+            target_defense = np.where(self.defending[targets], self.guard[targets], self.defense[targets])
+            damage = np.maximum(1, self.attack[attackers] + rolls - target_defense)
+            np.subtract.at(self.health, targets[hits], damage[hits])
+            self._narrate(attackers[hits], "enemy_hit", damage[hits])
+            self._narrate(attackers[~hits], "enemy_miss")
+            died = np.unique(targets[hits & (self.health[targets] <= 0)])
+            died = died[self.alive[died]]
+            self.alive[died] = False
+            self._narrate_deaths(died, "player_death")
+        
+        self.ready_at[due] = np.where(self.is_player[due], self.ready_at[due],
+                                      self.ready_at[due] + Config.SCHEDULER_ACTION_TICKS / np.maximum(1, self.agility[due]))
+        ended = self._settle(np.unique(self.encounter[due]))
+        
+        requeue = due[self.alive[due]]
+        for ready_at, agility, slot in zip(self.ready_at[requeue].tolist(), self.agility[requeue].tolist(), requeue.tolist()):
+            heapq.heappush(queue, (ready_at, -agility, slot))
+        return ended
+    
+    def _narrate_deaths(self, slots, text_type: str) -> None:
+        for slot in slots[self.narrated[slots]].tolist():
+            encounter = self.encounters[int(self.encounter[slot])]
+            encounter["messages"].append(get_combat_text(text_type, self.text_rng, enemy=self.names[slot]))
+    
+    def _settle(self, encounter_ids) -> List[int]:
+        """Decide outcomes for the encounters that acted, and retarget players whose enemy fell."""
+        ended = []
+        for encounter_id in encounter_ids.tolist():
+            encounter = self.encounters[encounter_id]
+            if encounter["outcome"]:
+                continue
+            player_slot = encounter["player"]
+            enemy_slots = encounter["enemies"]
+            standing = [slot for slot in enemy_slots if self.alive[slot]]
+            
+            if self.fled[player_slot]:
+                encounter["outcome"] = "fled"
+            elif self.health[player_slot] <= 0:
+                encounter["outcome"] = "defeat"
+            elif not standing:
+                defeated = any(not self.fled[slot] for slot in enemy_slots)
+                encounter["outcome"] = "victory" if defeated else "enemies_fled"
+            elif not self.alive[self.target[player_slot]]:
+                self.target[player_slot] = standing[0]
+            
+            if encounter["outcome"]:
+                self.alive[player_slot] = False
+                self.alive[enemy_slots] = False
+                ended.append(encounter_id)
+        return ended
+    
+    def get_messages(self, encounter_id: int) -> List[str]:
+        """Take the narration collected for an encounter since the last call."""
+        encounter = self.encounters.get(encounter_id)
+        if encounter is None:
+            return []
+        messages, encounter["messages"] = encounter["messages"], []
+        return messages
+    
+    def finish(self, encounter_id: int) -> Optional[Dict[str, Any]]:
+        """Release an ended encounter's slots and report how it went.
+        
+        Returns:
+            dict with outcome, player_health, defeated and fled enemy ids
+            (None if the encounter is unknown or still running)
+        """
+        encounter = self.encounters.get(encounter_id)
+        if encounter is None or not encounter["outcome"]:
+            return None
+        del self.encounters[encounter_id]
+        
+        enemy_slots = encounter["enemies"]
+        result = {
+            "outcome": encounter["outcome"],
+            "player_health": max(0, int(self.health[encounter["player"]])),
+            "defeated": [enemy_id for enemy_id, slot in zip(encounter["enemy_ids"], enemy_slots)
+                         if self.health[slot] <= 0 and not self.fled[slot]],
+            "fled": [enemy_id for enemy_id, slot in zip(encounter["enemy_ids"], enemy_slots) if self.fled[slot]],
+            "messages": encounter["messages"]
+        }
+        for slot in [encounter["player"]] + enemy_slots:
+            self.in_use[slot] = False
+            self.alive[slot] = False
+            self.ready_at[slot] = np.inf
+            self.free_slots.append(slot)
+        return result
+
+def run_combat_benchmark(encounters: int, seed: Optional[int] = None) -> int:
+    """Run many scheduled encounters to completion and report throughput.
+    
+    Returns:
+        int: process exit code
+    """
+    if np is None:
+        print("The combat scheduler benchmark needs numpy installed.")
+        return 1
+    
+    streams = RNGStreams(seed)
+    setup_rng = streams.get("encounter")
+    scheduler = CombatScheduler(capacity=encounters * 4, rng=streams.numpy_generator("combat"))
+    enemy_ids = [enemy_id for enemy_id, data in enemies_data.items() if data.get("max_health", 0) <= 30]
+    
+    for _ in range(encounters):
+        player = build_sim_player(setup_rng.randint(1, 5), weapon="iron_sword" if "iron_sword" in items_data else None)
+        group = [setup_rng.choice(enemy_ids) for _ in range(setup_rng.randint(1, 3))]
+        scheduler.start_encounter(player, group)
+    
+    outcomes: Counter = Counter()
+    ticks = 0
+    start = time.perf_counter()
+    while scheduler.encounters:
+        for encounter_id in scheduler.tick():
+            outcomes[scheduler.finish(encounter_id)["outcome"]] += 1
+        ticks += 1
+    elapsed = time.perf_counter() - start
+    
+    print(f"{encounters} encounters ({scheduler.capacity} slots) resolved in {ticks} ticks, {elapsed:.2f}s "
+          f"({ticks / elapsed:.0f} ticks/s, {encounters / elapsed:.0f} encounters/s)")
+    print("Outcomes: " + ", ".join(f"{outcome} {count}" for outcome, count in outcomes.most_common()))
+    return 0
+
+# === [PARAMETER SWEEP] ===
+SWEEP_DERIVED_PARAMETERS = ("XP_THRESHOLDS_SCALE",)  # multiplies every entry of XP_THRESHOLDS
+
+def parse_sweep_specs(specs: List[str]) -> Dict[str, Any]:
+    """Parse NAME=v1,v2,... (value list) and NAME=lo:hi (range) sweep arguments.
+    
+    Raises:
+        ValueError: for malformed specs or names that aren't numeric Config settings
+    """
+    grid = {}
+    for spec in specs:
+        name, sep, values = spec.partition("=")
+        name = name.strip().upper()
+        if not sep or not values:
+            raise ValueError(f"expected NAME=VALUES, got '{spec}'")
+        if name not in SWEEP_DERIVED_PARAMETERS:
+            current = getattr(Config, name, None)
+            if isinstance(current, bool) or not isinstance(current, (int, float)):
+                raise ValueError(f"{name} is not a numeric Config setting")
+        if ":" in values:
+            low, high = values.split(":", 1)
+            grid[name] = (float(low), float(high))
+        else:
+            grid[name] = [float(value) for value in values.split(",")]
+    return grid
+
+def build_sweep_configs(grid: Dict[str, Any], samples: int, rng: random.Random) -> List[Dict[str, float]]:
+    """Expand a parsed sweep into configurations: the full grid, or random samples when samples > 0."""
+    if samples > 0:
+        return [{name: rng.uniform(*spec) if isinstance(spec, tuple) else rng.choice(spec)
+                 for name, spec in grid.items()}
+                for _ in range(samples)]
+    
+    if any(isinstance(spec, tuple) for spec in grid.values()):
+        raise ValueError("ranges (lo:hi) need --samples")
+    names = list(grid)
+    return [dict(zip(names, combo)) for combo in itertools.product(*(grid[name] for name in names))]
+
+def apply_config_overrides(overrides: Dict[str, float]) -> Dict[str, Any]:
+    """Set Config values for one sweep configuration.
+    
+    Returns:
+        The original values, for restore_config
+    """
+    originals = {}
+    for name, value in overrides.items():
+        if name == "XP_THRESHOLDS_SCALE":
+            originals.setdefault("XP_THRESHOLDS", Config.XP_THRESHOLDS)
+            Config.XP_THRESHOLDS = [int(threshold * value) for threshold in originals["XP_THRESHOLDS"]]
+            continue
+        current = getattr(Config, name)
+        originals[name] = current
+        setattr(Config, name, int(round(value)) if isinstance(current, int) else value)
+    return originals
+
+def restore_config(originals: Dict[str, Any]) -> None:
+    """Undo apply_config_overrides."""
+    for name, value in originals.items():
+        setattr(Config, name, value)
+
+def buy_sim_upgrade(gold: int, slot: str, stat: str, current: Optional[str]) -> Tuple[int, Optional[str]]:
+    """Buy the merchant's strongest affordable upgrade for one equipment slot.
+    
+    Returns:
+        Tuple of (gold left, item now equipped in the slot)
+    """
+    def power(item_id: Optional[str]) -> int:
+        return items_data.get(item_id, {}).get("stats", {}).get(stat, 0) if item_id else 0
+    
+    upgrades = [item_id for item_id in Config.MERCHANT_ITEMS
+                if items_data.get(item_id, {}).get("type") == slot
+                and power(item_id) > power(current) and get_item_price(item_id) <= gold]
+    if not upgrades:
+        return gold, current
+    best = max(upgrades, key=power)
+    return gold - get_item_price(best), best
+
+def simulate_playthrough(steps: int, streams: RNGStreams) -> Dict[str, Any]:
+    """Play one headless run with a simple grinding policy.
+    
+    The simulated player wanders through random exits and fights every
+    encounter, fleeing at low health. Below SWEEP_REST_HEALTH they return to
+    the tavern to heal (as far as their gold allows) and buy the merchant's
+    best affordable weapon and armor. Loot is sold at the buyback price, and
+    quests whose objectives are all kills are taken on from the start and
+    paid out as soon as they're done.
+    
+    Returns:
+        Dict with level_steps (level -> step reached), fights, deaths and gold_curve
+    """
+    move_rng = streams.get("encounter")
+    combat_rng = streams.get("combat")
+    loot_rng = streams.get("loot")
+    start_room = "tavern" if "tavern" in rooms_data else next(iter(rooms_data))
+    
+    room = start_room
+    level, experience, gold = 1, 0, Config.STARTING_GOLD
+    weapon = armor = None
+    player = build_sim_player(level)
+    health = player.max_health
+    profiles: Dict[str, FightProfile] = {}
+    
+    open_quests = {quest_id: Counter() for quest_id, template in quest_templates.items()
+                   if template.objectives and all(obj.type == "kill" for obj in template.objectives)}
+    level_steps = {1: 0}
+    fights = deaths = 0
+    gold_curve = []
+    checkpoint = max(1, steps // Config.SWEEP_CHECKPOINTS)
+    
+    for step in range(1, steps + 1):
+        if health <= player.max_health * Config.SWEEP_REST_HEALTH:
+            # Head home: heal, then shop for upgrades
+            room = start_room
+            missing = player.max_health - health
+            affordable = gold // Config.HEALING_SERVICE_COST if Config.HEALING_SERVICE_COST > 0 else missing
+            healed = min(missing, affordable)
+            gold -= healed * Config.HEALING_SERVICE_COST
+            health += healed
+            
+            new_weapon = new_armor = None
+            gold, new_weapon = buy_sim_upgrade(gold, "weapon", "attack", weapon)
+            gold, new_armor = buy_sim_upgrade(gold, "armor", "defense", armor)
+            if (new_weapon, new_armor) != (weapon, armor):
+                weapon, armor = new_weapon, new_armor
+                player = build_sim_player(level, weapon, armor)
+                profiles.clear()
+        else:
+            exits = list(rooms_data.get(room, {}).get("exits", {}).values())
+            room = move_rng.choice(exits) if exits else start_room
+            if room not in rooms_data:
+                room = start_room
+            
+            table = encounter_tables.get(room)
+            if table is not None and move_rng.random() < get_room_danger(room):
+                enemy_id = table.sample(move_rng)
+                profile = profiles.get(enemy_id)
+                if profile is None:
+                    profile = FightProfile.build(player, Enemy.from_template(enemy_id),
+                                                 flee_health=player.max_health * Config.SWEEP_FLEE_HEALTH)
+                    profiles[enemy_id] = profile
+                
+                fights += 1
+                outcome, _, health = simulate_fight(replace(profile, player_health=health), combat_rng)
+                
+                if outcome == SIM_DEATH:
+                    deaths += 1
+                    gold -= int(gold * Config.DEATH_GOLD_PENALTY)
+                    health = player.max_health
+                    room = start_room
+                elif outcome == SIM_WIN:
+                    enemy = Enemy.from_template(enemy_id)
+                    gained = enemy.max_health * Config.KILL_XP_PER_HP + loot_rng.randint(0, Config.KILL_XP_BONUS_MAX)
+                    loot = enemy.generate_loot(loot_rng)
+                    gold += loot["gold"] + sum(get_item_price(item_id, is_selling=True) for item_id in loot["items"])
+                    
+                    for quest_id, kills in list(open_quests.items()):
+                        template = quest_templates[quest_id]
+                        kills[enemy_id] += 1
+                        if all(kills[obj.target] >= obj.required for obj in template.objectives):
+                            gained += template.reward_xp + int(template.reward_xp * (Config.QUEST_XP_MULTIPLIER - 1))
+                            gold += template.reward_gold
+                            del open_quests[quest_id]
+                    
+                    # Same rule as Player.gain_experience: at most one level per award
+                    experience += gained
+                    threshold = next_level_xp(level)
+                    if threshold is not None and experience >= threshold:
+                        level += 1
+                        level_steps[level] = step
+                        player = build_sim_player(level, weapon, armor)
+                        health = player.max_health
+                        profiles.clear()
+        
+        if step % checkpoint == 0:
+            gold_curve.append((step, gold))
+    
+    return {"level_steps": level_steps, "fights": fights, "deaths": deaths, "gold_curve": gold_curve}
+
+def init_sweep_worker() -> None:
+    """Make sure a sweep worker has the world data.
+    
+    Forked workers inherit the tables the parent already loaded (shared
+    copy-on-write), so this only loads when workers start as fresh interpreters.
+    """
+    if not rooms_data:
+        load_game_data()
+
+def run_sweep_config(task: Tuple[int, Dict[str, float], int, int, int]) -> Dict[str, Any]:
+    """Run every playthrough for one configuration and summarise it as a CSV row."""
+    index, overrides, runs, steps, seed = task
+    originals = apply_config_overrides(overrides)
+    try:
+        streams = RNGStreams(seed).spawn(f"config/{index}")
+        results = [simulate_playthrough(steps, streams.spawn(run)) for run in range(runs)]
+        max_level = len(Config.XP_THRESHOLDS)
+    finally:
+        restore_config(originals)
+    
+    fights = sum(result["fights"] for result in results)
+    deaths = sum(result["deaths"] for result in results)
+    row: Dict[str, Any] = {"config": index}
+    row.update(overrides)
+    row["runs"] = runs
+    row["fights_per_run"] = round(fights / runs, 2)
+    row["death_rate"] = round(deaths / fights, 4) if fights else 0
+    row["final_level"] = round(sum(max(result["level_steps"]) for result in results) / runs, 2)
+    for level in range(2, max_level + 1):
+        reached = [result["level_steps"][level] for result in results if level in result["level_steps"]]
+        row[f"reached_level_{level}"] = round(len(reached) / runs, 3)
+        row[f"steps_to_level_{level}"] = round(sum(reached) / len(reached), 1) if reached else ""
+    for position, (step, _) in enumerate(results[0]["gold_curve"]):
+        row[f"gold_at_{step}"] = round(sum(result["gold_curve"][position][1] for result in results) / runs, 1)
+    return row
+
+def run_sweep(specs: List[str], samples: int, runs: int, steps: int, workers: int,
+              output: str, seed: Optional[int] = None) -> int:
+    """Run a parameter sweep across a process pool and write one CSV row per configuration.
+    
+    Returns:
+        int: process exit code
+    """
+    streams = RNGStreams(seed)
+    try:
+        grid = parse_sweep_specs(specs)
+        configs = build_sweep_configs(grid, samples, random.Random(streams.derive_seed("sweep")))
+    except ValueError as e:
+        print(f"Invalid sweep: {e}")
+        return 1
+    if runs <= 0 or steps <= 0:
+        print("Invalid sweep: --runs and --steps must be positive")
+        return 1
+    
+    tasks = [(index, config, runs, steps, streams.seed) for index, config in enumerate(configs)]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(tasks)))
+    print(f"Sweeping {len(configs)} configurations x {runs} playthroughs of {steps} steps on {workers} workers...")
+    
+    start = time.perf_counter()
+    with multiprocessing.Pool(workers, initializer=init_sweep_worker) as pool:
+        rows = sorted(pool.imap_unordered(run_sweep_config, tasks), key=lambda row: row["config"])
+    elapsed = time.perf_counter() - start
+    
+    fieldnames = list(dict.fromkeys(name for row in rows for name in row))
+    with open(output, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+    
+    print(f"Wrote {len(rows)} rows to {output} in {elapsed:.2f}s (seed {streams.seed})")
+    return 0
 
 # === [UI/DISPLAY] ===
 def display_title():
@@ -1934,9 +4346,10 @@ def display_title():
     print("=" * 50)
     print()
 
-def display_room() -> None:
+@timed_phase("render")
+def display_room(session: 'GameSession') -> None:
     """Show current room description."""
-    current_room = get_current_room()
+    current_room = get_current_room(session)
     if current_room:
         print("\n" + "=" * 50)
         print(current_room.get_full_description())
@@ -1956,7 +4369,8 @@ def display_help(topic: str = "") -> None:
         print("  Services: heal (at tavern), recall (fast travel to town)")
         print("  Quests: quests (view quest log), accept <quest>, complete <quest>")
         print("  Character: stats (view level, XP, health, etc.), reputation (faction standing)")
-        print("  Combat: attack, defend, use <item>, flee")
+        print("  Lore: bestiary [creature] (what each creature is worth)")
+        print("  Combat: attack, defend, use <item>, flee, consider <enemy> (odds of winning)")
         print("  System: help, save, load, quit")
         print("  Debug: debug <command>")
         print("\nFor detailed help on a topic, type: help <topic>")
@@ -1982,6 +4396,7 @@ def display_help(topic: str = "") -> None:
         print("  '[d]efend' - +50% defense this turn")
         print("  '[u]se <item>' - Use a potion or consumable")
         print("  '[f]lee' - Attempt to escape (success depends on agility)")
+        print("  'consider' - Weigh your odds against the enemy (or 'consider <enemy>' any time)")
         print("Gain XP by defeating enemies to level up!")
     elif topic == "economy":
         print("\n=== ECONOMY HELP ===")
@@ -2010,16 +4425,17 @@ def display_help(topic: str = "") -> None:
     else:
         print(f"No help available for '{topic}'. Try 'help' for main topics.")
 
-def display_prompt() -> None:
+@timed_phase("render")
+def display_prompt(session: 'GameSession') -> None:
     """Show the input prompt."""
-    if game_state['first_play']:
+    if session.first_play:
         print("\nType 'help' for available commands, or 'look' to examine your surroundings.")
-        game_state['first_play'] = False
+        session.first_play = False
     print("\n> ", end="")
 
-def display_stats() -> None:
+def display_stats(session: 'GameSession') -> None:
     """Display player's current stats."""
-    player = game_state['player']
+    player = session.player
     
     print("\n=== CHARACTER STATS ===")
     print(f"Name: {player.name} (Level {player.level})")
@@ -2047,13 +4463,14 @@ def display_stats() -> None:
     
     print("=" * 24)
 
-def display_combat_status() -> None:
+@timed_phase("render")
+def display_combat_status(session: 'GameSession') -> None:
     """Display current combat status."""
-    combat = game_state['combat']
+    combat = session.combat
     if not combat:
         return
     
-    player = game_state['player']
+    player = session.player
     enemy = combat.enemy
     
     print("\n" + "="*50)
@@ -2082,379 +4499,1892 @@ def display_combat_status() -> None:
     print("Actions: [a]ttack, [d]efend, [u]se <item>, [f]lee")
     print("=" * 50)
 
-def display_debug_info() -> None:
+def display_debug_info(session: 'GameSession') -> None:
     """Display current game state for debugging."""
     print("\n=== DEBUG INFO ===")
-    print(f"Current room: {game_state['current_room']}")
-    print(f"Game mode: {game_state['mode']}")
-    player = game_state['player']
+    print(f"Current room: {session.current_room}")
+    print(f"Game mode: {session.mode}")
+    player = session.player
     print(f"Player health: {player.health}/{player.max_health}")
     print(f"Player gold: {player.gold}")
     print(f"Player inventory: {player.inventory}")
     print(f"Equipped weapon: {player.equipped_weapon}")
     print(f"Equipped armor: {player.equipped_armor}")
-    current_room = get_current_room()
+    current_room = get_current_room(session)
     if current_room:
         print(f"Room items: {current_room.items}")
-    if game_state['combat']:
-        print(f"Combat enemy: {game_state['combat'].enemy.name}")
+    print(f"Loaded rooms: {len(session.world.rooms)} ({len(session.world.get_changes())} modified)")
+    print(f"Random seed: {session.rng.seed}")
+    if session.combat:
+        print(f"Combat enemy: {session.combat.enemy.name}")
     print("=" * 20)
 
 # === [SAVE/LOAD] ===
-def save_game() -> None:
+def session_to_dict(session: 'GameSession') -> Dict[str, Any]:
+    """Serialize a session's game in the save file format (see restore_session)."""
+    return {
+        "version": Config.VERSION,
+        "timestamp": datetime.now().isoformat(),
+        "player": session.player.to_dict(),
+        "current_room": session.current_room,
+        "game_mode": session.mode,
+        "last_save_room": session.last_save_room,
+        "rooms": session.world.get_changes(),
+        "seed": session.rng.seed,
+        "rng_state": session.rng.get_state()
+    }
+
+def restore_session(session: 'GameSession', save_data: Dict[str, Any]) -> None:
+    """Put a session back into the state session_to_dict() recorded."""
+    # Restore player state
+    player_data = dict(save_data.get("player", {}))
+    
+    # Handle backward compatibility - remove max_inventory if present
+    if 'max_inventory' in player_data:
+        del player_data['max_inventory']
+    
+    session.player = Player(**player_data)
+    
+    # Restore game state
+    session.current_room = save_data.get("current_room", "tavern")
+    session.mode = save_data.get("game_mode", "exploration")
+    session.last_save_room = save_data.get("last_save_room", "tavern")
+    
+    # Restore room changes (older saves have none)
+    session.world.reset()
+    session.world.apply_changes(save_data.get("rooms", {}))
+    
+    # Resume the saved random streams so play continues exactly as it would have
+    if "seed" in save_data:
+        session.rng = RNGStreams(save_data["seed"])
+        session.rng.set_state(save_data.get("rng_state", {}))
+
+def save_game(session: 'GameSession') -> None:
     """Save current game state to JSON file."""
     try:
         # Update last save room for respawn
-        game_state['last_save_room'] = game_state['current_room']
-        
-        # Prepare save data
-        save_data = {
-            "version": Config.VERSION,
-            "timestamp": datetime.now().isoformat(),
-            "player": asdict(game_state['player']),
-            "current_room": game_state['current_room'],
-            "game_mode": game_state['mode'],
-            "last_save_room": game_state['last_save_room']
-        }
+        session.last_save_room = session.current_room
+        save_data = session_to_dict(session)
         
         # Write to file
-        with open(Config.SAVE_FILE, 'w', encoding='utf-8') as f:
+        with open(session.save_file, 'w', encoding='utf-8') as f:
             json.dump(save_data, f, indent=2)
         
         print("Game saved successfully!")
         log_event("SAVE", "Game state saved")
     except Exception as e:
         print(f"Error saving game: {e}")
-        log_event("ERROR", f"Save failed: {e}")
+        log_event("ERROR", "Save failed: %s", str(e), level="ERROR")
 
-def load_game() -> bool:
+def load_game(session: 'GameSession') -> bool:
     """Load game state from JSON file."""
     try:
-        if not os.path.exists(Config.SAVE_FILE):
+        if not os.path.exists(session.save_file):
             return False
         
-        with open(Config.SAVE_FILE, 'r', encoding='utf-8') as f:
+        with open(session.save_file, 'r', encoding='utf-8') as f:
             save_data = json.load(f)
         
-        # Restore player state
-        player_data = save_data.get("player", {})
-        
-        # Handle backward compatibility - remove max_inventory if present
-        if 'max_inventory' in player_data:
-            del player_data['max_inventory']
-        
-        game_state['player'] = Player(**player_data)
-        
-        # Restore game state
-        game_state['current_room'] = save_data.get("current_room", "tavern")
-        game_state['mode'] = save_data.get("game_mode", "exploration")
-        game_state['last_save_room'] = save_data.get("last_save_room", "tavern")
+        restore_session(session, save_data)
         
         print("Game loaded successfully!")
         log_event("LOAD", "Game state loaded")
         return True
     except Exception as e:
         print(f"Error loading game: {e}")
-        log_event("ERROR", f"Load failed: {e}")
+        log_event("ERROR", "Load failed: %s", str(e), level="ERROR")
         return False
 
-def manual_load_game() -> None:
+def manual_load_game(session: 'GameSession') -> None:
     """Manually reload the save file during gameplay."""
-    if not os.path.exists(Config.SAVE_FILE):
+    if not os.path.exists(session.save_file):
         print("No save file found!")
         print("Use 'save' to create a save file first.")
         return
     
-    print("Reload your saved game? This will lose any unsaved progress. (y/n)")
-    choice = input("> ").strip().lower()
-    
-    if choice in ['y', 'yes']:
-        if load_game():
-            print("✅ Save file loaded successfully!")
-            print("You've been restored to your last saved state.")
-            
-            # Show current location after loading
-            display_room()
-        else:
-            print("❌ Failed to load save file.")
-            print("Your current game continues unchanged.")
+    ask_confirmation(session, "Reload your saved game? This will lose any unsaved progress. (y/n)",
+                     complete_manual_load,
+                     lambda session: print("Load cancelled. Continuing current game..."))
+
+def complete_manual_load(session: 'GameSession') -> None:
+    """Reload the save file after the player confirmed it."""
+    if load_game(session):
+        print("✅ Save file loaded successfully!")
+        print("You've been restored to your last saved state.")
+        
+        # Show current location after loading
+        display_room(session)
     else:
-        print("Load cancelled. Continuing current game...")
+        print("❌ Failed to load save file.")
+        print("Your current game continues unchanged.")
 
 # === [DATA LOADING] ===
-def load_game_data() -> None:
-    """Load all game data from JSON files.
+# Data table name -> (source file, label used in messages)
+DATA_FILES = {
+    "rooms": (Config.ROOMS_FILE, "rooms"),
+    "items": (Config.ITEMS_FILE, "items"),
+    "enemies": (Config.ENEMIES_FILE, "enemies"),
+    "combat_text": (Config.COMBAT_TEXT_FILE, "combat text"),
+    "quests": (Config.QUESTS_FILE, "quests")
+}
+
+# Timings and source of the last load_game_data() call, for --startup-report
+data_load_report: Dict[str, Any] = {}
+
+def load_json_file(path: str, label: str) -> Optional[Dict[str, Any]]:
+    """Parse one data file.
     
-    Side effects:
-        - Populates rooms_data, items_data, enemies_data, combat_text_data, quests_data dictionaries
-        - Creates default data files if missing
+    Returns:
+        dict: Parsed data, or None if the file is missing or invalid
     """
-    global rooms_data, items_data, enemies_data, combat_text_data, quests_data
-    
-    # Load rooms
+    file_name = os.path.basename(path)
     try:
-        if os.path.exists(Config.ROOMS_FILE):
-            with open(Config.ROOMS_FILE, 'r', encoding='utf-8') as f:
-                rooms_data = json.load(f)
-        else:
-            print("Warning: rooms.json not found - using empty rooms data")
-            rooms_data = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        print(f"Warning: {file_name} not found - using empty {label} data")
     except Exception as e:
-        log_event("ERROR", f"Failed to load rooms: {e}")
-        print(f"Error loading rooms.json: {e}")
-        rooms_data = {}
+        log_event("ERROR", "Failed to load %s: %s", label, str(e), level="ERROR")
+        print(f"Error loading {file_name}: {e}")
+    return None
+
+def get_source_stamps() -> Dict[str, Optional[List[int]]]:
+    """Get [mtime_ns, size] for every data source file (None if missing)."""
+    stamps = {}
+    for name, (path, _) in DATA_FILES.items():
+        try:
+            stat = os.stat(path)
+            stamps[name] = [stat.st_mtime_ns, stat.st_size]
+        except OSError:
+            stamps[name] = None
+    return stamps
+
+def hash_source_files() -> Dict[str, Optional[str]]:
+    """Get the SHA-256 digest of every data source file (None if missing)."""
+    hashes = {}
+    for name, (path, _) in DATA_FILES.items():
+        try:
+            with open(path, 'rb') as f:
+                hashes[name] = hashlib.sha256(f.read()).hexdigest()
+        except OSError:
+            hashes[name] = None
+    return hashes
+
+def save_world_snapshot(tables: Dict[str, Dict[str, Any]], hashes: Optional[Dict[str, Optional[str]]] = None) -> bool:
+    """Compile the data tables into a single versioned binary snapshot.
     
-    # Load items
+    The header records the source stamps and hashes the tables were built from,
+    so load_world_snapshot() can tell when the JSON has changed.
+    """
+    header = {
+        "version": Config.SNAPSHOT_VERSION,
+        "python": list(sys.version_info[:2]),
+        "stamps": get_source_stamps(),
+        "hashes": hashes or hash_source_files()
+    }
+    temp_path = Config.SNAPSHOT_FILE + ".tmp"
     try:
-        if os.path.exists(Config.ITEMS_FILE):
-            with open(Config.ITEMS_FILE, 'r', encoding='utf-8') as f:
-                items_data = json.load(f)
-        else:
-            print("Warning: items.json not found - using empty items data")
-            items_data = {}
+        os.makedirs(os.path.dirname(Config.SNAPSHOT_FILE), exist_ok=True)
+        with open(temp_path, 'wb') as f:
+            f.write(marshal.dumps((header, tables)))
+        os.replace(temp_path, Config.SNAPSHOT_FILE)
+        return True
     except Exception as e:
-        log_event("ERROR", f"Failed to load items: {e}")
-        print(f"Error loading items.json: {e}")
-        items_data = {}
+        log_event("ERROR", "Failed to write world snapshot: %s", str(e), level="ERROR")
+        return False
+
+def load_world_snapshot() -> Optional[Dict[str, Dict[str, Any]]]:
+    """Load the data tables from the snapshot if it matches the current sources.
     
-    # Load enemies
-    try:
-        if os.path.exists(Config.ENEMIES_FILE):
-            with open(Config.ENEMIES_FILE, 'r', encoding='utf-8') as f:
-                enemies_data = json.load(f)
-        else:
-            print("Warning: enemies.json not found - using empty enemies data")
-            enemies_data = {}
-    except Exception as e:
-        log_event("ERROR", f"Failed to load enemies: {e}")
-        print(f"Error loading enemies.json: {e}")
-        enemies_data = {}
+    Source files are compared by mtime and size first. If those differ but the
+    content hashes still match (e.g. after a fresh checkout), the snapshot is
+    reused and its header refreshed.
     
-    # Load combat text
+    Returns:
+        dict: Data tables keyed like DATA_FILES, or None if the snapshot is stale
+    """
     try:
-        if os.path.exists(Config.COMBAT_TEXT_FILE):
-            with open(Config.COMBAT_TEXT_FILE, 'r', encoding='utf-8') as f:
-                combat_text_data = json.load(f)
-        else:
-            print("Warning: combat_text.json not found - using empty combat text data")
-            combat_text_data = {}
-    except Exception as e:
-        log_event("ERROR", f"Failed to load combat text: {e}")
-        print(f"Error loading combat_text.json: {e}")
-        combat_text_data = {}
+        with open(Config.SNAPSHOT_FILE, 'rb') as f:
+            header, tables = marshal.loads(f.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
     
-    # Load quests
-    try:
-        if os.path.exists(Config.QUESTS_FILE):
-            with open(Config.QUESTS_FILE, 'r', encoding='utf-8') as f:
-                quests_data = json.load(f)
+    if header.get("version") != Config.SNAPSHOT_VERSION or header.get("python") != list(sys.version_info[:2]):
+        return None
+    if set(tables) != set(DATA_FILES) | {"room_text"}:
+        return None
+    
+    if header.get("stamps") == get_source_stamps():
+        return tables
+    
+    hashes = hash_source_files()
+    if header.get("hashes") == hashes:
+        save_world_snapshot(tables, hashes)
+        return tables
+    
+    return None
+
+def build_data_indexes() -> None:
+    """Rebuild the derived lookup indexes from the current data tables.
+    
+    There is no global enemy -> quests index: a kill is matched against the
+    player's QuestTracker subscriptions, which only hold their active quests.
+    
+    Side effects:
+        - Replaces enemies_by_room, quests_by_npc, quest_templates, enemy_templates,
+          encounter_tables, loot_tables and the item name indexes (item_ids_by_name,
+          item_search_names, item_ids_by_token_prefix)
+        - Empties enemy_pool
+    """
+    global enemies_by_room, quests_by_npc, quest_templates, enemy_templates, encounter_tables, loot_tables
+    global item_ids_by_name, item_search_names, item_ids_by_token_prefix
+    
+    new_enemies_by_room: Dict[str, List[str]] = {}
+    new_enemy_templates: Dict[str, EnemyTemplate] = {}
+    for enemy_id, enemy_data in enemies_data.items():
+        new_enemy_templates[enemy_id] = EnemyTemplate.from_data(enemy_id, enemy_data)
+        for room_id in enemy_data.get("spawn_locations", []):
+            new_enemies_by_room.setdefault(room_id, []).append(enemy_id)
+    
+    new_quests_by_npc: Dict[str, List[str]] = {}
+    new_quest_templates: Dict[str, QuestTemplate] = {}
+    for quest_id, quest_data in quests_data.items():
+        giver = quest_data.get("giver_npc")
+        if giver:
+            new_quests_by_npc.setdefault(giver, []).append(quest_id)
+        new_quest_templates[quest_id] = QuestTemplate.from_data(quest_id, quest_data)
+    
+    new_item_ids_by_name: Dict[str, str] = {}
+    new_item_search_names: Dict[str, List[str]] = {}
+    new_item_ids_by_token_prefix: Dict[str, Set[str]] = {}
+    for item_id, item_data in items_data.items():
+        names = [item_id, item_data.get("name", "")] + item_data.get("aliases", [])
+        search_names = list(dict.fromkeys(normalize_item_name(name) for name in names if name))
+        new_item_search_names[item_id] = search_names
+        for name in search_names:
+            new_item_ids_by_name.setdefault(name, item_id)
+            for token in name.split():
+                for length in range(1, len(token) + 1):
+                    new_item_ids_by_token_prefix.setdefault(token[:length], set()).add(item_id)
+    
+    enemies_by_room = new_enemies_by_room
+    quests_by_npc = new_quests_by_npc
+    quest_templates = new_quest_templates
+    enemy_templates = new_enemy_templates
+    enemy_pool.clear()
+    item_ids_by_name = new_item_ids_by_name
+    item_search_names = new_item_search_names
+    item_ids_by_token_prefix = new_item_ids_by_token_prefix
+    encounter_tables = build_encounter_tables()
+    loot_tables = build_loot_tables()
+
+def split_room_text(rooms: Dict[str, Dict[str, Any]]) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+    """Separate hot room fields from the long text fields in Config.ROOM_TEXT_FIELDS.
+    
+    Returns:
+        tuple: (rooms with hot fields only, room_id -> text fields)
+    """
+    hot_rooms = {}
+    text_by_room = {}
+    for room_id, room in rooms.items():
+        hot_rooms[room_id] = {key: value for key, value in room.items() if key not in Config.ROOM_TEXT_FIELDS}
+        text_by_room[room_id] = {key: room[key] for key in Config.ROOM_TEXT_FIELDS if key in room}
+    return hot_rooms, text_by_room
+
+def set_data_tables(tables: Dict[str, Dict[str, Any]]) -> None:
+    """Install a new set of data tables and rebuild the derived indexes.
+    
+    Side effects:
+        - Rebinds rooms_data, items_data, enemies_data, combat_text_data, quests_data
+    """
+    global rooms_data, items_data, enemies_data, combat_text_data, quests_data
+    
+    rooms_data = tables["rooms"]
+    items_data = tables["items"]
+    enemies_data = tables["enemies"]
+    combat_text_data = tables["combat_text"]
+    quests_data = tables["quests"]
+    build_data_indexes()
+
+def load_game_data(rebuild_cache: bool = False) -> None:
+    """Load all game data, from the world snapshot when it is current.
+    
+    Falls back to parsing the JSON files when the snapshot is missing or stale
+    (or rebuild_cache is set), then recompiles the snapshot for the next start.
+    Room descriptions and details are not kept in rooms_data; they live in the
+    room text store and are read when a Room needs them.
+    
+    Side effects:
+        - Populates rooms_data, items_data, enemies_data, combat_text_data, quests_data dictionaries
+        - Opens (or rebuilds) the room text store
+        - Rebuilds the derived lookup indexes (see build_data_indexes)
+        - Writes Config.SNAPSHOT_FILE and Config.ROOM_TEXT_FILE when it had to parse the JSON
+        - Records timings in data_load_report
+    """
+    start = time.perf_counter()
+    tables = None if rebuild_cache else load_world_snapshot()
+    data_load_report.clear()
+    
+    # The snapshot is only usable together with the room text file it indexes
+    if tables is not None and not room_text.open(Config.ROOM_TEXT_FILE, tables["room_text"]):
+        tables = None
+    
+    if tables is not None:
+        data_load_report["source"] = "snapshot"
+    else:
+        tables = {}
+        complete = True
+        for name, (path, label) in DATA_FILES.items():
+            table = load_json_file(path, label)
+            if table is None:
+                complete = False
+                table = {}
+            tables[name] = table
+        data_load_report["source"] = "json"
+        data_load_report["parse_seconds"] = time.perf_counter() - start
+        
+        # Split long room text out into the memory-mapped store
+        tables["rooms"], text_by_room = split_room_text(tables["rooms"])
+        tables["room_text"] = room_text.build(Config.ROOM_TEXT_FILE, text_by_room)
+        
+        # Only cache a complete world, so missing/broken files keep reporting errors
+        if complete and tables["room_text"]:
+            write_start = time.perf_counter()
+            data_load_report["snapshot_written"] = save_world_snapshot(tables)
+            data_load_report["write_seconds"] = time.perf_counter() - write_start
+    
+    set_data_tables(tables)
+    
+    data_load_report["total_seconds"] = time.perf_counter() - start
+    log_event("SYSTEM", "Loaded %d rooms, %d items, %d enemies, %d combat text categories, %d quests from %s in %.1f ms",
+              len(rooms_data), len(items_data), len(enemies_data), len(combat_text_data), len(quests_data),
+              data_load_report["source"], data_load_report["total_seconds"] * 1000)
+
+def print_startup_report() -> None:
+    """Show how the world data was loaded and how long it took."""
+    report = data_load_report
+    print("\n=== STARTUP REPORT ===")
+    print(f"World data source: {report.get('source', 'not loaded')}")
+    if "parse_seconds" in report:
+        print(f"JSON parse: {report['parse_seconds'] * 1000:.1f} ms")
+    if "write_seconds" in report:
+        status = "written" if report.get("snapshot_written") else "FAILED"
+        print(f"Snapshot {status}: {report['write_seconds'] * 1000:.1f} ms ({Config.SNAPSHOT_FILE})")
+    print(f"Total load time: {report.get('total_seconds', 0) * 1000:.1f} ms")
+    print(f"Loaded {len(rooms_data)} rooms, {len(items_data)} items, {len(enemies_data)} enemies, "
+          f"{len(combat_text_data)} combat text categories, {len(quests_data)} quests")
+    print("=" * 22)
+
+# === [HOT RELOAD] ===
+class DataWatcher:
+    """Polls the data source files and collects the tables whose file changed.
+    
+    The watcher thread only detects changes; apply_pending_reloads() swaps the
+    new data in on the game thread between commands, so a command never sees a
+    half-updated world.
+    """
+    
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._stamps = get_source_stamps()
+        self._changed: List[str] = []
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self) -> None:
+        """Start polling in a background thread (idempotent)."""
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="data-watcher", daemon=True)
+        self._thread.start()
+    
+    def stop(self) -> None:
+        """Stop the polling thread."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+    
+    def poll(self) -> None:
+        """Compare file stamps with the last poll and record changed tables."""
+        stamps = get_source_stamps()
+        with self._lock:
+            for name, stamp in stamps.items():
+                if stamp != self._stamps.get(name) and stamp is not None and name not in self._changed:
+                    self._changed.append(name)
+            self._stamps = stamps
+    
+    def take_changes(self) -> List[str]:
+        """Return and clear the changed table names, in DATA_FILES order."""
+        with self._lock:
+            changed = [name for name in DATA_FILES if name in self._changed]
+            self._changed = []
+        return changed
+    
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self.poll()
+
+data_watcher: Optional[DataWatcher] = None
+
+def diff_tables(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, List[str]]:
+    """Compare two data tables by key.
+    
+    Returns:
+        dict: {'added': [...], 'removed': [...], 'changed': [...]}
+    """
+    return {
+        "added": [key for key in new if key not in old],
+        "removed": [key for key in old if key not in new],
+        "changed": [key for key in new if key in old and new[key] != old[key]]
+    }
+
+TEMPLATE_BUILDERS = {"enemies": EnemyTemplate.from_data, "quests": QuestTemplate.from_data}
+
+def find_template_error(name: str, table: Dict[str, Any]) -> Optional[str]:
+    """Check that every entry of a table builds its frozen template.
+    
+    Returns:
+        str: Description of the first bad entry, or None if the table is usable
+    """
+    builder = TEMPLATE_BUILDERS.get(name)
+    if builder is None:
+        return None
+    for key, data in table.items():
+        try:
+            builder(key, data)
+        except KeyError as e:
+            return f"'{key}' is missing {e}"
+        except (TypeError, ValueError, AttributeError) as e:
+            return f"'{key}' is malformed ({e})"
+    return None
+
+def reload_data_files(names: List[str], sessions: Iterable['GameSession'] = ()) -> Dict[str, Dict[str, List[str]]]:
+    """Reparse the named data tables and swap them into the running game.
+    
+    Only the given files are read. A file that fails to parse, or has an enemy
+    or quest that can't be built, is skipped and the current table kept, so a
+    half-saved edit never breaks a live game. The
+    given sessions get their rooms and quest trackers brought up to date;
+    anything that prints for a session goes to its own output sink, if any.
+    
+    Returns:
+        dict: Table name -> diff (see diff_tables) for every table that was swapped
+    """
+    tables = {
+        "rooms": rooms_data,
+        "items": items_data,
+        "enemies": enemies_data,
+        "combat_text": combat_text_data,
+        "quests": quests_data
+    }
+    diffs = {}
+    
+    for name in names:
+        path, label = DATA_FILES[name]
+        new_table = load_json_file(path, label)
+        if new_table is None:
+            log_event("RELOAD", "Kept current %s data; %s could not be loaded", label, os.path.basename(path), level="WARNING")
+            continue
+        
+        # Check templates before anything is swapped, so a bad entry can't leave half the globals replaced
+        problem = find_template_error(name, new_table)
+        if problem:
+            print(f"Error loading {os.path.basename(path)}: {problem}")
+            log_event("RELOAD", "Kept current %s data; %s", label, problem, level="WARNING")
+            continue
+        
+        if name == "rooms":
+            # Compare complete rooms, since rooms_data only holds the hot fields
+            old_rooms = {room_id: {**room, **room_text.peek(room_id)} for room_id, room in rooms_data.items()}
+            diffs[name] = diff_tables(old_rooms, new_table)
+            new_table, text_by_room = split_room_text(new_table)
+            room_text.build(Config.ROOM_TEXT_FILE, text_by_room)
         else:
-            print("Warning: quests.json not found - using empty quests data")
-            quests_data = {}
-    except Exception as e:
-        log_event("ERROR", f"Failed to load quests: {e}")
-        print(f"Error loading quests.json: {e}")
-        quests_data = {}
+            diffs[name] = diff_tables(tables[name], new_table)
+        tables[name] = new_table
+    
+    if not diffs:
+        return diffs
+    
+    old_rooms_data = rooms_data  # Live rooms were built from these templates
+    set_data_tables(tables)
+    
+    for name, diff in diffs.items():
+        log_event("RELOAD", "%s: %d added, %d removed, %d changed", os.path.basename(DATA_FILES[name][0]),
+                  len(diff["added"]), len(diff["removed"]), len(diff["changed"]), table=name, **diff)
+    
+    for session in sessions:
+        with printing_to(session.output):  # Each player hears about their own move
+            if "rooms" in diffs:
+                session.world.refresh(diffs["rooms"]["changed"] + diffs["rooms"]["removed"], old_rooms_data)
+                ensure_valid_location(session)
+            
+            if "quests" in diffs and session.player:
+                session.player.quests.rebuild()
+    
+    return diffs
+
+def ensure_valid_location(session: 'GameSession') -> None:
+    """Move the player somewhere safe if their room disappeared in a reload."""
+    if session.last_save_room not in rooms_data:
+        session.last_save_room = "tavern" if "tavern" in rooms_data else next(iter(rooms_data), "tavern")
+    
+    if session.current_room not in rooms_data:
+        old_room = session.current_room
+        session.current_room = session.last_save_room
+        if session.player:
+            session.player.enter_room(session.last_save_room)
+        room_name = rooms_data[session.last_save_room].get("name", session.last_save_room)
+        print(f"\nThe world shifts around you... you find yourself back at {room_name}.")
+        log_event("RELOAD", "Moved player from removed room %s to %s", old_room, session.last_save_room)
+
+def apply_pending_reloads(sessions: Iterable['GameSession']) -> None:
+    """Swap in any data files the watcher has seen change since the last command."""
+    if data_watcher is None:
+        return
+    
+    names = data_watcher.take_changes()
+    if not names:
+        return
     
-    log_event("SYSTEM", f"Loaded {len(rooms_data)} rooms, {len(items_data)} items, {len(enemies_data)} enemies, {len(combat_text_data)} combat text categories, {len(quests_data)} quests")
+    print_reload_summary(reload_data_files(names, sessions), prefix="[reload] ")
+
+def print_reload_summary(diffs: Dict[str, Dict[str, List[str]]], prefix: str = "") -> None:
+    """Show one line per reloaded data file."""
+    for name, diff in diffs.items():
+        summary = ", ".join(f"{len(keys)} {kind}" for kind, keys in diff.items() if keys) or "no changes"
+        print(f"{prefix}{os.path.basename(DATA_FILES[name][0])}: {summary}")
 
 # === [COMMAND PROCESSING] ===
-def process_command(input_text: str) -> None:
+def process_command(session: 'GameSession', input_text: str) -> None:
     """Process a player command and execute the appropriate action.
     
     Side effects:
         - May modify game state
         - May display output to player
         - May log events
+        - Answers session.pending instead when a question is waiting
+        - Records the command's timings in perf_stats
     """
-    command_data = parse_command(input_text)
-    
-    if not command_data['valid']:
-        print(command_data['error'])
-        return
-    
-    action = command_data['action']
-    target = command_data['target']
-    
-    # Execute the command
+    started = time.perf_counter_ns()
+    action = 'answer'
+    try:
+        if session.pending:
+            answer_prompt(session, input_text)
+            return
+        
+        command_data = parse_command(input_text, session.mode)
+        parsed = time.perf_counter_ns()
+        perf_stats.record_phase("parse", parsed - started)
+        
+        if not command_data['valid']:
+            action = 'invalid'
+            print(command_data['error'])
+            return
+        
+        action = command_data['action']
+        nested_before = perf_stats.nested_ns
+        dispatch_command(session, action, command_data['target'], input_text)
+        perf_stats.record_phase("dispatch", time.perf_counter_ns() - parsed - (perf_stats.nested_ns - nested_before))
+    finally:
+        perf_stats.record_command(action, time.perf_counter_ns() - started)
+
+def dispatch_command(session: 'GameSession', action: str, target: str, input_text: str) -> None:
+    """Run the handler for a parsed, valid command (input_text is the raw line it came from)."""
     if action == 'move':
-        if game_state['mode'] == 'combat':
+        if session.mode == 'combat':
             print("You can't move during combat!")
         else:
-            move_player(target)
+            move_player(session, target)
     elif action == 'look_room':
-        if game_state['mode'] == 'combat':
+        if session.mode == 'combat':
             print("You're too busy fighting to look around!")
         else:
-            display_room()
+            display_room(session)
     elif action == 'examine':
-        if game_state['mode'] == 'combat':
+        if session.mode == 'combat':
             print("You're too busy fighting to examine things!")
         else:
-            examine_object(target)
+            examine_object(session, target)
     elif action == 'take':
-        if game_state['mode'] == 'combat':
+        if session.mode == 'combat':
             print("You can't pick up items during combat!")
         else:
-            take_item(target)
+            take_item(session, target)
     elif action == 'drop':
-        if game_state['mode'] == 'combat':
+        if session.mode == 'combat':
             print("You can't drop items during combat!")
         else:
-            drop_item(target)
+            drop_item(session, target)
     elif action == 'inventory':
-        show_inventory()
+        show_inventory(session)
     elif action == 'use':
-        use_item(target)
+        use_item(session, target)
     elif action == 'stats':
-        display_stats()
+        display_stats(session)
     elif action == 'buy':
-        if game_state['mode'] == 'combat':
+        if session.mode == 'combat':
             print("You can't shop during combat!")
         else:
-            buy_item(target)
+            buy_item(session, target)
     elif action == 'sell':
-        if game_state['mode'] == 'combat':
+        if session.mode == 'combat':
             print("You can't shop during combat!")
         else:
-            sell_item(target)
+            sell_item(session, target)
     elif action == 'talk':
-        if game_state['mode'] == 'combat':
+        if session.mode == 'combat':
             print("You're too busy fighting to chat!")
         else:
-            talk_to_npc(target)
+            talk_to_npc(session, target)
     elif action == 'heal':
-        if game_state['mode'] == 'combat':
+        if session.mode == 'combat':
             print("You can't use healing services during combat!")
         else:
-            heal_at_tavern()
+            heal_at_tavern(session)
     elif action == 'quests':
-        show_quests()
+        show_quests(session)
     elif action == 'reputation':
-        show_reputation()
+        show_reputation(session)
+    elif action == 'consider':
+        consider_enemy(session, target)
+    elif action == 'bestiary':
+        show_bestiary(target)
     elif action == 'accept':
-        if game_state['mode'] == 'combat':
+        if session.mode == 'combat':
             print("You can't accept quests during combat!")
         else:
-            accept_quest_from_npc(target)
+            accept_quest_from_npc(session, target)
     elif action == 'complete':
-        if game_state['mode'] == 'combat':
+        if session.mode == 'combat':
             print("You can't complete quests during combat!")
         else:
-            complete_quest_with_rewards(target)
+            complete_quest_with_rewards(session, target)
     elif action == 'recall':
-        if game_state['mode'] == 'combat':
+        if session.mode == 'combat':
             print("You can't recall during combat!")
         else:
-            recall_to_town()
+            recall_to_town(session)
     # Combat commands
     elif action == 'attack':
-        if game_state['mode'] == 'combat':
-            process_combat_turn('attack')
+        if session.mode == 'combat':
+            process_combat_turn(session, 'attack')
         else:
             print("There's nothing to attack here!")
     elif action == 'defend':
-        if game_state['mode'] == 'combat':
-            process_combat_turn('defend')
+        if session.mode == 'combat':
+            process_combat_turn(session, 'defend')
         else:
             print("You're not in combat!")
     elif action == 'flee':
-        if game_state['mode'] == 'combat':
-            process_combat_turn('flee')
+        if session.mode == 'combat':
+            process_combat_turn(session, 'flee')
         else:
             print("There's nothing to flee from!")
     # System commands
     elif action == 'help':
         display_help(target)
     elif action == 'save':
-        if game_state['mode'] == 'combat':
+        if session.mode == 'combat':
             print("You can't save during combat!")
         else:
-            save_game()
+            save_game(session)
     elif action == 'load':
-        if game_state['mode'] == 'combat':
+        if session.mode == 'combat':
             print("You can't load during combat!")
         else:
-            manual_load_game()
+            manual_load_game(session)
     elif action == 'quit':
-        confirm_quit()
+        confirm_quit(session)
     elif action == 'debug':
-        if target == 'info':
-            display_debug_info()
+        if not session.allow_debug:
+            print("Debug commands are disabled.")
+        elif target == 'info':
+            display_debug_info(session)
         elif target == 'toggle':
-            game_state['debug_mode'] = not game_state['debug_mode']
-            print(f"Debug mode {'enabled' if game_state['debug_mode'] else 'disabled'}")
+            session.debug_mode = not session.debug_mode
+            print(f"Debug mode {'enabled' if session.debug_mode else 'disabled'}")
+        elif target == 'encounters' or target.startswith('encounters '):
+            room_arg = target[len('encounters'):].strip()
+            if room_arg == 'all':
+                for room_id in rooms_data:
+                    if room_id in encounter_tables:
+                        show_encounter_table(room_id)
+            else:
+                show_encounter_table(room_arg or session.current_room)
+        elif target == 'reload':
+            if session.peers is None:
+                print("Hot reload isn't available on a server with --server-workers.")
+            else:
+                print_reload_summary(reload_data_files(list(DATA_FILES), session.peers))
+        elif target == 'perf' or target.startswith('perf '):
+            raw_words = input_text.strip().split(None, 2)
+            handle_perf_command(target[len('perf'):].strip(), raw_words[2] if len(raw_words) > 2 else "")
         elif target.startswith('spawn '):
             enemy_id = target[6:]  # Remove 'spawn '
             if enemy_id in enemies_data:
-                start_combat(enemy_id)
+                start_combat(session, enemy_id)
             else:
                 print(f"Unknown enemy: {enemy_id}")
         else:
-            print("Debug commands: 'debug info', 'debug toggle', 'debug spawn <enemy>'")
+            print("Debug commands: 'debug info', 'debug toggle', 'debug spawn <enemy>', 'debug reload',")
+            print("                'debug encounters [<room>|all]', 'debug perf [reset | dump [<name>]]'")
     else:
         print(f"Command '{action}' not implemented yet.")
 
-def confirm_quit() -> None:
+def confirm_quit(session: 'GameSession') -> None:
     """Confirm quit and handle saving."""
-    print("Are you sure you want to quit? (y/n)")
-    print("Your progress will be lost unless you save first.")
-    choice = input("> ").strip().lower()
-    
-    if choice in ['y', 'yes']:
-        print("\nThanks for playing!")
-        log_event("SYSTEM", "Player quit game")
-        game_state['running'] = False
+    if session.save_on_exit:
+        question = "Are you sure you want to quit? (y/n)\nYour game will be saved."
     else:
-        print("Continuing game...")
+        question = "Are you sure you want to quit? (y/n)\nYour progress will be lost unless you save first."
+    ask_confirmation(session, question, complete_quit, lambda session: print("Continuing game..."))
+
+def complete_quit(session: 'GameSession') -> None:
+    """End the session after the player confirmed quitting."""
+    print("\nThanks for playing!")
+    log_event("SYSTEM", "Player quit game")
+    flush_logs()
+    session.running = False
+
+def ask_confirmation(session: 'GameSession', question: str, on_yes: Callable[['GameSession'], None],
+                     on_no: Callable[['GameSession'], None]) -> None:
+    """Ask a yes/no question; the player's next line answers it (see answer_prompt).
+    
+    Side effects:
+        - Sets session.pending, replacing any unanswered question
+    """
+    print(question)
+    session.pending = PendingPrompt(question, on_yes, on_no)
+
+def answer_prompt(session: 'GameSession', answer: str) -> None:
+    """Resolve the session's pending question with the player's answer."""
+    prompt, session.pending = session.pending, None
+    if normalize_input(answer) in ('y', 'yes'):
+        prompt.on_yes(session)
+    else:
+        prompt.on_no(session)
+
+# === [NETWORK SERVER] ===
+TELNET_IAC, TELNET_SB, TELNET_SE = 255, 250, 240
+
+def strip_telnet(data: bytes) -> bytes:
+    """Remove telnet negotiation (IAC sequences) from a line of client input."""
+    out = bytearray()
+    index = 0
+    while index < len(data):
+        byte = data[index]
+        if byte != TELNET_IAC:
+            out.append(byte)
+            index += 1
+        elif index + 1 < len(data) and data[index + 1] == TELNET_IAC:
+            out.append(TELNET_IAC)  # Escaped 255
+            index += 2
+        elif index + 1 < len(data) and data[index + 1] == TELNET_SB:
+            end = data.find(bytes([TELNET_IAC, TELNET_SE]), index + 2)
+            index = len(data) if end == -1 else end + 2
+        elif index + 1 < len(data) and 251 <= data[index + 1] <= 254:
+            index += 3  # WILL/WONT/DO/DONT <option>
+        else:
+            index += 2
+    return bytes(out)
+
+current_output: contextvars.ContextVar = contextvars.ContextVar("current_output", default=None)
+
+class OutputRouter(io.TextIOBase):
+    """sys.stdout stand-in that sends print() to the current context's sink.
+    
+    Outside printing_to() (the console, the data watcher thread) text goes to
+    the real stdout, so only the code running for a session writes into it.
+    """
+    
+    def __init__(self, console):
+        self.console = console
+    
+    def write(self, text: str) -> int:
+        sink = current_output.get()
+        return (self.console if sink is None else sink).write(text)
+    
+    def flush(self) -> None:
+        self.console.flush()
+
+def install_output_router() -> None:
+    """Route sys.stdout through an OutputRouter (once)."""
+    if not isinstance(sys.stdout, OutputRouter):
+        sys.stdout = OutputRouter(sys.stdout)
+
+@contextlib.contextmanager
+def printing_to(sink: Optional[io.StringIO]):
+    """Send this context's prints to sink while the block runs (None: leave them where they go)."""
+    if sink is None:
+        yield
+        return
+    install_output_router()
+    token = current_output.set(sink)
+    try:
+        yield
+    finally:
+        current_output.reset(token)
+
+def take_output(buffer: io.StringIO) -> str:
+    """Empty a buffer, returning what it held."""
+    text = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return text
+
+def run_captured(handler, *args) -> str:
+    """Run a game handler for a network session and return what it printed.
+    
+    When the first argument is a session with its own output sink, prints go
+    there, so anything already waiting in it (a reload moving the player)
+    comes out first; otherwise they go to a fresh buffer.
+    """
+    session = args[0] if args and isinstance(args[0], GameSession) else None
+    buffer = session.output if session is not None and session.output is not None else io.StringIO()
+    with printing_to(buffer):
+        try:
+            handler(*args)
+        except Exception as e:
+            print("\nSomething went wrong with that command.")
+            log_event("ERROR", "%s failed: %s", handler.__name__, str(e), level="ERROR")
+    return take_output(buffer)
+
+def end_session(session: 'GameSession') -> None:
+    """Save a network session that is going away (a fight in progress is called off)."""
+    if session.combat:
+        enemy_pool.release(session.combat.enemy)
+        session.combat = None
+        session.mode = 'exploration'
+    save_game(session)
+
+class GameServer:
+    """Line-based (telnet-compatible) front end running many sessions in one event loop.
+    
+    Each connection logs in with a player name, which picks its save file, and
+    then sends one command per line. A command's output is collected and sent
+    in one write. Connections idle for Config.SERVER_IDLE_TIMEOUT are saved and
+    closed; on SIGINT/SIGTERM every session is saved before the server exits.
+    """
+    
+    def __init__(self, host: str = Config.SERVER_HOST, port: int = Config.SERVER_PORT,
+                 idle_timeout: float = Config.SERVER_IDLE_TIMEOUT, allow_debug: bool = False):
+        self.host = host
+        self.port = port
+        self.idle_timeout = idle_timeout
+        self.allow_debug = allow_debug  # Let clients use 'debug' commands (operator setting)
+        self.hot_reload = True          # 'debug reload' swaps this process's tables for every session
+        self.sessions: Dict[str, GameSession] = {}  # lower-case name -> session
+        self.writers: Dict[str, asyncio.StreamWriter] = {}
+        self.stopping: Optional[asyncio.Event] = None
+        self.tasks: Set[asyncio.Task] = set()
+    
+    async def serve(self) -> None:
+        """Accept connections until stop() is called, then save everyone and close."""
+        self.stopping = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signum, self.stop)
+            except (NotImplementedError, RuntimeError):
+                pass  # Not supported on this platform; Ctrl+C still raises KeyboardInterrupt
+        
+        server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        addresses = ", ".join(f"{sock.getsockname()[0]}:{sock.getsockname()[1]}" for sock in server.sockets)
+        print(f"Serving {Config.GAME_TITLE} on {addresses}")
+        log_event("SERVER", "Listening on %s", addresses)
+        
+        async with server:
+            await self.stopping.wait()
+        await self.shutdown()
+    
+    def stop(self) -> None:
+        """Ask serve() to shut down."""
+        if self.stopping is not None:
+            self.stopping.set()
+    
+    async def shutdown(self) -> None:
+        """Save and disconnect every session."""
+        for key, session in list(self.sessions.items()):
+            farewell = run_captured(end_session, session)
+            await self.send(self.writers[key], farewell + "\nThe server is shutting down. Your game has been saved.\n")
+        for task in list(self.tasks):
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        log_event("SERVER", "Shut down, %d sessions saved", len(self.sessions))
+        flush_logs()
+    
+    async def send(self, writer: asyncio.StreamWriter, text: str) -> None:
+        """Write buffered output to a client as telnet lines."""
+        if not text or writer.is_closing():
+            return
+        writer.write(text.replace("\n", "\r\n").encode("utf-8"))
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+    
+    async def deliver_queued_output(self, skip: str) -> None:
+        """Send other sessions what a reload left in their sinks, with a fresh prompt."""
+        for key, session in list(self.sessions.items()):
+            if key != skip and session.output is not None and session.output.tell():
+                await self.send(self.writers[key], run_captured(display_prompt, session))
+    
+    async def read_raw_line(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> Optional[bytes]:
+        """Read one line of input as received (None on idle timeout or connection error)."""
+        try:
+            return await asyncio.wait_for(reader.readline(), timeout=self.idle_timeout)
+        except asyncio.TimeoutError:
+            await self.send(writer, "\nYou have been idle for too long.\n")
+            return None
+        except ConnectionError:
+            return None
+    
+    async def read_line(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                        key: Optional[str] = None) -> Optional[str]:
+        """Read one line of input (None on disconnect or idle timeout).
+        
+        key is the lower-case name of the logged-in session the line is for.
+        """
+        data = await self.read_raw_line(reader, writer)
+        if not data:
+            return None
+        return strip_telnet(data).decode("utf-8", errors="replace").strip()
+    
+    async def login(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> Optional[str]:
+        """Ask for a player name until a valid, free one is given."""
+        while True:
+            await self.send(writer, "What is your name, adventurer? ")
+            name = await self.read_line(reader, writer)
+            if name is None:
+                return None
+            if not re.fullmatch(Config.SERVER_NAME_PATTERN, name):
+                await self.send(writer, "Names are 2-20 letters, digits, '-' or '_', starting with a letter.\n")
+            elif self.is_playing(name.lower()):
+                await self.send(writer, f"{name} is already playing.\n")
+            else:
+                return name
+    
+    def is_playing(self, key: str) -> bool:
+        """Check whether a player name is already connected."""
+        return key in self.sessions
+    
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Greet a new client, ask their name and run their game."""
+        task = asyncio.current_task()
+        self.tasks.add(task)
+        try:
+            await self.send(writer, run_captured(display_title))
+            name = await self.login(reader, writer)
+            if name is None:
+                writer.close()
+                return
+            await self.play(reader, writer, name)
+        except asyncio.CancelledError:
+            writer.close()
+        finally:
+            self.tasks.discard(task)
+    
+    async def play(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                   name: str, resumed: bool = False, state: Optional[Dict[str, Any]] = None) -> None:
+        """Run a logged-in client's game until they quit, disconnect or idle out.
+        
+        resumed: the session was handed over by another worker and the client
+        is already looking at a prompt; state is the game it was playing (from
+        session_to_dict, plus its first_play flag), used instead of the save file.
+        """
+        key = name.lower()
+        try:
+            session = GameSession(save_file=os.path.join(Config.SAVES_DIR, f"{key}.json"))
+            session.save_on_exit = True
+            session.output = io.StringIO()
+            session.allow_debug = self.allow_debug
+            session.peers = self.sessions.values() if self.hot_reload else None
+            self.sessions[key] = session
+            self.writers[key] = writer
+            
+            if state is not None:
+                restore_session(session, state)
+                session.first_play = state.get("first_play", False)
+                output = ""
+            else:
+                output = run_captured(load_game, session)
+            if session.player is None:
+                session.player = Player(name=name)
+            if resumed:
+                output = ""
+            else:
+                log_event("SERVER", "%s connected", name, player=name)
+                output += run_captured(display_room, session)
+            
+            while session.running:
+                if session.mode == 'combat' and not session.pending:
+                    output += run_captured(display_combat_status, session)
+                if not resumed:
+                    output += run_captured(display_prompt, session)
+                resumed = False
+                await self.send(writer, output)
+                output = ""
+                
+                line = await self.read_line(reader, writer, key)
+                if line is None:
+                    break
+                if line or session.pending:  # Enter alone answers "no" to a question
+                    apply_pending_reloads(self.sessions.values())
+                    output = run_captured(process_command, session, line)
+                    await self.deliver_queued_output(key)
+            
+            await self.send(writer, output + run_captured(end_session, session))
+            log_event("SERVER", "%s disconnected", name, player=name)
+        finally:
+            self.sessions.pop(key, None)
+            self.writers.pop(key, None)
+            writer.close()
+
+def run_server(host: str, port: int, watch: bool = False, allow_debug: bool = False) -> int:
+    """Load the world once and serve it to network clients until stopped.
+    
+    Returns:
+        int: process exit code
+    """
+    global data_watcher
+    
+    setup_directories()
+    load_game_data()
+    if watch or Config.HOT_RELOAD:
+        data_watcher = DataWatcher(Config.HOT_RELOAD_INTERVAL)
+        data_watcher.start()
+    
+    try:
+        asyncio.run(GameServer(host, port, allow_debug=allow_debug).serve())
+    except OSError as e:
+        print(f"Could not start the server: {e}")
+        return 1
+    return 0
+
+# === [SERVER SUPERVISOR] ===
+class SessionDetached(Exception):
+    """Raised in a worker's read loop when its session is handed back to the supervisor."""
+    
+    def __init__(self, fd: int, leftover: bytes, state: Dict[str, Any]):
+        super().__init__(fd)
+        self.fd = fd
+        self.leftover = leftover
+        self.state = state
+
+def send_control(sock: socket.socket, message: Dict[str, Any], fds: Tuple[int, ...] = ()) -> bool:
+    """Send one JSON control message (and any file descriptors) over a supervisor/worker socket."""
+    try:
+        socket.send_fds(sock, [json.dumps(message).encode("utf-8")], list(fds))
+        return True
+    except OSError:
+        return False
+
+def receive_control(sock: socket.socket) -> Tuple[Optional[Dict[str, Any]], List[int]]:
+    """Read one control message; (None, []) once the other side has gone."""
+    try:
+        data, fds, _, _ = socket.recv_fds(sock, Config.SUPERVISOR_MESSAGE_BYTES, 4)
+    except OSError:
+        return None, []
+    if not data:
+        return None, list(fds)
+    return json.loads(data), list(fds)
+
+class ShardWorker(GameServer):
+    """A forked server process playing the sessions the supervisor hands it.
+    
+    Clients arrive as file descriptors over the control socket, already
+    logged in. When asked to shed load, idle sessions (waiting at the prompt,
+    not fighting or answering a question) are serialized and sent back to the
+    supervisor with their sockets, and it attaches them to another worker.
+    Hot reload is off: it would only change this worker's copy of the tables.
+    """
+    
+    def __init__(self, index: int, control: socket.socket, allow_debug: bool = False):
+        super().__init__(host="", port=0, allow_debug=allow_debug)
+        self.hot_reload = False
+        self.index = index
+        self.control = control
+        self.readers: Dict[str, asyncio.StreamReader] = {}
+        self.waiting: Set[str] = set()    # sessions blocked reading their next line
+        self.detaching: Set[str] = set()  # sessions being handed back
+    
+    async def serve(self) -> None:
+        """Play handed-over sessions until the supervisor (or SIGTERM) says stop."""
+        self.stopping = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        loop.add_signal_handler(signal.SIGTERM, self.stop)
+        loop.add_reader(self.control.fileno(), self.on_control)
+        reporter = asyncio.create_task(self.report_stats())
+        
+        await self.stopping.wait()
+        loop.remove_reader(self.control.fileno())
+        reporter.cancel()
+        await self.shutdown()
+    
+    async def report_stats(self) -> None:
+        while True:
+            send_control(self.control, {"op": "stats", "sessions": len(self.sessions), "cpu": time.process_time()})
+            await asyncio.sleep(Config.SUPERVISOR_STATS_INTERVAL)
+    
+    def on_control(self) -> None:
+        """Handle one message from the supervisor."""
+        message, fds = receive_control(self.control)
+        if message is None:
+            self.stop()  # Supervisor is gone
+        elif message["op"] == "attach":
+            task = asyncio.create_task(self.attach(fds[0], message["name"], bytes.fromhex(message["leftover"]),
+                                                   message.get("resumed", False), message.get("state")))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+        elif message["op"] == "shed":
+            self.shed(message["count"])
+        elif message["op"] == "shutdown":
+            self.stop()
+    
+    async def attach(self, fd: int, name: str, leftover: bytes, resumed: bool,
+                     state: Optional[Dict[str, Any]] = None) -> None:
+        """Start playing a client socket received from the supervisor."""
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader()
+        reader.feed_data(leftover)  # Input the client typed ahead before the hand-over
+        protocol = asyncio.StreamReaderProtocol(reader)
+        transport, _ = await loop.connect_accepted_socket(lambda: protocol, socket.socket(fileno=fd))
+        writer = asyncio.StreamWriter(transport, protocol, reader, loop)
+        key = name.lower()
+        self.readers[key] = reader
+        try:
+            await self.play(reader, writer, name, resumed, state)
+            send_control(self.control, {"op": "closed", "name": key})
+        except SessionDetached as detached:
+            send_control(self.control, {"op": "detached", "name": name, "leftover": detached.leftover.hex(),
+                                        "state": detached.state}, (detached.fd,))
+            os.close(detached.fd)
+        except asyncio.CancelledError:
+            pass  # Shutdown already saved this session
+        finally:
+            self.readers.pop(key, None)
+            self.detaching.discard(key)
+    
+    def shed(self, count: int) -> None:
+        """Hand up to count idle sessions back to the supervisor."""
+        for key in list(self.waiting):
+            if count <= 0:
+                break
+            session = self.sessions.get(key)
+            if session is None or session.mode != 'exploration' or session.pending or key in self.detaching:
+                continue
+            self.detaching.add(key)
+            self.writers[key].transport.pause_reading()
+            self.readers[key].feed_eof()  # Wakes the pending read_line
+            count -= 1
+    
+    async def read_line(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                        key: Optional[str] = None) -> Optional[str]:
+        """Read one line, or raise SessionDetached if the session is being handed back."""
+        if key is not None:
+            self.waiting.add(key)
+        try:
+            data = await self.read_raw_line(reader, writer)
+        finally:
+            self.waiting.discard(key)
+        if key not in self.detaching:
+            return strip_telnet(data).decode("utf-8", errors="replace").strip() if data else None
+        
+        # Give up the session without touching its save file; the supervisor passes
+        # the socket, the unread input (including a line that just arrived) and the game on
+        session = self.sessions[key]
+        state = session_to_dict(session)
+        state["first_play"] = session.first_play
+        leftover = (data or b"") + await reader.read()
+        fd = os.dup(writer.get_extra_info("socket").fileno())
+        raise SessionDetached(fd, leftover, state)
+
+@dataclass
+class WorkerHandle:
+    """The supervisor's view of one worker process."""
+    index: int
+    pid: int
+    control: socket.socket
+    alive: bool = True
+    sessions: int = 0           # as last reported by the worker
+    cpu_seconds: float = 0.0    # worker CPU time at the last report
+    cpu_percent: float = 0.0    # CPU use over the last stats interval
+    reported_at: float = 0.0
+
+class Supervisor(GameServer):
+    """Accepts clients and spreads their sessions over forked worker processes.
+    
+    Content is loaded once and the heap frozen (gc.freeze) before forking, so
+    the workers share those pages copy-on-write. The supervisor greets each
+    client and asks their name, then routes the session to a worker by a hash
+    of the name (or to wherever it was last moved) and passes the socket over
+    with send_fds. Workers report session counts and CPU time; when the counts
+    drift more than Config.SUPERVISOR_MAX_IMBALANCE apart, the busiest worker
+    hands idle sessions back to be reattached to the least busy one.
+    """
+    
+    def __init__(self, host: str, port: int, worker_count: int, allow_debug: bool = False):
+        super().__init__(host, port, allow_debug=allow_debug)
+        self.worker_count = worker_count
+        self.workers: List[WorkerHandle] = []
+        self.placement: Dict[str, int] = {}  # connected player key -> worker index
+        self.routes: Dict[str, int] = {}     # player key -> worker it was moved to
+        self.listener: Optional[socket.socket] = None
+    
+    def start_workers(self) -> None:
+        """Bind the listening socket and fork the workers (before any event loop exists)."""
+        self.listener = socket.create_server((self.host, self.port), reuse_port=False)
+        flush_logs()
+        gc.freeze()
+        
+        for index in range(self.worker_count):
+            parent_end, child_end = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+            for end in (parent_end, child_end):
+                end.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, Config.SUPERVISOR_MESSAGE_BYTES)
+            pid = os.fork()
+            if pid == 0:
+                parent_end.close()
+                self.listener.close()
+                for worker in self.workers:
+                    worker.control.close()
+                os._exit(run_shard_worker(index, child_end, self.allow_debug))
+            child_end.close()
+            self.workers.append(WorkerHandle(index, pid, parent_end, reported_at=time.time()))
+        log_event("SERVER", "Started %d workers", self.worker_count,
+                  pids=[worker.pid for worker in self.workers])
+    
+    async def serve(self) -> None:
+        """Route clients to the workers until stopped, then shut every worker down."""
+        self.stopping = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, self.stop)
+        for worker in self.workers:
+            loop.add_reader(worker.control.fileno(), self.on_control, worker)
+        
+        server = await asyncio.start_server(self.handle_connection, sock=self.listener)
+        host, port = self.listener.getsockname()[:2]
+        print(f"Serving {Config.GAME_TITLE} on {host}:{port} with {self.worker_count} workers")
+        log_event("SERVER", "Listening on %s:%d", host, port)
+        chores = [asyncio.create_task(self.every(Config.SUPERVISOR_BALANCE_INTERVAL, self.rebalance)),
+                  asyncio.create_task(self.every(Config.SUPERVISOR_REPORT_INTERVAL, self.print_report))]
+        
+        async with server:
+            await self.stopping.wait()
+        for chore in chores:
+            chore.cancel()
+        await self.shutdown()
+    
+    async def every(self, interval: float, chore) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            chore()
+    
+    async def shutdown(self) -> None:
+        """Tell every worker to save its sessions and exit, then wait for them."""
+        for task in list(self.tasks):
+            task.cancel()  # Clients still logging in
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        
+        self.print_report()
+        loop = asyncio.get_running_loop()
+        for worker in self.workers:
+            if worker.alive:
+                loop.remove_reader(worker.control.fileno())
+                send_control(worker.control, {"op": "shutdown"})
+        for worker in self.workers:
+            await loop.run_in_executor(None, os.waitpid, worker.pid, 0)
+            worker.alive = False
+        log_event("SERVER", "Shut down %d workers", len(self.workers))
+        flush_logs()
+    
+    def is_playing(self, key: str) -> bool:
+        return key in self.placement
+    
+    def choose_worker(self, key: str) -> Optional[WorkerHandle]:
+        """Pick a session's worker: where it was moved to, else by a stable hash of its name."""
+        alive = [worker for worker in self.workers if worker.alive]
+        if not alive:
+            return None
+        index = self.routes.get(key)
+        if index is not None and self.workers[index].alive:
+            return self.workers[index]
+        digest = int.from_bytes(hashlib.sha256(key.encode("utf-8")).digest()[:8], "big")
+        return alive[digest % len(alive)]
+    
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Greet a client, ask their name and hand the connection to a worker."""
+        task = asyncio.current_task()
+        self.tasks.add(task)
+        try:
+            await self.send(writer, run_captured(display_title))
+            name = await self.login(reader, writer)
+            if name is None:
+                return
+            key = name.lower()
+            worker = self.choose_worker(key)
+            if worker is None:
+                await self.send(writer, "The server is not accepting players right now.\n")
+                return
+            
+            # Reserve the name before the next await, so a second login can't pass is_playing
+            self.placement[key] = worker.index
+            attached = False
+            try:
+                # Take anything typed after the name along with the socket
+                writer.transport.pause_reading()
+                reader.feed_eof()
+                leftover = await reader.read()
+                attached = self.attach(worker, name, writer.get_extra_info("socket").fileno(), leftover)
+            finally:
+                if not attached:
+                    self.placement.pop(key, None)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self.tasks.discard(task)
+            writer.close()  # The worker holds its own copy of the socket
+    
+    def attach(self, worker: WorkerHandle, name: str, fd: int, leftover: bytes, resumed: bool = False,
+               state: Optional[Dict[str, Any]] = None) -> bool:
+        """Send a client socket to a worker and record where the session lives.
+        
+        Returns:
+            bool: True if the worker took the session
+        """
+        key = name.lower()
+        message = {"op": "attach", "name": name, "leftover": leftover.hex(), "resumed": resumed, "state": state}
+        if send_control(worker.control, message, (fd,)):
+            self.placement[key] = worker.index
+            worker.sessions += 1
+            return True
+        self.worker_lost(worker)
+        return False
+    
+    def on_control(self, worker: WorkerHandle) -> None:
+        """Handle one message from a worker."""
+        message, fds = receive_control(worker.control)
+        if message is None:
+            self.worker_lost(worker)
+        elif message["op"] == "stats":
+            now = time.time()
+            elapsed = now - worker.reported_at
+            if elapsed > 0:
+                worker.cpu_percent = 100.0 * (message["cpu"] - worker.cpu_seconds) / elapsed
+            worker.cpu_seconds = message["cpu"]
+            worker.sessions = message["sessions"]
+            worker.reported_at = now
+        elif message["op"] == "closed":
+            self.placement.pop(message["name"], None)
+            worker.sessions = max(0, worker.sessions - 1)
+        elif message["op"] == "detached":
+            self.move(worker, message["name"], fds[0], bytes.fromhex(message["leftover"]), message["state"])
+    
+    def move(self, source: WorkerHandle, name: str, fd: int, leftover: bytes, state: Dict[str, Any]) -> None:
+        """Reattach a session handed back by source to the least busy other worker."""
+        key = name.lower()
+        self.placement.pop(key, None)
+        source.sessions = max(0, source.sessions - 1)
+        candidates = [worker for worker in self.workers if worker.alive and worker is not source] or [source]
+        target = min(candidates, key=lambda worker: worker.sessions)
+        self.routes[key] = target.index
+        self.attach(target, name, fd, leftover, resumed=True, state=state)
+        os.close(fd)
+        log_event("SERVER", "Moved %s from worker %d to worker %d", name, source.index, target.index,
+                  player=key, source=source.index, target=target.index)
+    
+    def rebalance(self) -> None:
+        """Ask the busiest worker to shed sessions when the load is uneven."""
+        alive = [worker for worker in self.workers if worker.alive]
+        if len(alive) < 2:
+            return
+        busiest = max(alive, key=lambda worker: worker.sessions)
+        idlest = min(alive, key=lambda worker: worker.sessions)
+        gap = busiest.sessions - idlest.sessions
+        if gap > Config.SUPERVISOR_MAX_IMBALANCE:
+            send_control(busiest.control, {"op": "shed", "count": gap // 2})
+    
+    def worker_lost(self, worker: WorkerHandle) -> None:
+        """Forget a worker whose control socket closed (its clients were disconnected)."""
+        if not worker.alive:
+            return
+        worker.alive = False
+        asyncio.get_running_loop().remove_reader(worker.control.fileno())
+        for key in [key for key, index in self.placement.items() if index == worker.index]:
+            del self.placement[key]
+        log_event("SERVER", "Worker %d (pid %d) exited", worker.index, worker.pid, level="WARNING")
+    
+    def print_report(self) -> None:
+        """Print session counts and CPU use per worker."""
+        print(f"{'Worker':>6}{'PID':>8}{'Sessions':>10}{'CPU':>8}")
+        for worker in self.workers:
+            state = f"{worker.cpu_percent:7.1f}%" if worker.alive else "  exited"
+            print(f"{worker.index:>6}{worker.pid:>8}{worker.sessions:>10}{state}")
+            log_event("SERVER", "Worker %d: %d sessions, %.1f%% CPU", worker.index, worker.sessions,
+                      worker.cpu_percent, worker=worker.index, sessions=worker.sessions, cpu=worker.cpu_percent)
+
+def run_shard_worker(index: int, control: socket.socket, allow_debug: bool = False) -> int:
+    """Body of a forked worker process.
+    
+    Returns:
+        int: process exit code
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl+C reaches the supervisor, which stops us
+    root, ext = os.path.splitext(log_writer.path)
+    log_writer.reset_after_fork(f"{root}.worker{index}{ext}")
+    try:
+        asyncio.run(ShardWorker(index, control, allow_debug).serve())
+        return 0
+    except Exception as e:
+        log_event("FATAL", "Worker %d crashed: %s", index, str(e), level="ERROR")
+        return 1
+    finally:
+        log_writer.stop()
+
+def run_supervisor(host: str, port: int, workers: int, allow_debug: bool = False) -> int:
+    """Load the world once, fork the workers and route clients to them until stopped.
+    
+    Returns:
+        int: process exit code
+    """
+    setup_directories()
+    load_game_data()
+    
+    supervisor = Supervisor(host, port, workers, allow_debug)
+    try:
+        supervisor.start_workers()
+    except OSError as e:
+        print(f"Could not start the server: {e}")
+        return 1
+    asyncio.run(supervisor.serve())
+    return 0
+
+# === [LOAD TEST] ===
+LOADTEST_BOT_KINDS = ("explorer", "fighter", "trader")
+
+class LoadBot:
+    """Scripted player for load tests that picks each command from the last output it saw.
+    
+    Explorers walk through the exits and pick up what they see, fighters spawn
+    enemies with 'debug spawn' and attack them, traders buy and sell at the
+    merchant. Every kind attacks whatever it is fighting. Bots only read text,
+    so they drive in-process sessions and server connections the same way.
+    """
+    
+    def __init__(self, kind: str, name: str, rng: random.Random):
+        self.kind = kind
+        self.name = name
+        self.rng = rng
+        self.steps = 0
+        self.carried: List[str] = []  # Item names from the last inventory listing
+    
+    def next_command(self, output: str) -> str:
+        self.steps += 1
+        if "Actions: [a]ttack" in output:
+            return "attack"
+        return getattr(self, f"next_{self.kind}")(output)
+    
+    def next_explorer(self, output: str) -> str:
+        seen = re.search(r"^You see: (.+)$", output, re.M)
+        if seen and self.rng.random() < 0.5:
+            return "take " + self.rng.choice(seen.group(1).split(", ")).lower()
+        exits = re.findall(r"\[([NSEW])\]", output)
+        if exits:
+            return self.rng.choice(exits).lower()
+        return self.rng.choice(["look", "n", "s", "e", "w"])
+    
+    def next_fighter(self, output: str) -> str:
+        if self.steps % 10 == 0:
+            return "stats"
+        return "debug spawn " + self.rng.choice([enemy_id for enemy_id in Config.LOADTEST_FIGHT_ENEMIES
+                                                 if enemy_id in enemies_data] or list(enemies_data))
+    
+    def next_trader(self, output: str) -> str:
+        names = [items_data[item_id]["name"].lower() for item_id in Config.MERCHANT_ITEMS if item_id in items_data]
+        if output.startswith("Inventory"):
+            self.carried = [name.lower() for name in re.findall(r"^  - (.+?)(?: x\d+)?$", output, re.M)]
+        bought = re.search(r"You purchase the (.+) for", output)
+        if bought:
+            return "sell " + bought.group(1).lower()
+        if "but you only have" in output and self.carried:
+            return "sell " + self.rng.choice(self.carried)
+        if self.steps % 5 == 0:
+            return "inventory"
+        return "buy " + (names[0] if self.rng.random() < 0.7 else self.rng.choice(names))
+
+class LocalBotDriver:
+    """Runs a bot's commands on an in-process GameSession, rendering what the server would send.
+    
+    Traders get Config.LOADTEST_TRADER_GOLD so they can keep buying; over a
+    server they trade with whatever gold their character has.
+    """
+    
+    def __init__(self, bot: LoadBot, seed: int):
+        self.session = GameSession(seed=seed)
+        self.session.player = Player(name=bot.name)
+        self.session.first_play = False
+        self.session.allow_debug = True  # Fighters use 'debug spawn'
+        if bot.kind == "trader":
+            self.session.player.gold = Config.LOADTEST_TRADER_GOLD
+    
+    async def start(self) -> str:
+        return run_captured(display_room, self.session) + run_captured(display_prompt, self.session)
+    
+    async def send(self, command: str) -> str:
+        output = run_captured(process_command, self.session, command)
+        if self.session.mode == 'combat' and not self.session.pending:
+            output += run_captured(display_combat_status, self.session)
+        return output + run_captured(display_prompt, self.session)
+    
+    async def close(self) -> None:
+        pass
+
+class RemoteBotDriver:
+    """Plays a bot through a running --serve server; a command ends at the next prompt."""
+    
+    def __init__(self, bot: LoadBot, host: str, port: int):
+        self.bot = bot
+        self.host = host
+        self.port = port
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+    
+    async def read_until(self, marker: str) -> str:
+        data = b""
+        while not data.endswith(marker.encode("utf-8")):
+            chunk = await self.reader.read(65536)
+            if not chunk:
+                raise ConnectionError("server closed the connection")
+            data += chunk
+        return data.decode("utf-8", errors="replace").replace("\r\n", "\n")
+    
+    async def start(self) -> str:
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        await self.read_until("adventurer? ")
+        self.writer.write(f"{self.bot.name}\r\n".encode("utf-8"))
+        output = await self.read_until("> ")
+        if "already playing" in output:
+            raise ConnectionError(f"{self.bot.name} is already playing")
+        return output
+    
+    async def send(self, command: str) -> str:
+        self.writer.write(f"{command}\r\n".encode("utf-8"))
+        return await self.read_until("> ")
+    
+    async def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+
+def parse_bot_population(spec: str) -> Dict[str, int]:
+    """Parse KIND=COUNT,KIND=COUNT (e.g. explorer=20,fighter=10).
+    
+    Raises:
+        ValueError: for unknown kinds or malformed counts
+    """
+    population = {}
+    for part in spec.split(","):
+        kind, sep, count = part.partition("=")
+        kind = kind.strip().lower()
+        if kind not in LOADTEST_BOT_KINDS:
+            raise ValueError(f"unknown bot kind '{kind}' (choose from {', '.join(LOADTEST_BOT_KINDS)})")
+        if not sep or not count.strip().isdigit():
+            raise ValueError(f"expected KIND=COUNT, got '{part}'")
+        population[kind] = population.get(kind, 0) + int(count)
+    return population
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(fraction * len(sorted_values) + 0.999999))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+async def run_load_bot(bot: LoadBot, driver, deadline: float, interval: float,
+                       latencies: Dict[str, List[float]], errors: Counter) -> None:
+    """Send a bot's commands at its target rate until the deadline."""
+    try:
+        output = await driver.start()
+        next_at = time.perf_counter() + bot.rng.random() * interval  # Stagger the bots
+        while next_at < deadline:
+            await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+            command = bot.next_command(output)
+            started = time.perf_counter()
+            output = await driver.send(command)
+            latencies.setdefault(parse_command(command)["action"], []).append(time.perf_counter() - started)
+            if "Debug commands are disabled." in output:
+                errors["the server refuses debug commands (start it with --allow-debug)"] += 1
+                break
+            next_at = max(next_at + interval, time.perf_counter())
+    except (ConnectionError, OSError) as e:
+        errors[str(e)] += 1
+    finally:
+        await driver.close()
+
+def print_latency_report(latencies: Dict[str, List[float]], elapsed: float) -> Dict[str, float]:
+    """Print throughput and latency percentiles per command type.
+    
+    Returns:
+        dict: command type -> p99 latency in milliseconds
+    """
+    print(f"{'Command':<12}{'Count':>8}{'Per sec':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'Max ms':>9}")
+    p99s = {}
+    everything = []
+    for action in sorted(latencies, key=lambda action: -len(latencies[action])):
+        values = sorted(latencies[action])
+        everything.extend(values)
+        p99s[action] = percentile(values, 0.99) * 1000
+        print(f"{action:<12}{len(values):>8}{len(values) / elapsed:>9.1f}{percentile(values, 0.50) * 1000:>9.2f}"
+              f"{percentile(values, 0.95) * 1000:>9.2f}{p99s[action]:>9.2f}{values[-1] * 1000:>9.2f}")
+    everything.sort()
+    if everything:
+        print(f"{'all':<12}{len(everything):>8}{len(everything) / elapsed:>9.1f}{percentile(everything, 0.50) * 1000:>9.2f}"
+              f"{percentile(everything, 0.95) * 1000:>9.2f}{percentile(everything, 0.99) * 1000:>9.2f}"
+              f"{everything[-1] * 1000:>9.2f}")
+    return p99s
+
+def run_load_test(spec: str, duration: float, rate: float, connect: Optional[str] = None,
+                  budget_ms: Optional[float] = None, seed: Optional[int] = None) -> int:
+    """Run a population of bots in-process (or against a server) and report command latency.
+    
+    Against a server, bots log in as <Kind><n>-<run id> with a fresh random run
+    id, so they never load or overwrite a real player's save. Their own save
+    files stay behind in the server's saves directory. Fighter bots need the
+    server to be started with --allow-debug.
+    
+    Returns:
+        int: process exit code (1 if a command type's p99 exceeds budget_ms)
+    """
+    try:
+        population = parse_bot_population(spec)
+    except ValueError as e:
+        print(f"Invalid load test: {e}")
+        return 1
+    if duration <= 0 or rate <= 0:
+        print("Invalid load test: --duration and --rate must be positive")
+        return 1
+    
+    host, port = None, None
+    if connect:
+        host, _, port_text = connect.rpartition(":")
+        if not port_text.isdigit():
+            print(f"Invalid load test: expected HOST:PORT, got '{connect}'")
+            return 1
+        host, port = host or Config.SERVER_HOST, int(port_text)
+    
+    streams = RNGStreams(seed)
+    run_id = os.urandom(3).hex()  # Keeps remote bots out of real players' save files
+    bots = []
+    for kind, count in population.items():
+        for index in range(count):
+            name = f"{kind.title()}{index}"
+            bot_rng = random.Random(streams.derive_seed(f"bot/{name}"))
+            bots.append(LoadBot(kind, f"{name}-{run_id}" if connect else name, bot_rng))
+    
+    latencies: Dict[str, List[float]] = {}
+    errors: Counter = Counter()
+    
+    async def run_all() -> float:
+        start = time.perf_counter()
+        deadline = start + duration
+        drivers = [RemoteBotDriver(bot, host, port) if connect else LocalBotDriver(bot, streams.derive_seed(bot.name))
+                   for bot in bots]
+        await asyncio.gather(*(run_load_bot(bot, driver, deadline, 1.0 / rate, latencies, errors)
+                               for bot, driver in zip(bots, drivers)))
+        return time.perf_counter() - start
+    
+    target = f"server {host}:{port}" if connect else "in-process sessions"
+    print(f"Running {len(bots)} bots ({', '.join(f'{count} {kind}' for kind, count in population.items())}) "
+          f"at {rate:g} commands/s each for {duration:g}s against {target}...")
+    elapsed = asyncio.run(run_all())
+    p99s = print_latency_report(latencies, elapsed)
+    for message, count in errors.items():
+        print(f"{count} bots stopped early: {message}")
+    if connect:
+        print(f"Bot save files on the server end in '-{run_id}.json'.")
+    
+    if budget_ms is not None:
+        over = {action: p99 for action, p99 in p99s.items() if p99 > budget_ms}
+        if over:
+            print("Latency budget exceeded (p99 > %g ms): %s" % (
+                budget_ms, ", ".join(f"{action} {p99:.2f} ms" for action, p99 in over.items())))
+            return 1
+        print(f"All command types within the {budget_ms:g} ms p99 budget.")
+    return 1 if errors else 0
 
 # === [MAIN GAME LOOP] ===
-def initialize_game() -> None:
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(description=f"{Config.GAME_TITLE} {Config.VERSION}")
+    parser.add_argument("--rebuild-cache", action="store_true",
+                        help="recompile the world snapshot from data/*.json and exit")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="print how the world data was loaded and how long it took")
+    parser.add_argument("--watch", action="store_true",
+                        help="reload data/*.json automatically when the files change")
+    parser.add_argument("--seed", type=int,
+                        help="seed the random streams so a run can be replayed exactly")
+    
+    server = parser.add_argument_group("network server")
+    server.add_argument("--serve", action="store_true",
+                        help="host games for telnet clients instead of playing locally")
+    server.add_argument("--host", default=Config.SERVER_HOST,
+                        help=f"interface to listen on (default: {Config.SERVER_HOST})")
+    server.add_argument("--port", type=int, default=Config.SERVER_PORT,
+                        help=f"port to listen on (default: {Config.SERVER_PORT})")
+    server.add_argument("--server-workers", type=int, default=0, metavar="N",
+                        help="spread sessions over N forked worker processes (default: one process)")
+    server.add_argument("--allow-debug", action="store_true",
+                        help="let network players use 'debug' commands (spawn, reload, perf, ...)")
+    
+    sim = parser.add_argument_group("balance simulator")
+    sim.add_argument("--simulate", nargs="*", metavar="ENEMY",
+                     help="simulate fights against the given enemies (default: all) and exit")
+    sim.add_argument("--fights", type=int, default=Config.SIM_FIGHTS,
+                     help=f"fights per enemy (default: {Config.SIM_FIGHTS})")
+    sim.add_argument("--level", type=int, default=1, help="simulated player level (default: 1)")
+    sim.add_argument("--weapon", help="item id of the simulated player's weapon")
+    sim.add_argument("--armor", help="item id of the simulated player's armor")
+    
+    parser.add_argument("--bench-memory", action="store_true",
+                        help="report memory per live player and enemy at 10k and 100k instances and exit")
+    parser.add_argument("--bench-combat", type=int, metavar="N",
+                        help="resolve N scheduled encounters (1-3 enemies each) headlessly, report throughput and exit")
+    
+    load = parser.add_argument_group("load test")
+    load.add_argument("--load-test", metavar="KIND=N,...",
+                      help="run bots (explorer, fighter, trader), e.g. explorer=20,fighter=10, and report "
+                           "latency per command type")
+    load.add_argument("--duration", type=float, default=Config.LOADTEST_DURATION,
+                      help=f"seconds to run (default: {Config.LOADTEST_DURATION:g})")
+    load.add_argument("--rate", type=float, default=Config.LOADTEST_RATE,
+                      help=f"commands per second per bot (default: {Config.LOADTEST_RATE:g})")
+    load.add_argument("--connect", metavar="HOST:PORT",
+                      help="drive a running --serve server instead of in-process sessions (bots leave "
+                           "save files named <Kind><n>-<run id>; fighters need --allow-debug on the server)")
+    load.add_argument("--budget-ms", type=float,
+                      help="exit with status 1 if any command type's p99 latency exceeds this")
+    
+    sweep = parser.add_argument_group("parameter sweep")
+    sweep.add_argument("--sweep", nargs="+", metavar="NAME=VALUES",
+                       help="sweep Config values (NAME=a,b,c or NAME=lo:hi with --samples) and exit; "
+                            "XP_THRESHOLDS_SCALE scales every XP threshold")
+    sweep.add_argument("--samples", type=int, default=0,
+                       help="draw this many random configurations instead of the full grid")
+    sweep.add_argument("--runs", type=int, default=Config.SWEEP_RUNS,
+                       help=f"playthroughs per configuration (default: {Config.SWEEP_RUNS})")
+    sweep.add_argument("--steps", type=int, default=Config.SWEEP_STEPS,
+                       help=f"steps per playthrough (default: {Config.SWEEP_STEPS})")
+    sweep.add_argument("--workers", type=int, default=0, help="worker processes (default: all cores)")
+    sweep.add_argument("--out", default=Config.SWEEP_OUTPUT,
+                       help=f"results CSV (default: {Config.SWEEP_OUTPUT})")
+    return parser.parse_args(argv)
+
+def initialize_game(session: 'GameSession', startup_report: bool = False, watch: bool = False, seed: Optional[int] = None) -> None:
     """Initialize the game state and data.
     
     Side effects:
         - Creates directories
         - Loads game data
+        - Starts the data watcher when hot reload is enabled
         - Initializes player
+        - Seeds the random streams
         - Sets up logging
     """
+    global data_watcher
+    
     setup_directories()
     load_game_data()
+    if startup_report:
+        print_startup_report()
+    
+    if watch or Config.HOT_RELOAD:
+        data_watcher = DataWatcher(Config.HOT_RELOAD_INTERVAL)
+        data_watcher.start()
     
     # Try to load existing save
-    if not load_game():
+    if not load_game(session):
         # Create new player
-        game_state['player'] = Player()
+        session.player = Player()
         log_event("SYSTEM", "New game started")
     
+    # An explicit seed overrides the streams restored from a save
+    if seed is not None:
+        session.rng = RNGStreams(seed)
+    log_event("SYSTEM", "Random seed: %d", session.rng.seed, seed=session.rng.seed)
+    
     # Display title
     display_title()
     
-    if game_state.get('first_play', True):
+    if session.first_play:
         print("Welcome to the Text RPG Adventure!")
         print("You find yourself in a small village tavern...")
         print("\nType 'help' at any time for available commands.")
 
-def main():
+def main(argv: Optional[List[str]] = None) -> int:
     """Core game loop."""
+    args = parse_args(argv)
+    
+    if args.rebuild_cache:
+        setup_directories()
+        load_game_data(rebuild_cache=True)
+        print_startup_report()
+        return 0 if data_load_report.get("snapshot_written") else 1
+    
+    if args.simulate is not None:
+        setup_directories()
+        load_game_data()
+        return run_simulation(args.simulate, args.fights, args.level, args.weapon, args.armor, args.seed)
+    
+    if args.bench_memory:
+        setup_directories()
+        load_game_data()
+        return run_memory_benchmark()
+    
+    if args.bench_combat:
+        setup_directories()
+        load_game_data()
+        return run_combat_benchmark(args.bench_combat, args.seed)
+    
+    if args.load_test:
+        setup_directories()
+        load_game_data()
+        return run_load_test(args.load_test, args.duration, args.rate, args.connect, args.budget_ms, args.seed)
+    
+    if args.serve:
+        if args.server_workers > 1:
+            return run_supervisor(args.host, args.port, args.server_workers, args.allow_debug)
+        return run_server(args.host, args.port, watch=args.watch, allow_debug=args.allow_debug)
+    
+    if args.sweep:
+        setup_directories()
+        load_game_data()
+        return run_sweep(args.sweep, args.samples, args.runs, args.steps, args.workers, args.out, args.seed)
+    
+    session = GameSession()
+    session.allow_debug = True
     try:
-        initialize_game()
+        initialize_game(session, startup_report=args.startup_report, watch=args.watch, seed=args.seed)
         
         # Show initial room
-        display_room()
+        display_room(session)
         
         # Main game loop
-        while game_state['running']:
+        while session.running:
             try:
                 # Show appropriate display based on game mode
-                if game_state['mode'] == 'combat':
-                    display_combat_status()
+                if session.mode == 'combat' and not session.pending:
+                    display_combat_status(session)
                 
-                display_prompt()
+                display_prompt(session)
                 user_input = input().strip()
                 
-                if user_input:
-                    process_command(user_input)
+                if user_input or session.pending:  # Enter alone answers "no" to a question
+                    apply_pending_reloads([session])
+                    process_command(session, user_input)
                     
             except KeyboardInterrupt:
                 print("\n\nGame interrupted. Type 'quit' to exit properly.")
@@ -2465,7 +6395,7 @@ def main():
                 
     except Exception as e:
         print(f"Fatal error: {e}")
-        log_event("FATAL", f"Game crashed: {e}")
+        log_event("FATAL", "Game crashed: %s", str(e), level="ERROR")
         return 1
     
     return 0
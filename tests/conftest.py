@@ -0,0 +1,37 @@
+"""Shared fixtures for the game's tests."""
+import json
+import os
+import shutil
+
+import pytest
+
+import main
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def game(tmp_path, monkeypatch):
+    """The main module with the world loaded from a scratch copy of data/.
+    
+    Saves, logs, caches and data edits all land under tmp_path.
+    """
+    shutil.copytree(os.path.join(ROOT, main.Config.DATA_DIR), tmp_path / main.Config.DATA_DIR)
+    monkeypatch.chdir(tmp_path)
+    main.setup_directories()
+    main.load_game_data()
+    yield main
+    main.flush_logs()  # Before the working directory is restored
+
+
+@pytest.fixture
+def edit_data(game):
+    """Rewrite a scratch data file: edit_data(name, edit), where edit(table) changes it in place."""
+    def edit_data_file(name: str, edit) -> None:
+        path = game.DATA_FILES[name][0]
+        with open(path, encoding="utf-8") as f:
+            table = json.load(f)
+        edit(table)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(table, f, indent=2)
+    return edit_data_file
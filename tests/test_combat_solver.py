@@ -0,0 +1,39 @@
+"""Exact combat odds against the seeded Monte Carlo simulator."""
+import pytest
+
+FIGHTS = 20000
+TOLERANCE = 0.015  # About five standard errors at 20000 fights
+
+
+def simulated_rates(game, profile, seed):
+    outcome, _, _ = game.simulate_fights_python(profile, FIGHTS, game.RNGStreams(seed).get("combat"))
+    return {result: outcome.count(result) / FIGHTS
+            for result in (game.SIM_WIN, game.SIM_DEATH, game.SIM_ENEMY_FLED)}
+
+
+@pytest.mark.parametrize("enemy_id", ["goblin", "wolf", "bandit"])
+def test_solver_matches_the_simulator(game, enemy_id):
+    profile = game.FightProfile.build(game.build_sim_player(1), game.Enemy.from_template(enemy_id))
+    
+    odds = game.solve_combat(profile)
+    rates = simulated_rates(game, profile, seed=1)
+    
+    assert odds.win == pytest.approx(rates[game.SIM_WIN], abs=TOLERANCE)
+    assert odds.death == pytest.approx(rates[game.SIM_DEATH], abs=TOLERANCE)
+    assert odds.enemy_fled == pytest.approx(rates[game.SIM_ENEMY_FLED], abs=TOLERANCE)
+
+
+def test_outcomes_sum_to_one(game):
+    player = game.build_sim_player(3, weapon="iron_sword")
+    profile = game.FightProfile.build(player, game.Enemy.from_template("orc_warrior"))
+    
+    odds = game.solve_combat(profile)
+    
+    total = odds.win + odds.death + odds.enemy_fled + odds.player_fled + odds.stalemate
+    assert total == pytest.approx(1.0)
+
+
+def test_solved_odds_are_cached(game):
+    profile = game.FightProfile.build(game.build_sim_player(1), game.Enemy.from_template("wolf"))
+    
+    assert game.solve_combat(profile) is game.solve_combat(profile)
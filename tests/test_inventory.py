@@ -0,0 +1,42 @@
+"""Counted inventory and its list-of-ids save format."""
+import json
+
+
+def test_inventory_counts_like_the_old_list(game):
+    inventory = game.Inventory(["torch", "health_potion", "torch"])
+    
+    assert len(inventory) == 3
+    assert inventory.count("torch") == 2
+    assert inventory.distinct() == ["torch", "health_potion"]
+    assert inventory == ["health_potion", "torch", "torch"]
+    assert not inventory.remove("torch", 3)
+    assert inventory.remove("torch")
+    assert inventory.count("torch") == 1
+
+
+def test_save_file_round_trip(game, tmp_path):
+    session = game.GameSession(save_file=str(tmp_path / "ann.json"))
+    session.player = game.Player(name="Ann", inventory=["health_potion", "iron_sword", "health_potion"])
+    session.player.add_item("wolf_pelt")
+    
+    game.save_game(session)
+    with open(session.save_file, encoding="utf-8") as f:
+        saved = json.load(f)["player"]["inventory"]
+    restored = game.GameSession(save_file=session.save_file)
+    assert game.load_game(restored)
+    
+    assert sorted(saved) == ["health_potion", "health_potion", "iron_sword", "wolf_pelt"]
+    assert isinstance(restored.player.inventory, game.Inventory)
+    assert restored.player.inventory == session.player.inventory
+    assert restored.player.inventory.count("health_potion") == 2
+
+
+def test_views_follow_the_distinct_items(game):
+    inventory = game.Inventory(["iron_sword", "health_potion", "torch"])
+    
+    assert inventory.equipment() == ["iron_sword"]
+    assert inventory.consumables() == ["health_potion"]
+    inventory.add("leather_armor")
+    inventory.remove("health_potion")
+    assert inventory.equipment() == ["iron_sword", "leather_armor"]
+    assert inventory.consumables() == []
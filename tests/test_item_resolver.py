@@ -0,0 +1,40 @@
+"""Item name resolution: ranking tiers and ambiguity."""
+
+CARRIED = ["iron_sword", "steel_sword", "rusty_dagger", "health_potion", "greater_health_potion", "torch"]
+
+
+def test_exact_name_beats_longer_matches(game):
+    assert game.resolve_item_name("health potion", CARRIED) == ["health_potion"]
+    assert game.resolve_item_name("Health_Potion", CARRIED) == ["health_potion"]
+
+
+def test_shared_word_is_ambiguous(game, capsys):
+    assert game.resolve_item_name("sword", CARRIED) == ["iron_sword", "steel_sword"]
+    
+    assert game.find_item_or_report("sword", CARRIED, "Not found.") is None
+    assert "Which 'sword' do you mean: Iron Sword, Steel Sword?" in capsys.readouterr().out
+
+
+def test_prefix_of_the_full_name_beats_a_word_match(game):
+    assert game.resolve_item_name("gre", CARRIED) == ["greater_health_potion"]
+    assert game.resolve_item_name("heal", CARRIED) == ["health_potion"]
+
+
+def test_articles_and_typos(game):
+    assert game.resolve_item_name("the torch", CARRIED) == ["torch"]
+    assert game.resolve_item_name("iron swrod", CARRIED) == ["iron_sword"]
+    assert game.resolve_item_name("dager", CARRIED) == ["rusty_dagger"]
+
+
+def test_only_the_given_items_match(game, capsys):
+    assert game.resolve_item_name("chain mail", CARRIED) == []
+    assert game.resolve_item_name("", CARRIED) == []
+    
+    assert game.find_item_or_report("lantern", CARRIED, "You don't have that.") is None
+    assert "You don't have that." in capsys.readouterr().out
+
+
+def test_inventory_is_searched_by_distinct_item(game):
+    inventory = game.Inventory(["torch", "torch", "iron_sword"])
+    
+    assert game.resolve_item_name("torch", inventory) == ["torch"]
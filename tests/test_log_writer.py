@@ -0,0 +1,39 @@
+"""LogWriter batching, formatting and rotation."""
+import gzip
+import json
+
+import main
+
+
+def test_stop_writes_queued_records(tmp_path):
+    path = tmp_path / "events.jsonl"
+    writer = main.LogWriter(str(path), flush_interval=60, batch_size=1000)
+    writer.write("INFO", "TEST", "hello %s", ("world",), {"player": "ann", "message": "ignored"})
+    writer.write("WARNING", "TEST", "bad %d", ("x",))
+    assert not path.exists()  # Nothing is written until a flush
+    
+    writer.stop()
+    
+    records = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert [record["message"] for record in records] == ["hello world", "bad %d ('x',)"]
+    assert [record["level"] for record in records] == ["INFO", "WARNING"]
+    assert records[0]["player"] == "ann"
+
+
+def test_full_log_rotates_into_numbered_archives(tmp_path):
+    path = tmp_path / "debug.log"
+    writer = main.LogWriter(str(path), flush_interval=60, batch_size=1000, log_format="text",
+                            max_bytes=100, backup_count=2)
+    for batch in range(4):
+        for line in range(4):
+            writer.write("INFO", "TEST", "batch %d line %d", (batch, line))
+        writer.flush()
+    writer.stop()
+    
+    def batches(text):
+        return {int(line.split("batch ")[1].split()[0]) for line in text.splitlines()}
+    
+    assert batches(path.read_text(encoding="utf-8")) == {3}
+    assert batches(gzip.open(f"{path}.1.gz", "rt", encoding="utf-8").read()) == {2}
+    assert batches(gzip.open(f"{path}.2.gz", "rt", encoding="utf-8").read()) == {1}
+    assert not (tmp_path / "debug.log.3.gz").exists()  # Batch 0 fell off the end
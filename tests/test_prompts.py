@@ -0,0 +1,43 @@
+"""Yes/no questions answered by the player's next line."""
+import pytest
+
+
+def ask(game):
+    session = game.GameSession()
+    answers = []
+    game.ask_confirmation(session, "Really? (y/n)", lambda session: answers.append("yes"),
+                          lambda session: answers.append("no"))
+    return session, answers
+
+
+@pytest.mark.parametrize("line, expected", [("y", "yes"), (" YES ", "yes"), ("", "no"), ("n", "no"), ("maybe", "no")])
+def test_answer_prompt(game, line, expected):
+    session, answers = ask(game)
+    
+    game.answer_prompt(session, line)
+    
+    assert answers == [expected]
+    assert session.pending is None
+
+
+def test_empty_line_declines_quitting(game, capsys):
+    session = game.GameSession()
+    session.player = game.Player(name="Ann")
+    
+    game.process_command(session, "quit")
+    assert session.pending is not None
+    game.process_command(session, "")
+    
+    assert session.running
+    assert session.pending is None
+    assert "Continuing game..." in capsys.readouterr().out
+
+
+def test_yes_quits(game):
+    session = game.GameSession()
+    session.player = game.Player(name="Ann")
+    
+    game.process_command(session, "quit")
+    game.process_command(session, "y")
+    
+    assert not session.running
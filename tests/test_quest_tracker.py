@@ -0,0 +1,60 @@
+"""Incremental quest objective tracking."""
+
+
+def test_kills_only_advance_subscribed_objectives(game):
+    player = game.Player(name="Ann")
+    assert player.accept_quest("pest_control")  # Defeat 3 goblins
+    
+    assert player.quests.on_kill("wolf") == []
+    assert player.quests.on_kill("goblin") == [("pest_control", 0, 1, 3)]
+    player.quests.on_kill("goblin")
+    assert not player.quests.is_completed("pest_control")
+    player.quests.on_kill("goblin")
+    
+    assert player.quests.is_completed("pest_control")
+    assert player.get_quest_progress("pest_control", "kill_goblin") == 3
+
+
+def test_one_kill_advances_every_quest_on_that_enemy(game):
+    player = game.Player(name="Ann")
+    player.accept_quest("pest_control")
+    player.accept_quest("apprentice_trial")
+    
+    updates = player.quests.on_kill("goblin")
+    
+    assert sorted(quest_id for quest_id, *_ in updates) == ["apprentice_trial", "pest_control"]
+
+
+def test_mixed_objectives_follow_visits_and_inventory(game):
+    player = game.Player(name="Ann")
+    player.accept_quest("apprentice_trial")  # 1 goblin, visit forest_path, carry a health potion
+    player.quests.on_kill("goblin")
+    player.enter_room("forest_path")
+    assert not player.quests.is_completed("apprentice_trial")
+    
+    player.add_item("health_potion")
+    assert player.quests.is_completed("apprentice_trial")
+    player.remove_item("health_potion")
+    assert not player.quests.is_completed("apprentice_trial")
+
+
+def test_loaded_player_resumes_progress(game):
+    player = game.Player(name="Ann")
+    player.accept_quest("apprentice_trial")
+    player.quests.on_kill("goblin")
+    player.enter_room("forest_path")
+    player.add_item("health_potion")
+    
+    restored = game.Player(**player.to_dict())
+    
+    assert restored.quests.active["apprentice_trial"].counts == [1, 1, 1]
+    assert restored.quests.is_completed("apprentice_trial")
+
+
+def test_completed_quest_stops_listening(game):
+    player = game.Player(name="Ann")
+    player.accept_quest("apprentice_trial")
+    player.complete_quest("apprentice_trial")
+    
+    assert player.quests.subscriptions == {}
+    assert player.quests.on_kill("goblin") == []
@@ -0,0 +1,54 @@
+"""Hot reload of the data files into a running game."""
+
+
+def test_malformed_enemy_leaves_the_tables_intact(game, edit_data, capsys):
+    enemies, templates = game.enemies_data, game.enemy_templates
+    edit_data("enemies", lambda table: table.update(slime={"name": "Slime", "max_health": 5}))
+    
+    diffs = game.reload_data_files(["enemies"])
+    
+    assert diffs == {}
+    assert game.enemies_data is enemies
+    assert game.enemy_templates is templates
+    assert "slime" not in game.enemies_data
+    assert "'slime' is missing" in capsys.readouterr().out
+
+
+def test_unparseable_file_leaves_the_tables_intact(game, capsys):
+    with open(game.DATA_FILES["items"][0], "w", encoding="utf-8") as f:
+        f.write('{"iron_sword": ')  # A half-saved edit
+    items = game.items_data
+    
+    assert game.reload_data_files(["items"]) == {}
+    assert game.items_data is items
+    assert "Error loading items.json" in capsys.readouterr().out
+
+
+def test_changed_enemy_is_swapped_in(game, edit_data):
+    edit_data("enemies", lambda table: table["goblin"].update(attack=9))
+    
+    diffs = game.reload_data_files(["enemies"])
+    
+    assert diffs["enemies"] == {"added": [], "removed": [], "changed": ["goblin"]}
+    assert game.enemies_data["goblin"]["attack"] == 9
+    assert game.Enemy.from_template("goblin").attack == 9
+
+
+def remove_room(table, room_id):
+    del table[room_id]
+    for room in table.values():
+        room["exits"] = {direction: target for direction, target in room.get("exits", {}).items()
+                         if target != room_id}
+
+
+def test_player_in_a_removed_room_is_moved_to_safety(game, edit_data, capsys):
+    session = game.GameSession()
+    session.player = game.Player(name="Ann", current_room="tavern_cellar")
+    session.current_room = "tavern_cellar"
+    edit_data("rooms", lambda table: remove_room(table, "tavern_cellar"))
+    
+    diffs = game.reload_data_files(["rooms"], [session])
+    
+    assert diffs["rooms"]["removed"] == ["tavern_cellar"]
+    assert session.current_room == "tavern"
+    assert "The world shifts around you" in capsys.readouterr().out
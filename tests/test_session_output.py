@@ -0,0 +1,54 @@
+"""Per-session output sinks for network play."""
+import io
+import threading
+
+
+def network_session(game, name, room="tavern"):
+    session = game.GameSession()
+    session.output = io.StringIO()
+    session.player = game.Player(name=name, current_room=room)
+    session.current_room = room
+    return session
+
+
+def test_run_captured_returns_what_the_handler_printed(game, capsys):
+    session = network_session(game, "Ann")
+    
+    output = game.run_captured(game.display_prompt, session)
+    
+    assert "> " in output
+    assert session.output.getvalue() == ""
+    assert capsys.readouterr().out == ""
+
+
+def test_other_threads_still_print_to_the_console(game, capsys):
+    session = network_session(game, "Ann")
+    
+    def handler(session):
+        thread = threading.Thread(target=print, args=("from a thread",))
+        thread.start()
+        thread.join()
+        print("for Ann")
+    
+    assert game.run_captured(handler, session) == "for Ann\n"
+    assert capsys.readouterr().out == "from a thread\n"
+
+
+def test_reload_notice_goes_to_the_moved_player(game, edit_data):
+    ann = network_session(game, "Ann")
+    bob = network_session(game, "Bob", room="tavern_cellar")
+    
+    def remove_cellar(table):
+        del table["tavern_cellar"]
+        for room in table.values():
+            room["exits"] = {direction: target for direction, target in room.get("exits", {}).items()
+                             if target != "tavern_cellar"}
+    edit_data("rooms", remove_cellar)
+    
+    output = game.run_captured(game.reload_data_files, ["rooms"], [ann, bob])
+    
+    assert "world shifts" not in output
+    assert bob.current_room == "tavern"
+    assert "The world shifts around you" in bob.output.getvalue()
+    assert "The world shifts around you" in game.run_captured(game.display_prompt, bob)
+    assert bob.output.getvalue() == ""
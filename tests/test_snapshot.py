@@ -0,0 +1,41 @@
+"""World snapshot reuse and invalidation."""
+import os
+
+
+def test_second_start_loads_the_snapshot(game):
+    assert game.data_load_report["source"] == "json"
+    assert os.path.exists(game.Config.SNAPSHOT_FILE)
+    
+    game.load_game_data()
+    
+    assert game.data_load_report["source"] == "snapshot"
+    assert game.items_data["iron_sword"]["name"] == "Iron Sword"
+    assert game.room_text.peek("tavern")["description"]
+
+
+def test_edited_data_file_invalidates_the_snapshot(game, edit_data):
+    edit_data("items", lambda items: items["iron_sword"].update(name="Edited Sword"))
+    
+    game.load_game_data()
+    
+    assert game.data_load_report["source"] == "json"
+    assert game.items_data["iron_sword"]["name"] == "Edited Sword"
+    game.load_game_data()
+    assert game.data_load_report["source"] == "snapshot"
+
+
+def test_touched_but_unchanged_file_keeps_the_snapshot(game):
+    path = game.DATA_FILES["quests"][0]
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+    
+    game.load_game_data()
+    
+    assert game.data_load_report["source"] == "snapshot"  # Same content hash
+    assert game.load_world_snapshot() is not None         # Header refreshed to the new mtime
+
+
+def test_rebuild_cache_ignores_a_current_snapshot(game):
+    game.load_game_data(rebuild_cache=True)
+    
+    assert game.data_load_report["source"] == "json"
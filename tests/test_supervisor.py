@@ -0,0 +1,82 @@
+"""Supervisor routing and session moves between workers (no processes forked)."""
+import os
+import socket
+
+import pytest
+
+import main
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "send_fds"), reason="needs Unix fd passing")
+
+
+@pytest.fixture
+def supervisor():
+    """A Supervisor with three fake workers; worker.peer is the worker's end of its control socket."""
+    supervisor = main.Supervisor("127.0.0.1", 0, 3)
+    for index in range(3):
+        parent_end, child_end = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        child_end.setblocking(False)
+        worker = main.WorkerHandle(index, pid=0, control=parent_end)
+        worker.peer = child_end
+        supervisor.workers.append(worker)
+    yield supervisor
+    for worker in supervisor.workers:
+        worker.control.close()
+        worker.peer.close()
+
+
+def received(worker):
+    """The next control message sent to a worker (None if there isn't one), closing any fds."""
+    message, fds = main.receive_control(worker.peer)
+    for fd in fds:
+        os.close(fd)
+    return message
+
+
+def test_choose_worker_is_stable_and_follows_moves(supervisor):
+    home = supervisor.choose_worker("ann")
+    assert supervisor.choose_worker("ann") is home
+    
+    other = supervisor.workers[(home.index + 1) % 3]
+    supervisor.routes["ann"] = other.index
+    assert supervisor.choose_worker("ann") is other
+    
+    other.alive = False
+    assert supervisor.choose_worker("ann").alive
+
+
+def test_move_reattaches_to_the_least_busy_other_worker(game, supervisor):
+    for worker, sessions in zip(supervisor.workers, (5, 3, 1)):
+        worker.sessions = sessions
+    session = game.GameSession()
+    session.player = game.Player(name="Ann", gold=77)
+    state = game.session_to_dict(session)
+    read_end, write_end = os.pipe()
+    os.close(write_end)
+    
+    supervisor.move(supervisor.workers[2], "Ann", read_end, b"look\r\n", state)
+    
+    target = supervisor.workers[1]  # Worker 2 is the idlest, but it gave the session up
+    assert supervisor.routes["ann"] == supervisor.placement["ann"] == 1
+    assert [worker.sessions for worker in supervisor.workers] == [5, 4, 0]
+    message = received(target)
+    assert message["op"] == "attach" and message["resumed"]
+    assert bytes.fromhex(message["leftover"]) == b"look\r\n"
+    with pytest.raises(OSError):
+        os.fstat(read_end)  # The supervisor's copy is closed once the worker has its own
+    
+    resumed = game.GameSession()
+    game.restore_session(resumed, message["state"])
+    assert resumed.player.gold == 77
+
+
+def test_rebalance_sheds_only_past_the_imbalance_limit(supervisor):
+    limit = main.Config.SUPERVISOR_MAX_IMBALANCE
+    for worker, sessions in zip(supervisor.workers, (limit + 1, 1, 1)):
+        worker.sessions = sessions
+    supervisor.rebalance()
+    assert received(supervisor.workers[0]) is None
+    
+    supervisor.workers[0].sessions = limit + 5
+    supervisor.rebalance()
+    assert received(supervisor.workers[0]) == {"op": "shed", "count": (limit + 4) // 2}